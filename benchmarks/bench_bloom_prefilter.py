@@ -0,0 +1,135 @@
+"""
+Benchmark: /logs query time with and without the stored-bloom prefilter.
+
+Indexes a stretch of mainnet-like blocks (random log emitters and topics) into
+in-memory SQLite, where only a fraction of blocks touch the watched contract.
+The `/logs` handler tests each block's stored logsBloom and reads logs only
+from the blocks that may match; the baseline reads the logs of every block in
+the range with the same filter and serializes them the same way. An address
+filter is served by the address_id index either way; a topic0 filter is not.
+
+    python benchmarks/bench_bloom_prefilter.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("RPC_URL", "http://localhost:8545")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import database.models  # noqa: E402,F401  (registers the tables on Base)
+from api.router import LOG_RESPONSE_KEYS, LOGS_CACHE, get_logs  # noqa: E402
+from database.connection import Base  # noqa: E402
+from database.repository import BlockchainRepository  # noqa: E402
+from domain.schemas import BlockModel  # noqa: E402
+from utils import fast_json  # noqa: E402
+from utils.bloom import (LogBloomFilter, add_to_bloom,  # noqa: E402
+                         format_bloom)
+
+BLOCKS = 2_000
+LOGS_PER_BLOCK = 50
+WATCHED_SHARE = 0.05
+REPEAT = 5
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+def random_hex(rng: random.Random, nbytes: int) -> str:
+    return "0x" + rng.randbytes(nbytes).hex()
+
+
+def index_blocks(repo: BlockchainRepository, rng: random.Random, watched: str) -> int:
+    """Store BLOCKS blocks with their logs and blooms. Returns the number of blocks holding a watched log."""
+    watched_blocks = 0
+    for number in range(1, BLOCKS + 1):
+        block_hash = f"0x{number:064x}"
+        logs = [
+            {
+                "log_index": i,
+                "transaction_hash": random_hex(rng, 32),
+                "address": random_hex(rng, 20),
+                "data": "0x",
+                "topics": [random_hex(rng, 32)],
+                "block_number": number,
+                "block_hash": block_hash,
+            }
+            for i in range(LOGS_PER_BLOCK)
+        ]
+        if rng.random() < WATCHED_SHARE:
+            logs[0].update(address=watched, topics=[TRANSFER_TOPIC])
+            watched_blocks += 1
+        bloom = 0
+        for log in logs:
+            bloom = add_to_bloom(bloom, log["address"])
+            for topic in log["topics"]:
+                bloom = add_to_bloom(bloom, topic)
+        repo.insert_blocks_bulk(
+            [
+                BlockModel(
+                    number=number,
+                    hash=block_hash,
+                    parent_hash=f"0x{number - 1:064x}",
+                    timestamp=1_700_000_000 + 12 * number,
+                    miner="0x" + "c" * 40,
+                    size=500,
+                    extra_data="0x",
+                    gas_limit=30_000_000,
+                    gas_used=15_000_000,
+                    logs_bloom=format_bloom(bloom),
+                )
+            ]
+        )
+        repo.insert_logs_bulk(logs)
+    repo.db.commit()
+    return watched_blocks
+
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    rng = random.Random(42)
+    watched = random_hex(rng, 20)
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    repo = BlockchainRepository(session)
+    watched_blocks = index_blocks(repo, rng, watched)
+
+    print(f"blocks: {BLOCKS} x {LOGS_PER_BLOCK} logs ({watched_blocks} with a watched log)")
+    for name, address, topic0 in (("address", watched, None), ("topic0", None, TRANSFER_TOPIC)):
+
+        def prefiltered():
+            # The response cache would serve every repeat after the first
+            LOGS_CACHE.clear()
+            return get_logs(from_block=1, to_block=BLOCKS, address=address, topic0=topic0, limit=10_000, db=session)
+
+        def unfiltered():
+            logs = repo.get_logs(range(1, BLOCKS + 1), address=address, topic0=topic0, limit=10_000)
+            return fast_json.dumps_bytes([{LOG_RESPONSE_KEYS[k]: v for k, v in log.items()} for log in logs])
+
+        bloom_filter = LogBloomFilter([address] if address else [], [topic0] if topic0 else [])
+        candidates = sum(1 for _, bloom in repo.get_block_blooms(1, BLOCKS) if bloom_filter.matches(bloom))
+        assert prefiltered().body == unfiltered()
+
+        with_bloom, without_bloom = best_of(prefiltered), best_of(unfiltered)
+        print(
+            f"{name + ' filter:':<16} {candidates:4d}/{BLOCKS} blocks read | without bloom {without_bloom * 1e3:7.2f} ms, "
+            f"with bloom {with_bloom * 1e3:7.2f} ms ({without_bloom / with_bloom:.1f}x)"
+        )
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
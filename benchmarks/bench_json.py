@@ -0,0 +1,82 @@
+"""
+Benchmark: JSON encoding for a 2000-log block.
+
+Compares the stdlib/Pydantic paths with utils.fast_json (orjson when installed) for
+  - jsonb topics parameters built by insert_logs_bulk,
+  - a /logs response body (Pydantic response_model vs direct serialization),
+  - an NDJSON export chunk.
+
+    python benchmarks/bench_json.py
+"""
+
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from domain.schemas import LogModel  # noqa: E402
+from utils import fast_json  # noqa: E402
+
+LOGS = 2000
+REPEAT = 20
+
+# Same mapping as api.router.LOG_RESPONSE_KEYS (importing the router needs a configured environment)
+LOG_RESPONSE_KEYS = {name: field.alias or name for name, field in LogModel.model_fields.items()}
+
+
+def make_logs():
+    return [
+        {
+            "log_index": i,
+            "transaction_hash": f"0x{i:064x}",
+            "address": "0x" + f"{i % 13:040x}",
+            "data": "0x" + f"{i:064x}",
+            "topics": [
+                "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef",
+                f"0x{i:064x}",
+                f"0x{i + 1:064x}",
+            ],
+            "block_number": 19_000_000,
+            "block_hash": "0x" + "ab" * 32,
+        }
+        for i in range(LOGS)
+    ]
+
+
+def best(fn):
+    return min(timeit.repeat(fn, number=1, repeat=REPEAT))
+
+
+def report(label, baseline, fast):
+    print(f"{label:<22} {baseline * 1e3:8.2f} ms -> {fast * 1e3:8.2f} ms ({baseline / fast:.1f}x)")
+
+
+def main():
+    logs = make_logs()
+    adapter = TypeAdapter(List[LogModel])
+
+    print(f"{LOGS} logs, backend: {'orjson' if fast_json.HAS_ORJSON else 'stdlib'}")
+    report(
+        "topics parameters",
+        best(lambda: [json.dumps(log["topics"]) for log in logs]),
+        best(lambda: [fast_json.dumps(log["topics"]) for log in logs]),
+    )
+    report(
+        "/logs response body",
+        best(lambda: adapter.dump_json(adapter.validate_python(logs), by_alias=True)),
+        best(lambda: fast_json.dumps_bytes([{LOG_RESPONSE_KEYS[k]: v for k, v in log.items()} for log in logs])),
+    )
+    report(
+        "NDJSON export chunk",
+        best(lambda: ("\n".join(json.dumps(log) for log in logs) + "\n").encode()),
+        best(lambda: b"\n".join(fast_json.dumps_bytes(log) for log in logs) + b"\n"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark: peak traced memory per pipeline stage, and what the prefetch buffer holds.
+
+Blocks alternate between small transfers-only blocks and blocks carrying large
+calldata, so a count-bounded buffer (the old `buffer_size=10`) and the byte-
+budgeted PrefetchBuffer behave differently. tracemalloc reports the peak for
+each stage: building the RPC payload (fetch), turning it into rows (validate)
+and writing the buffered blocks (write, in-memory SQLite). The memory the
+buffer actually holds is traced next to its own byte estimate.
+
+    python benchmarks/bench_prefetch_memory.py [budget MiB]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from queue import Full
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("RPC_URL", "http://localhost:8545")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from hexbytes import HexBytes  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import database.models  # noqa: E402,F401  (registers the tables on Base)
+from core.block_cache import estimate_size  # noqa: E402
+from core.buffer import PrefetchBuffer  # noqa: E402
+from database.connection import Base  # noqa: E402
+from database.repository import BlockchainRepository  # noqa: E402
+from domain.rows import LogRow, TransactionRow  # noqa: E402
+from domain.schemas import BlockModel  # noqa: E402
+
+BLOCKS = 40
+SMALL_TXS = 20
+LARGE_TXS = 150
+LARGE_CALLDATA = 16 * 1024
+COUNT_BOUND = 10
+
+
+def make_payload(number):
+    large = number % 4 == 0
+    block_hash = HexBytes(number.to_bytes(32, "big"))
+    txs = [
+        {
+            "hash": HexBytes((number * 1000 + i).to_bytes(32, "big")),
+            "nonce": i,
+            "blockHash": block_hash,
+            "blockNumber": number,
+            "transactionIndex": i,
+            "from": "0x" + f"{i:040x}",
+            "to": "0x" + f"{i + 1:040x}",
+            "value": 10**18 + i,
+            "gasPrice": 30 * 10**9,
+            "gas": 21000,
+            "input": HexBytes(os.urandom(LARGE_CALLDATA) if large else b""),
+        }
+        for i in range(LARGE_TXS if large else SMALL_TXS)
+    ]
+    logs = [
+        {
+            "logIndex": i,
+            "transactionHash": tx["hash"],
+            "address": "0x" + f"{i % 7:040x}",
+            "data": HexBytes(bytes(32)),
+            "topics": [HexBytes(bytes(32)), HexBytes(i.to_bytes(32, "big"))],
+            "blockNumber": number,
+            "blockHash": block_hash,
+        }
+        for i, tx in enumerate(txs)
+    ]
+    block = {
+        "number": number,
+        "hash": block_hash,
+        "parentHash": HexBytes((number - 1).to_bytes(32, "big")),
+        "timestamp": 1_700_000_000 + 12 * number,
+        "miner": "0x" + "c" * 40,
+        "size": 500,
+        "extraData": "0x",
+        "gasLimit": 30_000_000,
+        "gasUsed": 15_000_000,
+        "transactions": txs,
+    }
+    return block, logs
+
+
+def validate(raw_block, raw_logs):
+    txs_data = [TransactionRow.from_rpc(tx) for tx in raw_block["transactions"]]
+    logs_data = [LogRow.from_rpc(log) for log in raw_logs]
+    return {
+        "size_bytes": estimate_size(txs_data) + estimate_size(logs_data),
+        "block_model": BlockModel.model_validate(dict(raw_block)),
+        "txs_data": txs_data,
+        "logs_data": logs_data,
+    }
+
+
+def traced(stage, peaks, fn, *args):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    peaks[stage] = max(peaks.get(stage, 0), tracemalloc.get_traced_memory()[1] - before)
+    return result
+
+
+def prefetch(buffer, peaks):
+    """Fetch and validate blocks into the buffer until the prefetcher would have to wait."""
+    for number in range(1, BLOCKS + 1):
+        raw_block, raw_logs = traced("fetch", peaks, make_payload, number)
+        data = traced("validate", peaks, validate, raw_block, raw_logs)
+        del raw_block, raw_logs
+        try:
+            buffer.put(number, data, data["size_bytes"], timeout=0)
+        except Full:
+            break
+    return buffer
+
+
+def write(buffer):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    repo = BlockchainRepository(session)
+    while not buffer.empty():
+        _, data = buffer.get_nowait()
+        repo.insert_blocks_bulk([data["block_model"]])
+        repo.insert_transactions_bulk(data["txs_data"])
+        repo.insert_logs_bulk(data["logs_data"])
+    session.commit()
+    session.close()
+
+
+def run(name, buffer):
+    peaks = {}
+    baseline = tracemalloc.get_traced_memory()[0]
+    prefetch(buffer, peaks)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    stats = buffer.stats()
+    traced("write", peaks, write, buffer)
+    print(
+        f"{name:<13} {stats['items']:3d} blocks buffered | estimated {stats['bytes'] / 2**20:6.2f} MiB, "
+        f"traced {held / 2**20:6.2f} MiB"
+    )
+    print("              peak per stage: " + ", ".join(
+        f"{stage} {peaks[stage] / 2**20:.2f} MiB" for stage in ("fetch", "validate", "write")
+    ))
+
+
+def main():
+    budget = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 32 * 1024 * 1024
+    print(f"{BLOCKS} blocks, every 4th with {LARGE_TXS} x {LARGE_CALLDATA // 1024} KiB calldata")
+    tracemalloc.start()
+    started = time.perf_counter()
+    run(f"count={COUNT_BOUND}", PrefetchBuffer(max_bytes=1 << 62, max_items=COUNT_BOUND))
+    run(f"bytes={budget / 2**20:.0f}MiB", PrefetchBuffer(max_bytes=budget))
+    tracemalloc.stop()
+    print(f"({time.perf_counter() - started:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
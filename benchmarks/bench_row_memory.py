@@ -0,0 +1,100 @@
+"""
+Benchmark: memory held by the prefetch buffer at 500 buffered blocks.
+
+Compares the Pydantic path (dict(payload) -> model -> model_dump dict per tx/log)
+with slotted TransactionRow/LogRow records built straight from the payload. Each
+variant runs in its own process so peak RSS is not shared between them.
+
+    python benchmarks/bench_row_memory.py
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from hexbytes import HexBytes  # noqa: E402
+
+from domain.rows import LogRow, TransactionRow  # noqa: E402
+from domain.schemas import LogModel, TransactionModel  # noqa: E402
+
+BLOCKS = 500
+TXS_PER_BLOCK = 150
+LOGS_PER_BLOCK = 250
+
+
+def make_payload(number):
+    block_hash = HexBytes(number.to_bytes(32, "big"))
+    txs = [
+        {
+            "hash": HexBytes((number * 1000 + i).to_bytes(32, "big")),
+            "nonce": i,
+            "blockHash": block_hash,
+            "blockNumber": number,
+            "transactionIndex": i,
+            "from": "0x" + f"{i:040x}",
+            "to": "0x" + f"{i + 1:040x}",
+            "value": 10**18 + i,
+            "gasPrice": 30 * 10**9,
+            "gas": 21000,
+            "input": HexBytes(bytes(68)),
+        }
+        for i in range(TXS_PER_BLOCK)
+    ]
+    logs = [
+        {
+            "logIndex": i,
+            "transactionHash": txs[i % TXS_PER_BLOCK]["hash"],
+            "address": "0x" + f"{i % 7:040x}",
+            "data": HexBytes(bytes(32)),
+            "topics": [HexBytes(bytes(32)), HexBytes(i.to_bytes(32, "big")), HexBytes(bytes(32))],
+            "blockNumber": number,
+            "blockHash": block_hash,
+        }
+        for i in range(LOGS_PER_BLOCK)
+    ]
+    return txs, logs
+
+
+def build_models(txs, logs):
+    return (
+        [TransactionModel.model_validate(dict(tx)).model_dump(by_alias=False) for tx in txs],
+        [LogModel.model_validate(dict(log)).model_dump(by_alias=False) for log in logs],
+    )
+
+
+def build_rows(txs, logs):
+    return [TransactionRow.from_rpc(tx) for tx in txs], [LogRow.from_rpc(log) for log in logs]
+
+
+def run_variant(name):
+    build = build_models if name == "models" else build_rows
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    buffer = []
+    started = time.perf_counter()
+    for number in range(BLOCKS):
+        # The raw payload is dropped once processed, as in the engine's prefetcher
+        buffer.append((number, build(*make_payload(number))))
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{name:<8} peak RSS {peak_rss:7.1f} MiB (+{peak_rss - baseline_rss:.1f} over imports) | "
+        f"{len(buffer)} blocks built in {elapsed:.2f} s"
+    )
+
+
+def main():
+    if len(sys.argv) > 1:
+        run_variant(sys.argv[1])
+        return
+    print(f"{BLOCKS} blocks x ({TXS_PER_BLOCK} txs + {LOGS_PER_BLOCK} logs) in the prefetch buffer")
+    for name in ("models", "rows"):
+        subprocess.run([sys.executable, __file__, name], check=True)
+
+
+if __name__ == "__main__":
+    main()
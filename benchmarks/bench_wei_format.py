@@ -0,0 +1,44 @@
+"""
+Benchmark: rendering many Wei amounts as Ether strings.
+
+Compares the per-value Decimal path (`format_ether(wei_to_ether(v))`) with the
+batch integer path (`wei_to_ether_strings`) on the kind of list an API response
+renders, e.g. a page of /stats buckets.
+
+    python benchmarks/bench_wei_format.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.blockchain_math import (format_ether, wei_to_ether,  # noqa: E402
+                                   wei_to_ether_strings)
+
+VALUES = 5_000
+REPEAT = 5
+
+
+def main():
+    rng = random.Random(42)
+    values = [rng.randrange(10**24) for _ in range(VALUES)]
+
+    assert wei_to_ether_strings(values) == [format_ether(wei_to_ether(v)) for v in values]
+
+    decimal_path = min(timeit.repeat(lambda: [format_ether(wei_to_ether(v)) for v in values], number=1, repeat=REPEAT))
+    batch_path = min(timeit.repeat(lambda: wei_to_ether_strings(values), number=1, repeat=REPEAT))
+    decimal_sum = min(timeit.repeat(lambda: sum(wei_to_ether(v) for v in values), number=1, repeat=REPEAT))
+    int_sum = min(timeit.repeat(lambda: sum(values), number=1, repeat=REPEAT))
+
+    print(f"values:                 {VALUES}")
+    print(f"Decimal format:         {decimal_path * 1e3:.2f} ms")
+    print(f"batch integer format:   {batch_path * 1e3:.2f} ms ({decimal_path / batch_path:.1f}x)")
+    print(f"Decimal sum:            {decimal_sum * 1e3:.2f} ms")
+    print(f"integer sum:            {int_sum * 1e3:.2f} ms ({decimal_sum / int_sum:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
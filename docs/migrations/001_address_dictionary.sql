@@ -0,0 +1,75 @@
+-- Migration 001: Address Dictionary
+-- Moves a database created before the addresses table to the layout in
+-- docs/schema.sql: transactions store from_id/to_id, logs and address_activity
+-- store address_id, all referencing edx.addresses. Idempotent: tables that
+-- already have the id columns are skipped, so it is safe to re-run.
+--
+--   psql "$DATABASE_URL" -f docs/migrations/001_address_dictionary.sql
+--
+-- Stop the sync worker first; the API keeps working once it is done.
+BEGIN;
+
+CREATE TABLE
+  IF NOT EXISTS edx.addresses (
+    id BIGSERIAL PRIMARY KEY,
+    address VARCHAR(42) UNIQUE NOT NULL
+  );
+
+-- 1. Transactions: from_address/to_address -> from_id/to_id
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['transactions', 'hot_transactions', 'orphaned_transactions'] LOOP
+    IF EXISTS (
+      SELECT 1 FROM information_schema.columns
+      WHERE table_schema = 'edx' AND table_name = t AND column_name = 'from_address'
+    ) THEN
+      EXECUTE format(
+        'INSERT INTO edx.addresses (address)
+         SELECT from_address FROM edx.%1$I
+         UNION SELECT to_address FROM edx.%1$I WHERE to_address IS NOT NULL
+         ON CONFLICT (address) DO NOTHING', t);
+      EXECUTE format('ALTER TABLE edx.%I ADD COLUMN IF NOT EXISTS from_id BIGINT, ADD COLUMN IF NOT EXISTS to_id BIGINT', t);
+      EXECUTE format(
+        'UPDATE edx.%I AS f SET from_id = a.id FROM edx.addresses AS a WHERE a.address = f.from_address', t);
+      EXECUTE format(
+        'UPDATE edx.%I AS f SET to_id = a.id FROM edx.addresses AS a WHERE a.address = f.to_address', t);
+      -- Indexes on the string columns are dropped with them
+      EXECUTE format(
+        'ALTER TABLE edx.%I ALTER COLUMN from_id SET NOT NULL, DROP COLUMN from_address, DROP COLUMN to_address', t);
+    END IF;
+  END LOOP;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_from_id ON edx.transactions (from_id);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_to_id ON edx.transactions (to_id);
+
+-- 2. Logs and address activity: address -> address_id
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['logs', 'hot_logs', 'orphaned_logs', 'address_activity'] LOOP
+    IF EXISTS (
+      SELECT 1 FROM information_schema.columns
+      WHERE table_schema = 'edx' AND table_name = t AND column_name = 'address'
+    ) THEN
+      EXECUTE format(
+        'INSERT INTO edx.addresses (address) SELECT DISTINCT address FROM edx.%I ON CONFLICT (address) DO NOTHING', t);
+      EXECUTE format('ALTER TABLE edx.%I ADD COLUMN IF NOT EXISTS address_id BIGINT', t);
+      EXECUTE format(
+        'UPDATE edx.%I AS f SET address_id = a.id FROM edx.addresses AS a WHERE a.address = f.address', t);
+      -- address_activity's primary key includes the column and is dropped with it
+      EXECUTE format('ALTER TABLE edx.%I ALTER COLUMN address_id SET NOT NULL, DROP COLUMN address', t);
+      IF t = 'address_activity' THEN
+        ALTER TABLE edx.address_activity ADD PRIMARY KEY (address_id, block_number, tx_index, log_index, role);
+      END IF;
+    END IF;
+  END LOOP;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_logs_address_id ON edx.logs (address_id);
+
+COMMIT;
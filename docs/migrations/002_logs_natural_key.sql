@@ -0,0 +1,33 @@
+-- Migration 002: Logs Natural Key
+-- Adds the UNIQUE (block_hash, log_index) constraints that every log insert
+-- path relies on (ON CONFLICT (block_hash, log_index) DO NOTHING). Duplicates
+-- written by retried or overlapping batches before the constraint existed are
+-- removed first, keeping the oldest row. Idempotent: safe to re-run.
+--
+--   psql "$DATABASE_URL" -f docs/migrations/002_logs_natural_key.sql
+--
+-- Stop the sync worker first: inserts fail until the constraints exist.
+BEGIN;
+
+-- 1. Remove duplicate logs
+DELETE FROM edx.logs AS l USING edx.logs AS d
+WHERE l.block_hash = d.block_hash AND l.log_index = d.log_index AND l.id > d.id;
+
+DELETE FROM edx.hot_logs AS l USING edx.hot_logs AS d
+WHERE l.block_hash = d.block_hash AND l.log_index = d.log_index AND l.id > d.id;
+
+-- 2. Add the natural keys
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_logs_block_hash_log_index') THEN
+    ALTER TABLE edx.logs ADD CONSTRAINT uq_logs_block_hash_log_index UNIQUE (block_hash, log_index);
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_hot_logs_block_hash_log_index') THEN
+    ALTER TABLE edx.hot_logs ADD CONSTRAINT uq_hot_logs_block_hash_log_index UNIQUE (block_hash, log_index);
+  END IF;
+END $$;
+
+-- Lookups by block hash use the unique index above
+DROP INDEX IF EXISTS edx.idx_logs_block_hash;
+
+COMMIT;
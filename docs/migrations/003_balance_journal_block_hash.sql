@@ -0,0 +1,33 @@
+-- Migration 003: Balance Journal Block Hash
+-- Keys token_balance_deltas by (block_hash, token_address, holder), so a
+-- replayed block hits ON CONFLICT DO NOTHING and its deltas are applied once.
+-- Existing rows take the hash of the stored block at their height; rows whose
+-- block is gone were already reverted and are dropped. Idempotent: safe to re-run.
+--
+--   psql "$DATABASE_URL" -f docs/migrations/003_balance_journal_block_hash.sql
+--
+-- Stop the sync worker first: balance writes fail until the key exists.
+BEGIN;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = 'edx' AND table_name = 'token_balance_deltas' AND column_name = 'block_hash'
+  ) THEN
+    ALTER TABLE edx.token_balance_deltas ADD COLUMN block_hash VARCHAR(66);
+    UPDATE edx.token_balance_deltas AS d SET block_hash = b.hash
+    FROM (SELECT number, hash FROM edx.blocks UNION ALL SELECT number, hash FROM edx.hot_blocks) AS b
+    WHERE b.number = d.block_number;
+    DELETE FROM edx.token_balance_deltas WHERE block_hash IS NULL;
+    ALTER TABLE edx.token_balance_deltas
+      DROP CONSTRAINT token_balance_deltas_pkey,
+      ALTER COLUMN block_hash SET NOT NULL,
+      ADD PRIMARY KEY (block_hash, token_address, holder);
+  END IF;
+END $$;
+
+-- Rollback and pruning still select by height
+CREATE INDEX IF NOT EXISTS idx_token_balance_deltas_block_number ON edx.token_balance_deltas (block_number);
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- Migration 004: Sender Block Count
+-- Renames unique_senders on the chain stats rollups to sender_block_count: the
+-- column sums per-block distinct senders, which is not a distinct count per
+-- bucket. block_stats keeps unique_senders, which is distinct per block.
+-- Idempotent: safe to re-run.
+--
+--   psql "$DATABASE_URL" -f docs/migrations/004_sender_block_count.sql
+--
+-- Deploy the API together with it: /stats now returns sender_block_count.
+BEGIN;
+
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['chain_stats_minute', 'chain_stats_hour'] LOOP
+    IF EXISTS (
+      SELECT 1 FROM information_schema.columns
+      WHERE table_schema = 'edx' AND table_name = t AND column_name = 'unique_senders'
+    ) THEN
+      EXECUTE format('ALTER TABLE edx.%I RENAME COLUMN unique_senders TO sender_block_count', t);
+    END IF;
+  END LOOP;
+END $$;
+
+COMMIT;
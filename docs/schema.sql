@@ -13,7 +13,8 @@ CREATE TABLE
     extra_data TEXT NOT NULL,
     gas_limit BIGINT NOT NULL,
     gas_used BIGINT NOT NULL,
-    base_fee_per_gas BIGINT
+    base_fee_per_gas BIGINT,
+    logs_bloom TEXT
   );
 
 CREATE INDEX IF NOT EXISTS idx_blocks_hash ON edx.blocks (hash);
@@ -22,7 +23,30 @@ CREATE INDEX IF NOT EXISTS idx_blocks_parent_hash ON edx.blocks (parent_hash);
 
 CREATE INDEX IF NOT EXISTS idx_blocks_number ON edx.blocks (number);
 
--- 2. Transactions Table
+-- 2. Address Dictionary and Payload Blobs
+-- Addresses repeat across millions of fact rows; transactions, logs and their
+-- staging/orphan copies store this BIGINT id instead of the 42-char string.
+-- The sync worker keeps an LRU of address -> id and upserts unseen addresses
+-- once per batch.
+CREATE TABLE
+  IF NOT EXISTS edx.addresses (
+    id BIGSERIAL PRIMARY KEY,
+    address VARCHAR(42) UNIQUE NOT NULL
+  );
+
+-- Payloads (transactions.input, logs.data) above PAYLOAD_OFFLOAD_BYTES, compressed
+-- (codec zstd or zlib) and deduplicated by the SHA-256 of the raw bytes. The
+-- fact row keeps the first 4 bytes (the selector, for calldata) and the hash in
+-- input_blob / data_blob. Blobs are shared, so rollbacks leave them in place.
+CREATE TABLE
+  IF NOT EXISTS edx.payload_blobs (
+    hash VARCHAR(66) PRIMARY KEY,
+    codec VARCHAR(8) NOT NULL,
+    size INTEGER NOT NULL,
+    data BYTEA NOT NULL
+  );
+
+-- 3. Transactions Table
 CREATE TABLE
   IF NOT EXISTS edx.transactions (
     hash VARCHAR(66) PRIMARY KEY,
@@ -30,39 +54,244 @@ CREATE TABLE
     block_hash VARCHAR(66) NOT NULL,
     block_number BIGINT NOT NULL REFERENCES edx.blocks (number) ON DELETE CASCADE,
     transaction_index INTEGER NOT NULL,
-    from_address VARCHAR(42) NOT NULL,
-    to_address VARCHAR(42),
+    from_id BIGINT NOT NULL,
+    to_id BIGINT,
     value NUMERIC(78, 0) NOT NULL,
     gas_price BIGINT NOT NULL,
     gas BIGINT NOT NULL,
-    input TEXT NOT NULL
+    input TEXT NOT NULL,
+    input_blob VARCHAR(66)
   );
 
 CREATE INDEX IF NOT EXISTS idx_transactions_block_hash ON edx.transactions (block_hash);
 
 CREATE INDEX IF NOT EXISTS idx_transactions_block_number ON edx.transactions (block_number);
 
-CREATE INDEX IF NOT EXISTS idx_transactions_from_address ON edx.transactions (from_address);
+CREATE INDEX IF NOT EXISTS idx_transactions_from_id ON edx.transactions (from_id);
 
-CREATE INDEX IF NOT EXISTS idx_transactions_to_address ON edx.transactions (to_address);
+CREATE INDEX IF NOT EXISTS idx_transactions_to_id ON edx.transactions (to_id);
 
--- 3. Logs Table
+-- 4. Logs Table
 CREATE TABLE
   IF NOT EXISTS edx.logs (
     id BIGSERIAL PRIMARY KEY,
     log_index INTEGER NOT NULL,
     transaction_hash VARCHAR(66) NOT NULL REFERENCES edx.transactions (hash) ON DELETE CASCADE,
-    address VARCHAR(42) NOT NULL,
+    address_id BIGINT NOT NULL,
     data TEXT NOT NULL,
+    data_blob VARCHAR(66),
     topics JSONB NOT NULL,
     block_number BIGINT NOT NULL REFERENCES edx.blocks (number) ON DELETE CASCADE,
-    block_hash VARCHAR(66) NOT NULL
+    block_hash VARCHAR(66) NOT NULL,
+    -- Natural key: every insert path is ON CONFLICT DO NOTHING, so replayed or
+    -- overlapping batches from several writers never duplicate a log
+    CONSTRAINT uq_logs_block_hash_log_index UNIQUE (block_hash, log_index)
   );
 
 CREATE INDEX IF NOT EXISTS idx_logs_transaction_hash ON edx.logs (transaction_hash);
 
 CREATE INDEX IF NOT EXISTS idx_logs_block_number ON edx.logs (block_number);
 
-CREATE INDEX IF NOT EXISTS idx_logs_address ON edx.logs (address);
+CREATE INDEX IF NOT EXISTS idx_logs_address_id ON edx.logs (address_id);
+
+-- Lookups by block hash use the unique index above
+
+-- 5. Hot Staging Tables
+-- Unfinalized blocks are written here when HOT_STAGING_ENABLED is set and
+-- promoted into the canonical tables in bulk once the node finalizes them,
+-- so reorg deletes never touch deep history.
+CREATE TABLE
+  IF NOT EXISTS edx.hot_blocks (
+    number BIGINT PRIMARY KEY,
+    hash VARCHAR(66) UNIQUE NOT NULL,
+    parent_hash VARCHAR(66) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    miner VARCHAR(42) NOT NULL,
+    difficulty NUMERIC(78, 0) NOT NULL,
+    total_difficulty NUMERIC(78, 0) NOT NULL,
+    size INTEGER NOT NULL,
+    extra_data TEXT NOT NULL,
+    gas_limit BIGINT NOT NULL,
+    gas_used BIGINT NOT NULL,
+    base_fee_per_gas BIGINT,
+    logs_bloom TEXT
+  );
 
-CREATE INDEX IF NOT EXISTS idx_logs_block_hash ON edx.logs (block_hash);
\ No newline at end of file
+CREATE TABLE
+  IF NOT EXISTS edx.hot_transactions (
+    hash VARCHAR(66) PRIMARY KEY,
+    nonce INTEGER NOT NULL,
+    block_hash VARCHAR(66) NOT NULL,
+    block_number BIGINT NOT NULL,
+    transaction_index INTEGER NOT NULL,
+    from_id BIGINT NOT NULL,
+    to_id BIGINT,
+    value NUMERIC(78, 0) NOT NULL,
+    gas_price BIGINT NOT NULL,
+    gas BIGINT NOT NULL,
+    input TEXT NOT NULL,
+    input_blob VARCHAR(66)
+  );
+
+CREATE INDEX IF NOT EXISTS idx_hot_transactions_block_number ON edx.hot_transactions (block_number);
+
+CREATE TABLE
+  IF NOT EXISTS edx.hot_logs (
+    id BIGSERIAL PRIMARY KEY,
+    log_index INTEGER NOT NULL,
+    transaction_hash VARCHAR(66) NOT NULL,
+    address_id BIGINT NOT NULL,
+    data TEXT NOT NULL,
+    data_blob VARCHAR(66),
+    topics JSONB NOT NULL,
+    block_number BIGINT NOT NULL,
+    block_hash VARCHAR(66) NOT NULL,
+    CONSTRAINT uq_hot_logs_block_hash_log_index UNIQUE (block_hash, log_index)
+  );
+
+CREATE INDEX IF NOT EXISTS idx_hot_logs_block_number ON edx.hot_logs (block_number);
+
+-- 6. Token Balances
+-- Running ERC-20 balances, updated with netted deltas in the ingest transaction.
+CREATE TABLE
+  IF NOT EXISTS edx.token_balances (
+    token_address VARCHAR(42) NOT NULL,
+    holder VARCHAR(42) NOT NULL,
+    balance NUMERIC(78, 0) NOT NULL,
+    PRIMARY KEY (token_address, holder)
+  );
+
+-- Per-block delta journal; rollback subtracts reverted deltas instead of recomputing.
+-- Keyed by block hash, so a replayed block is journaled (and applied) once.
+-- Rows at or below the finalized height are pruned.
+CREATE TABLE
+  IF NOT EXISTS edx.token_balance_deltas (
+    block_hash VARCHAR(66) NOT NULL,
+    block_number BIGINT NOT NULL,
+    token_address VARCHAR(42) NOT NULL,
+    holder VARCHAR(42) NOT NULL,
+    delta NUMERIC(78, 0) NOT NULL,
+    PRIMARY KEY (block_hash, token_address, holder)
+  );
+
+CREATE INDEX IF NOT EXISTS idx_token_balance_deltas_block_number ON edx.token_balance_deltas (block_number);
+
+-- 7. Chain Stats
+-- Per-block aggregates computed at ingest. Rollback subtracts the reverted rows
+-- from the rollups below before deleting them.
+CREATE TABLE
+  IF NOT EXISTS edx.block_stats (
+    number BIGINT PRIMARY KEY,
+    timestamp TIMESTAMP NOT NULL,
+    minute_bucket TIMESTAMP NOT NULL,
+    hour_bucket TIMESTAMP NOT NULL,
+    tx_count INTEGER NOT NULL,
+    log_count INTEGER NOT NULL,
+    gas_used BIGINT NOT NULL,
+    base_fee_per_gas BIGINT,
+    fees_burned NUMERIC(78, 0) NOT NULL,
+    total_value NUMERIC(78, 0) NOT NULL,
+    unique_senders INTEGER NOT NULL
+  );
+
+-- Additive minute/hour rollups; /stats reads only these.
+-- sender_block_count is the sum of per-block distinct senders, not distinct per bucket.
+CREATE TABLE
+  IF NOT EXISTS edx.chain_stats_minute (
+    bucket_start TIMESTAMP PRIMARY KEY,
+    block_count INTEGER NOT NULL,
+    tx_count BIGINT NOT NULL,
+    log_count BIGINT NOT NULL,
+    gas_used NUMERIC(78, 0) NOT NULL,
+    fees_burned NUMERIC(78, 0) NOT NULL,
+    total_value NUMERIC(78, 0) NOT NULL,
+    base_fee_sum NUMERIC(78, 0) NOT NULL,
+    sender_block_count BIGINT NOT NULL
+  );
+
+CREATE TABLE
+  IF NOT EXISTS edx.chain_stats_hour (LIKE edx.chain_stats_minute INCLUDING ALL);
+
+-- 8. Address Activity
+-- One posting per (address id, role) a transaction or log touches, written in the
+-- ingest batch. Per-address history is a backward range scan of the primary key
+-- (newest first) instead of OR-ing indexes on transactions and logs.
+-- log_index is -1 for transaction-level roles ("from", "to").
+CREATE TABLE
+  IF NOT EXISTS edx.address_activity (
+    address_id BIGINT NOT NULL,
+    block_number BIGINT NOT NULL,
+    tx_index INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    role VARCHAR(16) NOT NULL,
+    transaction_hash VARCHAR(66) NOT NULL,
+    PRIMARY KEY (address_id, block_number, tx_index, log_index, role)
+  );
+
+-- Rollback deletes by height
+CREATE INDEX IF NOT EXISTS idx_address_activity_block_number ON edx.address_activity (block_number);
+
+-- 9. Orphan Journal
+-- Rows removed by a reorg, keyed by block hash. If the chain flips back to an
+-- orphaned hash the block is restored with INSERT ... SELECT instead of being
+-- re-fetched. Bounded to the most recent ORPHAN_JOURNAL_BLOCKS blocks; the
+-- journal doubles as an audit trail of reorgs.
+CREATE TABLE
+  IF NOT EXISTS edx.orphaned_blocks (
+    hash VARCHAR(66) PRIMARY KEY,
+    number BIGINT NOT NULL,
+    parent_hash VARCHAR(66) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    miner VARCHAR(42) NOT NULL,
+    difficulty NUMERIC(78, 0) NOT NULL,
+    total_difficulty NUMERIC(78, 0) NOT NULL,
+    size INTEGER NOT NULL,
+    extra_data TEXT NOT NULL,
+    gas_limit BIGINT NOT NULL,
+    gas_used BIGINT NOT NULL,
+    base_fee_per_gas BIGINT,
+    logs_bloom TEXT,
+    orphaned_at TIMESTAMP NOT NULL DEFAULT now()
+  );
+
+CREATE INDEX IF NOT EXISTS idx_orphaned_blocks_number ON edx.orphaned_blocks (number);
+
+CREATE TABLE
+  IF NOT EXISTS edx.orphaned_transactions (
+    block_hash VARCHAR(66) NOT NULL,
+    hash VARCHAR(66) NOT NULL,
+    nonce INTEGER NOT NULL,
+    block_number BIGINT NOT NULL,
+    transaction_index INTEGER NOT NULL,
+    from_id BIGINT NOT NULL,
+    to_id BIGINT,
+    value NUMERIC(78, 0) NOT NULL,
+    gas_price BIGINT NOT NULL,
+    gas BIGINT NOT NULL,
+    input TEXT NOT NULL,
+    input_blob VARCHAR(66),
+    PRIMARY KEY (block_hash, hash)
+  );
+
+CREATE TABLE
+  IF NOT EXISTS edx.orphaned_logs (
+    block_hash VARCHAR(66) NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash VARCHAR(66) NOT NULL,
+    address_id BIGINT NOT NULL,
+    data TEXT NOT NULL,
+    data_blob VARCHAR(66),
+    topics JSONB NOT NULL,
+    block_number BIGINT NOT NULL,
+    PRIMARY KEY (block_hash, log_index)
+  );
+
+-- 10. Sync Ranges
+-- Contiguous runs of indexed heights. The tip cursor and the backfill cursor
+-- extend them as blocks commit; adjacent runs are merged. A reorg truncates
+-- the runs at the rollback height.
+CREATE TABLE
+  IF NOT EXISTS edx.sync_ranges (
+    start_block BIGINT PRIMARY KEY,
+    end_block BIGINT NOT NULL
+  );
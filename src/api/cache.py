@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from fastapi.responses import Response
+
+
+class ResponseCache:
+    """
+    Bounded LRU of pre-serialized JSON payloads.
+
+    Callers include the chain head (number, hash) in the key, so a new block or a
+    reorg simply misses instead of needing explicit invalidation.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: Hashable, payload: bytes):
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def json_response(payload: bytes) -> Response:
+    """Return already-serialized JSON without another validation/encoding pass."""
+    return Response(content=payload, media_type="application/json")
@@ -0,0 +1,53 @@
+import io
+from typing import Any, Dict, Iterable, Iterator, List
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from utils import fast_json
+from utils.arrow import require_pyarrow, rows_to_record_batch, schema_for
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def ndjson_stream(partitions: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """One JSON document per row; each cursor partition is flushed as a single chunk."""
+    for rows in partitions:
+        if rows:
+            yield b"\n".join(fast_json.dumps_bytes(row) for row in rows) + b"\n"
+
+
+def arrow_stream(partitions: Iterable[List[Dict[str, Any]]], table: str) -> Iterator[bytes]:
+    """Arrow IPC stream: a schema message followed by one record batch per cursor partition."""
+    pa = require_pyarrow()
+    sink = io.BytesIO()
+    writer = None
+    for rows in partitions:
+        batch = rows_to_record_batch(rows, table)
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        yield _drain(sink)
+    if writer is None:
+        # Empty range: still emit a valid stream with just the schema
+        writer = pa.ipc.new_stream(sink, schema_for(table))
+    writer.close()
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    chunk = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return chunk
+
+
+def export_response(partitions: Iterable[List[Dict[str, Any]]], table: str, fmt: str) -> StreamingResponse:
+    if fmt == "arrow":
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        return StreamingResponse(arrow_stream(partitions, table), media_type=ARROW_STREAM_MEDIA_TYPE)
+    return StreamingResponse(ndjson_stream(partitions), media_type=NDJSON_MEDIA_TYPE)
@@ -1,14 +1,52 @@
-from typing import Dict
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
-from database.connection import get_db
+from api.cache import ResponseCache, json_response
+from api.export import export_response
+from database.connection import get_db, get_read_router
 from database.repository import BlockchainRepository
-from domain.schemas import BlockModel
+from domain.schemas import (AddressActivityModel, AddressActivityPageModel,
+                            BlockModel, ChainStatsModel, LogModel,
+                            SyncRangeModel, SyncRangesModel, TokenBalanceModel,
+                            TransactionModel, validate_hex)
+from utils import fast_json
+from utils.blockchain_math import wei_to_ether_strings
+from utils.bloom import LogBloomFilter
 
 app = FastAPI(title="ETH Lindy Indexer API")
 
+# Upper bound on the block span a single /logs query may scan blooms for
+MAX_LOG_QUERY_RANGE = 10_000
+
+# Rows fetched per server-side cursor round trip when streaming exports
+EXPORT_BATCH_SIZE = 5000
+
+# Serialized /logs responses, keyed by query and chain head
+LOGS_CACHE = ResponseCache(max_entries=256)
+
+# Stored log rows use column names; responses use the LogModel (camelCase) aliases
+LOG_RESPONSE_KEYS = {name: field.alias or name for name, field in LogModel.model_fields.items()}
+
+
+def get_read_db(request: Request):
+    """
+    Session for reads: a read replica when DATABASE_READ_URLS is set, else the primary.
+
+    A `to_block` query parameter is used as the minimum height, so a range read is
+    never served by a replica that has not replicated that block yet.
+    """
+    to_block = request.query_params.get("to_block")
+    min_height = int(to_block) if to_block and to_block.isdigit() else None
+    router = get_read_router()
+    db = router.acquire(min_height)
+    try:
+        yield db
+    finally:
+        router.release(db)
+
 
 @app.get("/health")
 def health_check() -> Dict[str, str]:
@@ -22,9 +60,230 @@ def health_check() -> Dict[str, str]:
 def get_latest_block(db: Session = Depends(get_db)):
     """
     Return the highest block number and hash currently synced in the DB using Raw SQL.
+
+    Always read from the primary: a replica's latest block may lag the last commit.
     """
     repo = BlockchainRepository(db)
     latest_block = repo.get_latest_block()
     if not latest_block:
         raise HTTPException(status_code=404, detail="No blocks found in database")
     return latest_block
+
+
+def _sync_range(start: int, end: int) -> SyncRangeModel:
+    return SyncRangeModel(start_block=start, end_block=end, block_count=end - start + 1)
+
+
+@app.get("/sync/ranges", response_model=SyncRangesModel)
+def get_sync_ranges(db: Session = Depends(get_db)):
+    """
+    Return the block ranges indexed so far by the tip and backfill cursors, and the gaps between them.
+
+    Read from the primary, like /blocks/latest, so progress is never reported behind.
+    """
+    repo = BlockchainRepository(db)
+    ranges = repo.get_sync_ranges()
+    gaps = [(prev_end + 1, start - 1) for (_, prev_end), (start, _) in zip(ranges, ranges[1:])]
+    return SyncRangesModel(
+        ranges=[_sync_range(*r) for r in ranges],
+        gaps=[_sync_range(*g) for g in gaps],
+    )
+
+
+@app.get("/logs", response_model=List[LogModel])
+def get_logs(
+    from_block: int = Query(..., ge=0),
+    to_block: int = Query(..., ge=0),
+    address: Optional[str] = None,
+    topic0: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10_000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Return logs in a block range, using stored block blooms to skip blocks that cannot match.
+    """
+    if to_block < from_block:
+        raise HTTPException(status_code=400, detail="to_block must be >= from_block")
+    if to_block - from_block + 1 > MAX_LOG_QUERY_RANGE:
+        raise HTTPException(status_code=400, detail=f"Block range exceeds {MAX_LOG_QUERY_RANGE} blocks")
+    try:
+        address = validate_hex(address, 40) if address else None
+        topic0 = validate_hex(topic0, 64) if topic0 else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    repo = BlockchainRepository(db)
+    head = repo.get_latest_block()
+    cache_key = (from_block, to_block, address, topic0, limit, head.number if head else None, head.hash if head else None)
+    payload = LOGS_CACHE.get(cache_key)
+    if payload is not None:
+        return json_response(payload)
+
+    bloom_filter = LogBloomFilter([address] if address else [], [topic0] if topic0 else [])
+    candidates = [
+        number for number, bloom in repo.get_block_blooms(from_block, to_block) if bloom_filter.matches(bloom)
+    ]
+    logs = repo.get_logs(candidates, address=address, topic0=topic0, limit=limit)
+
+    # Rows were validated at ingest, so they are serialized directly rather than re-validated
+    payload = fast_json.dumps_bytes([{LOG_RESPONSE_KEYS[k]: v for k, v in log.items()} for log in logs])
+    LOGS_CACHE.put(cache_key, payload)
+    return json_response(payload)
+
+
+@app.get("/transactions/{tx_hash}", response_model=TransactionModel)
+def get_transaction(tx_hash: str, db: Session = Depends(get_read_db)):
+    """
+    Return a transaction; calldata offloaded to payload_blobs is inflated here, on demand.
+    """
+    try:
+        tx_hash = validate_hex(tx_hash, 64)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    repo = BlockchainRepository(db)
+    transaction = repo.get_transaction(tx_hash)
+    if transaction is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return TransactionModel.model_validate(transaction)
+
+
+@app.get("/tokens/{token_address}/balances/{holder}", response_model=TokenBalanceModel)
+def get_token_balance(token_address: str, holder: str, db: Session = Depends(get_read_db)):
+    """
+    Return a holder's current balance of an ERC-20 token from the incrementally maintained aggregate.
+    """
+    try:
+        token_address, holder = validate_hex(token_address, 40), validate_hex(holder, 40)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    repo = BlockchainRepository(db)
+    balance = repo.get_token_balance(token_address, holder)
+    return TokenBalanceModel(
+        token_address=token_address,
+        holder=holder,
+        balance=str(balance or 0),
+    )
+
+
+def _activity_cursor(posting: dict) -> str:
+    return f"{posting['block_number']}:{posting['tx_index']}:{posting['log_index']}:{posting['role']}"
+
+
+def _parse_activity_cursor(cursor: str):
+    try:
+        block_number, tx_index, log_index, role = cursor.split(":")
+        return int(block_number), int(tx_index), int(log_index), role
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid activity cursor")
+
+
+@app.get("/address/{address}/activity", response_model=AddressActivityPageModel)
+def get_address_activity(
+    address: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Return an address's transactions, logs and transfers, newest first, from the address_activity postings.
+    """
+    try:
+        address = validate_hex(address, 40)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    before = _parse_activity_cursor(cursor) if cursor else None
+
+    repo = BlockchainRepository(db)
+    # One extra row tells whether another page follows
+    postings = repo.get_address_activity(address, before=before, limit=limit + 1)
+    page = postings[:limit]
+    return AddressActivityPageModel(
+        items=[AddressActivityModel(**posting) for posting in page],
+        next_cursor=_activity_cursor(page[-1]) if len(postings) > limit else None,
+    )
+
+
+@app.get("/stats/{interval}", response_model=List[ChainStatsModel])
+def get_chain_stats(
+    interval: Literal["minute", "hour"],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(60, ge=1, le=1440),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Return per-minute or per-hour chain totals from the rollups maintained at ingest (TRACK_CHAIN_STATS).
+    """
+    repo = BlockchainRepository(db)
+    buckets = repo.get_chain_stats(interval, start=start, end=end, limit=limit)
+    # Ether strings are rendered once per page with integer math rather than a Decimal per value
+    fees_ether = wei_to_ether_strings(int(bucket["fees_burned"]) for bucket in buckets)
+    value_ether = wei_to_ether_strings(int(bucket["total_value"]) for bucket in buckets)
+    return [
+        ChainStatsModel(
+            bucket_start=bucket["bucket_start"],
+            block_count=bucket["block_count"],
+            tx_count=bucket["tx_count"],
+            log_count=bucket["log_count"],
+            gas_used=int(bucket["gas_used"]),
+            fees_burned=str(int(bucket["fees_burned"])),
+            total_value=str(int(bucket["total_value"])),
+            fees_burned_ether=fees,
+            total_value_ether=value,
+            avg_base_fee_per_gas=int(bucket["base_fee_sum"]) // bucket["block_count"],
+            sender_block_count=bucket["sender_block_count"],
+        )
+        for bucket, fees, value in zip(buckets, fees_ether, value_ether)
+    ]
+
+
+@app.get("/export/logs")
+def export_logs(
+    from_block: int = Query(..., ge=0),
+    to_block: int = Query(..., ge=0),
+    address: Optional[str] = None,
+    topic0: Optional[str] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|arrow)$"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Stream logs in a block range as NDJSON or Arrow IPC record batches.
+    """
+    if to_block < from_block:
+        raise HTTPException(status_code=400, detail="to_block must be >= from_block")
+    try:
+        address = validate_hex(address, 40) if address else None
+        topic0 = validate_hex(topic0, 64) if topic0 else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    repo = BlockchainRepository(db)
+    partitions = repo.iter_logs(from_block, to_block, address=address, topic0=topic0, batch_size=EXPORT_BATCH_SIZE)
+    return export_response(partitions, "logs", format)
+
+
+@app.get("/export/transactions")
+def export_transactions(
+    from_block: int = Query(..., ge=0),
+    to_block: int = Query(..., ge=0),
+    from_address: Optional[str] = None,
+    to_address: Optional[str] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|arrow)$"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Stream transactions in a block range as NDJSON or Arrow IPC record batches.
+    """
+    if to_block < from_block:
+        raise HTTPException(status_code=400, detail="to_block must be >= from_block")
+    try:
+        from_address = validate_hex(from_address, 40) if from_address else None
+        to_address = validate_hex(to_address, 40) if to_address else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    repo = BlockchainRepository(db)
+    partitions = repo.iter_transactions(
+        from_block, to_block, from_address=from_address, to_address=to_address, batch_size=EXPORT_BATCH_SIZE
+    )
+    return export_response(partitions, "transactions", format)
@@ -0,0 +1,123 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from core.engine import SyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+def missing_ranges(covered: Sequence[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    """Gaps in `covered` (ascending, merged ranges) within start..end, ascending."""
+    gaps = []
+    cursor = start
+    for lo, hi in covered:
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo - 1))
+        cursor = max(cursor, hi + 1)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class BackfillWorker:
+    """
+    Historical cursor that runs next to the live tip cursor.
+
+    Fills the gaps in `sync_ranges` between `start_block` and the finalized
+    height, newest history first ("down") or oldest first ("up"). It writes
+    through its own SyncEngine (and so its own DB session) and downloads with
+    its own thread pool, so history never competes with the tip for workers.
+    Only finalized heights are backfilled: those blocks cannot be reorged, skip
+    hot staging and need no continuity check against neighbours not yet indexed.
+    """
+
+    def __init__(
+        self,
+        engine: SyncEngine,
+        start_block: int = 0,
+        direction: str = "down",
+        workers: int = 4,
+        chunk_size: int = 100,
+        idle_interval: float = 60.0,
+    ):
+        if direction not in ("down", "up"):
+            raise ValueError(f"Backfill direction must be 'down' or 'up', got {direction!r}")
+        self.engine = engine
+        self.start_block = start_block
+        self.direction = direction
+        self.chunk_size = chunk_size
+        self.idle_interval = idle_interval
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill")
+        self.blocks_backfilled = 0
+        # The sink only appends in height order; backfilled history is not exported
+        self.engine.parquet_sink = None
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="backfill", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def next_range(self) -> Optional[Tuple[int, int]]:
+        """The next chunk to backfill, or None when history is complete up to finality."""
+        # Promotion and journal pruning stay with the tip engine; only the height is needed here
+        finalized = self.engine.provider.get_finalized_block_number()
+        self.engine.finalized_height = finalized
+        self.engine.guard.finalized_height = finalized
+
+        gaps = missing_ranges(self.engine.repo.get_sync_ranges(), self.start_block, finalized)
+        if not gaps:
+            return None
+        if self.direction == "down":
+            lo, hi = gaps[-1]
+            return max(lo, hi - self.chunk_size + 1), hi
+        lo, hi = gaps[0]
+        return lo, min(hi, lo + self.chunk_size - 1)
+
+    def backfill_range(self, start: int, end: int) -> int:
+        """Download start..end in parallel and commit it in height order. Returns blocks written."""
+        futures = [self.executor.submit(self.engine.fetch_and_validate_block, bn) for bn in range(start, end + 1)]
+        written = 0
+        try:
+            for future in futures:
+                if self._stop_event.is_set():
+                    break
+                self.engine.commit_block(future.result())
+                written += 1
+        finally:
+            for future in futures:
+                future.cancel()
+        self.blocks_backfilled += written
+        logger.info(f"Backfilled blocks {start}-{end} | {self.blocks_backfilled} blocks so far")
+        return written
+
+    def _run(self):
+        logger.info(f"Backfill cursor started ({self.direction}, from block {self.start_block})")
+        while not self._stop_event.is_set():
+            try:
+                next_range = self.next_range()
+                if next_range is None:
+                    logger.debug("Backfill complete up to the finalized height. Waiting...")
+                    self._stop_event.wait(self.idle_interval)
+                    continue
+                self.backfill_range(*next_range)
+            except Exception as e:
+                self.engine.db.rollback()
+                logger.error(f"Backfill error: {e}")
+                self._stop_event.wait(5)
@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of an RPC payload (AttributeDicts, lists, HexBytes, ints)."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return 49 + len(value)
+    if isinstance(value, int):
+        return 28
+    if hasattr(value, "items"):
+        return 64 + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(8 + estimate_size(v) for v in value)
+    return 16
+
+
+def hash_key(block_hash: Any) -> str:
+    if isinstance(block_hash, (bytes, bytearray)):
+        return "0x" + bytes(block_hash).hex()
+    return str(block_hash).lower()
+
+
+class BlockCache:
+    """
+    Bounded, byte-size-aware LRU for RPC block and log payloads.
+
+    Blocks are stored by hash, which never goes stale; lookups by number go through
+    a number -> hash index that a reorg can invalidate (invalidate_from). Log
+    results are stored with the highest height they cover, or none when they are
+    scoped to a block hash.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        # key -> (payload, estimated bytes, height for reorg invalidation or None)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Optional[int]]]" = OrderedDict()
+        # (number, full_transactions) -> block hash
+        self._by_number: Dict[Tuple[int, bool], str] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _store(self, key: Hashable, value: Any, height: Optional[int]):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[1]
+        self._entries[key] = (value, size, height)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            evicted_key, (evicted, evicted_size, _) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            if isinstance(evicted_key, tuple) and evicted_key[0] == "block":
+                index_key = (evicted["number"], evicted_key[2])
+                if self._by_number.get(index_key) == evicted_key[1]:
+                    del self._by_number[index_key]
+
+    def get_block(self, identifier: Any, full_transactions: bool) -> Optional[Any]:
+        """A cached block by number or hash."""
+        with self._lock:
+            if isinstance(identifier, int):
+                block_hash = self._by_number.get((identifier, full_transactions))
+                if block_hash is None:
+                    self.misses += 1
+                    return None
+            else:
+                block_hash = hash_key(identifier)
+            return self._lookup(("block", block_hash, full_transactions))
+
+    def put_block(self, block: Any, full_transactions: bool):
+        block_hash = hash_key(block["hash"])
+        with self._lock:
+            # The hash entry stays valid across reorgs; only the number index can go stale
+            self._store(("block", block_hash, full_transactions), block, None)
+            if ("block", block_hash, full_transactions) in self._entries:
+                self._by_number[(block["number"], full_transactions)] = block_hash
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key: Hashable, value: Any, height: Optional[int] = None):
+        """Store a payload; `height` marks it for reorg invalidation."""
+        with self._lock:
+            self._store(key, value, height)
+
+    def invalidate_from(self, height: int) -> int:
+        """Forget number lookups and log ranges reaching `height` or above; hash lookups stay."""
+        with self._lock:
+            stale_numbers = [key for key in self._by_number if key[0] >= height]
+            for key in stale_numbers:
+                del self._by_number[key]
+            stale = [key for key, (_, _, h) in self._entries.items() if h is not None and h >= height]
+            for entry_key in stale:
+                self.bytes -= self._entries.pop(entry_key)[1]
+            self.invalidations += len(stale_numbers) + len(stale)
+            return len(stale_numbers) + len(stale)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,121 @@
+import heapq
+import threading
+import time
+from queue import Empty, Full
+from typing import Any, List, Optional, Tuple
+
+# Default in-flight budget for prefetched blocks (estimated Python object bytes)
+DEFAULT_PREFETCH_BUFFER_BYTES = 256 * 1024 * 1024
+
+
+class PrefetchBuffer:
+    """
+    Block-number-ordered prefetch buffer bounded by estimated bytes rather than item count.
+
+    put() blocks the fetcher while the buffered blocks would exceed `max_bytes`
+    (backpressure). One block is always admitted into an empty buffer, so a block
+    larger than the whole budget still makes progress. `max_items` optionally
+    caps the count as well. Putting a height that is already buffered replaces
+    its entry, so it is counted once.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_PREFETCH_BUFFER_BYTES, max_items: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        # (block_number, insertion order, size, data)
+        self._heap: List[Tuple[int, int, int, Any]] = []
+        self._counter = 0
+        self._cond = threading.Condition()
+        self.bytes = 0
+        self.peak_bytes = 0
+        self.peak_items = 0
+        self.blocked_puts = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, block_number: int) -> bool:
+        with self._cond:
+            return self._index_of(block_number) is not None
+
+    def empty(self) -> bool:
+        return not self._heap
+
+    def _index_of(self, block_number: int) -> Optional[int]:
+        for i, entry in enumerate(self._heap):
+            if entry[0] == block_number:
+                return i
+        return None
+
+    def _has_room(self, size: int, replaced: Optional[int]) -> bool:
+        """Whether `size` more bytes fit, after freeing the entry at index `replaced` if any."""
+        items, used = len(self._heap), self.bytes
+        if replaced is not None:
+            items -= 1
+            used -= self._heap[replaced][2]
+        if not items:
+            return True
+        if self.max_items is not None and items >= self.max_items:
+            return False
+        return used + size <= self.max_bytes
+
+    def put(self, block_number: int, data: Any, size: int, timeout: Optional[float] = None):
+        """Buffer a processed block, waiting for room. Raises queue.Full on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            # A consumer may take the old entry while we wait, so it is looked up again each time
+            replaced = self._index_of(block_number)
+            if not self._has_room(size, replaced):
+                self.blocked_puts += 1
+            while not self._has_room(size, replaced):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise Full
+                self._cond.wait(remaining)
+                replaced = self._index_of(block_number)
+            if replaced is not None:
+                # Same block number and order key, so the heap invariant holds
+                _, order, old_size, _ = self._heap[replaced]
+                self._heap[replaced] = (block_number, order, size, data)
+                self.bytes -= old_size
+            else:
+                heapq.heappush(self._heap, (block_number, self._counter, size, data))
+                self._counter += 1
+            self.bytes += size
+            self.peak_bytes = max(self.peak_bytes, self.bytes)
+            self.peak_items = max(self.peak_items, len(self._heap))
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[int, Any]:
+        """(block_number, data) of the lowest buffered block. Raises queue.Empty on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._heap:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise Empty
+                self._cond.wait(remaining)
+            block_number, _, size, data = heapq.heappop(self._heap)
+            self.bytes -= size
+            self._cond.notify_all()
+            return block_number, data
+
+    def get_nowait(self) -> Tuple[int, Any]:
+        return self.get(timeout=0)
+
+    def clear(self):
+        """Drop everything buffered (pipeline reset or reorg) and wake blocked fetchers."""
+        with self._cond:
+            self._heap.clear()
+            self.bytes = 0
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self._heap),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "peak_bytes": self.peak_bytes,
+            "peak_items": self.peak_items,
+            "blocked_puts": self.blocked_puts,
+        }
@@ -1,13 +1,60 @@
+from typing import List, Optional
+
 from dotenv import load_dotenv
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 load_dotenv()
 
 class Settings(BaseSettings):
-    rpc_url: str = Field(..., alias="RPC_URL")
+    # Only the sync worker talks to the node; API-only processes may leave it unset
+    rpc_url: Optional[str] = Field(None, alias="RPC_URL")
+    ws_url: Optional[str] = Field(None, alias="WS_URL")
     database_url: str = Field(..., alias="DATABASE_URL")
+    # psycopg 3 only: executions before a statement is prepared server-side (unset disables, e.g. behind PgBouncer)
+    db_prepare_threshold: Optional[int] = Field(5, alias="DB_PREPARE_THRESHOLD")
+    database_read_urls: List[str] = Field(default_factory=list, alias="DATABASE_READ_URLS")
+    read_routing: str = Field("round_robin", alias="READ_ROUTING")
+    api_db_pool_size: int = Field(20, alias="API_DB_POOL_SIZE")
+    api_db_max_overflow: int = Field(10, alias="API_DB_MAX_OVERFLOW")
+    sync_db_pool_size: int = Field(2, alias="SYNC_DB_POOL_SIZE")
+    sync_db_max_overflow: int = Field(0, alias="SYNC_DB_MAX_OVERFLOW")
+    api_host: str = Field("0.0.0.0", alias="API_HOST")
+    api_port: int = Field(8000, alias="API_PORT")
     retry_max_attempts: int = Field(5, alias="RETRY_MAX_ATTEMPTS")
+    circuit_failure_threshold: int = Field(5, alias="CIRCUIT_FAILURE_THRESHOLD")
+    circuit_reset_seconds: float = Field(30.0, alias="CIRCUIT_RESET_SECONDS")
+    retry_budget_ratio: float = Field(0.2, alias="RETRY_BUDGET_RATIO")
+    retry_budget_capacity: float = Field(10.0, alias="RETRY_BUDGET_CAPACITY")
+    prefetch_buffer_bytes: int = Field(256 * 1024 * 1024, alias="PREFETCH_BUFFER_BYTES")
+    rpc_cache_bytes: int = Field(64 * 1024 * 1024, alias="RPC_CACHE_BYTES")
+    finality_tag: str = Field("finalized", alias="FINALITY_TAG")
+    hot_staging_enabled: bool = Field(False, alias="HOT_STAGING_ENABLED")
+    sync_mode: str = Field("full", alias="SYNC_MODE")
+    watch_addresses: List[str] = Field(default_factory=list, alias="WATCH_ADDRESSES")
+    watch_topics: List[str] = Field(default_factory=list, alias="WATCH_TOPICS")
+    header_first_range: int = Field(0, alias="HEADER_FIRST_RANGE")
+    body_download_workers: int = Field(8, alias="BODY_DOWNLOAD_WORKERS")
+    backfill_start_block: Optional[int] = Field(None, alias="BACKFILL_START_BLOCK")
+    backfill_direction: str = Field("down", alias="BACKFILL_DIRECTION")
+    backfill_workers: int = Field(4, alias="BACKFILL_WORKERS")
+    backfill_chunk_blocks: int = Field(100, alias="BACKFILL_CHUNK_BLOCKS")
+    log_range_size: int = Field(1000, alias="LOG_RANGE_SIZE")
+    log_range_target_results: int = Field(2000, alias="LOG_RANGE_TARGET_RESULTS")
+    track_token_balances: bool = Field(False, alias="TRACK_TOKEN_BALANCES")
+    track_chain_stats: bool = Field(False, alias="TRACK_CHAIN_STATS")
+    track_address_activity: bool = Field(False, alias="TRACK_ADDRESS_ACTIVITY")
+    parquet_sink_dir: Optional[str] = Field(None, alias="PARQUET_SINK_DIR")
+    parquet_partition_blocks: int = Field(100_000, alias="PARQUET_PARTITION_BLOCKS")
+    parquet_flush_blocks: int = Field(1000, alias="PARQUET_FLUSH_BLOCKS")
+    orphan_journal_blocks: int = Field(256, alias="ORPHAN_JOURNAL_BLOCKS")
+    address_cache_size: int = Field(100_000, alias="ADDRESS_CACHE_SIZE")
+    payload_offload_bytes: Optional[int] = Field(None, alias="PAYLOAD_OFFLOAD_BYTES")
+
+    @field_validator("db_prepare_threshold", "payload_offload_bytes", "backfill_start_block", mode="before")
+    @classmethod
+    def empty_threshold_disables(cls, v):
+        return None if v == "" else v
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -15,4 +62,5 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-settings = Settings()
+# Values come from the environment; mypy only sees the aliased fields as required arguments
+settings = Settings()  # type: ignore[call-arg]
@@ -1,6 +1,8 @@
 import logging
+from typing import Optional
 
-from database.repository import BlockchainRepository
+from core.sync import FinalizedReorgException
+from database.repository import DEFAULT_ORPHAN_LIMIT, BlockchainRepository
 
 logger = logging.getLogger(__name__)
 
@@ -8,25 +10,56 @@ class DatabaseService:
     def __init__(self, repository: BlockchainRepository):
         self.repo = repository
 
-    def rollback_to_block(self, target_block_number: int):
+    def rollback_to_block(
+        self,
+        target_block_number: int,
+        finalized_height: Optional[int] = None,
+        orphan_limit: int = DEFAULT_ORPHAN_LIMIT,
+    ) -> int:
         """
         Delete all blocks, transactions, and logs starting from target_block_number.
         
         Args:
             target_block_number: The first block number to be deleted.
+            finalized_height: If given, the rollback never reaches at or below this height.
+            orphan_limit: Blocks kept in the orphan journal for cheap re-application.
+
+        Returns:
+            The first block number actually deleted (after capping).
+
+        Raises:
+            FinalizedReorgException: If the capped rollback deleted nothing. The
+                conflict is then with a finalized block, and resuming would hit the
+                same reorg again.
         """
+        capped = False
+        if finalized_height is not None and target_block_number <= finalized_height:
+            logger.warning(
+                f"Rollback target {target_block_number} is finalized (finalized height {finalized_height}). "
+                f"Capping rollback at block {finalized_height + 1}"
+            )
+            target_block_number = finalized_height + 1
+            capped = True
+
         try:
             logger.info(f"Triggering rollback starting from block height {target_block_number}")
             
             # Use Raw SQL via Repository
-            self.repo.rollback_from_height(target_block_number)
+            deleted = self.repo.rollback_from_height(target_block_number, orphan_limit=orphan_limit)
             
             # Ensure the session associated with the repository is committed
             self.repo.db.commit()
             
-            logger.info(f"Successfully rolled back database to block {target_block_number - 1}")
-            
         except Exception as e:
             self.repo.db.rollback()
             logger.error(f"Error during rollback to block {target_block_number}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+        if capped and not deleted:
+            logger.critical(
+                f"Reorg conflicts with finalized block {finalized_height}; refusing to roll back finalized data"
+            )
+            # A capped rollback starts right above the finalized height
+            raise FinalizedReorgException(target_block_number, target_block_number - 1)
+        logger.info(f"Successfully rolled back database to block {target_block_number - 1}")
+        return target_block_number
\ No newline at end of file
@@ -1,34 +1,163 @@
 import logging
 import time
-from concurrent.futures import ThreadPoolExecutor
-from queue import PriorityQueue, Empty
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, Full
+from typing import Any, Deque, Iterator, List, Mapping, Optional, Sequence
+
 from sqlalchemy.orm import Session
+
+from core.block_cache import estimate_size
+from core.buffer import PrefetchBuffer
+from core.config import settings
+from core.db_service import DatabaseService
+from core.log_fetcher import AdaptiveLogFetcher
 from core.provider import BlockchainProvider
+from core.subscription import NewHeadsSubscriber
 from core.sync import IntegrityGuard, ReorgException
-from core.db_service import DatabaseService
+from database.address_dictionary import AddressDictionary
+from database.parquet_sink import ParquetSink
 from database.repository import BlockchainRepository
-from domain.schemas import BlockModel, TransactionModel, LogModel
-from domain.decoder import LogDecoder
+from domain.activity import address_postings
+from domain.decoder import LogDecoder, net_transfer_deltas
+from domain.rows import LogRow, TransactionRow
+from domain.schemas import BlockModel, TransferEvent
+from domain.stats import compute_block_stats
 
 logger = logging.getLogger(__name__)
 
+# Finality only advances once per epoch (~6.4 minutes), so there is no need to ask every block
+FINALITY_REFRESH_INTERVAL = 30
+# Filtered mode commits a log range in transactions of at most this many blocks
+LOG_RANGE_COMMIT_BLOCKS = 500
+
+
+def batch_addresses(txs: Sequence[Mapping], logs: Sequence[Mapping], postings: Sequence[Mapping]) -> set:
+    """Every address a batch's inserts will look up in the address dictionary."""
+    addresses = {address for tx in txs for address in (tx["from_address"], tx["to_address"])}
+    addresses.update(log["address"] for log in logs)
+    addresses.update(posting["address"] for posting in postings)
+    return addresses
+
 
 class SyncEngine:
-    def __init__(self, db: Session, provider: BlockchainProvider, buffer_size: int = 10):
+    def __init__(
+        self,
+        db: Session,
+        provider: BlockchainProvider,
+        buffer_size: Optional[int] = None,
+        head_subscriber: Optional[NewHeadsSubscriber] = None,
+    ):
         self.db = db
         self.provider = provider
-        self.repo = BlockchainRepository(db)
+        self.head_subscriber = head_subscriber
+        # One address dictionary for the engine's lifetime, so its LRU stays warm across batches
+        self.repo = BlockchainRepository(
+            db,
+            AddressDictionary(settings.address_cache_size),
+            payload_offload_bytes=settings.payload_offload_bytes,
+        )
         self.guard = IntegrityGuard(self.repo)
         self.db_service = DatabaseService(self.repo)
         self.decoder = LogDecoder()
         
-        # Pipelining tools
-        self.buffer_size = buffer_size
+        # Pipelining tools: prefetched blocks are bounded by estimated bytes, not count
         self.executor = ThreadPoolExecutor(max_workers=5)
-        self.block_buffer = PriorityQueue(maxsize=buffer_size)
+        self.block_buffer = PrefetchBuffer(settings.prefetch_buffer_bytes, max_items=buffer_size)
         self.is_running = False
 
-    def get_start_block(self, default_start: int = None) -> int:
+        # Finality tracking
+        self.hot_staging = settings.hot_staging_enabled
+        self.finalized_height: Optional[int] = None
+        self._finality_checked_at = 0.0
+
+        # Filtered mode: only watched logs, with header-only blocks
+        self.log_fetcher: Optional[AdaptiveLogFetcher] = None
+        if settings.sync_mode == "filtered":
+            if not settings.watch_addresses and not settings.watch_topics:
+                raise ValueError("SYNC_MODE=filtered requires WATCH_ADDRESSES or WATCH_TOPICS")
+            self.log_fetcher = AdaptiveLogFetcher(
+                provider,
+                addresses=settings.watch_addresses,
+                topics=settings.watch_topics,
+                initial_range=settings.log_range_size,
+                target_results=settings.log_range_target_results,
+            )
+        elif settings.watch_addresses or settings.watch_topics:
+            # Full mode stores every log; a watch list there would leave logs and stats partial
+            logger.warning("WATCH_ADDRESSES and WATCH_TOPICS are ignored in full sync mode")
+
+        # Full mode: verify header ranges before downloading bodies (0 keeps block-by-block sync)
+        self.header_first_range = settings.header_first_range if self.log_fetcher is None else 0
+        self.body_executor = ThreadPoolExecutor(max_workers=settings.body_download_workers)
+        # Bodies downloaded ahead of the commit cursor: enough to keep every worker busy
+        self.body_window = 2 * settings.body_download_workers
+
+        self.track_token_balances = settings.track_token_balances
+
+        # Filtered mode stores header-only blocks, so per-block totals would be partial
+        self.track_chain_stats = settings.track_chain_stats and self.log_fetcher is None
+        if settings.track_chain_stats and self.log_fetcher is not None:
+            logger.warning("TRACK_CHAIN_STATS is ignored in filtered sync mode")
+        self.track_address_activity = settings.track_address_activity
+
+        # Heights at or below this may be restored from the orphan journal after a reorg
+        self.orphan_limit = settings.orphan_journal_blocks
+        self.orphan_ceiling: Optional[int] = None
+        self.orphans_restored = 0
+
+        # Optional columnar copy of every committed batch
+        self.parquet_sink: Optional[ParquetSink] = None
+        if settings.parquet_sink_dir:
+            self.parquet_sink = ParquetSink(
+                settings.parquet_sink_dir,
+                partition_blocks=settings.parquet_partition_blocks,
+                flush_blocks=settings.parquet_flush_blocks,
+            )
+
+    def refresh_finality(self, force: bool = False) -> Optional[int]:
+        """
+        Track the node's finalized height and promote staged blocks that became final.
+        """
+        now = time.monotonic()
+        if not force and now - self._finality_checked_at < FINALITY_REFRESH_INTERVAL:
+            return self.finalized_height
+        self._finality_checked_at = now
+
+        try:
+            finalized = self.provider.get_finalized_block_number()
+        except Exception as e:
+            logger.warning(f"Could not fetch finalized block: {e}")
+            return self.finalized_height
+
+        if self.finalized_height is None or finalized > self.finalized_height:
+            self.finalized_height = finalized
+            self.guard.finalized_height = finalized
+            logger.debug(f"Finalized height advanced to {finalized}")
+            if self.hot_staging:
+                self.repo.promote_finalized(finalized)
+            if self.track_token_balances:
+                self.repo.prune_balance_journal(finalized)
+            if self.hot_staging or self.track_token_balances:
+                self.db.commit()
+        return self.finalized_height
+
+    def is_staged(self, block_number: int) -> bool:
+        """Whether a block should go to the hot staging tables instead of the canonical ones."""
+        if not self.hot_staging:
+            return False
+        return self.finalized_height is None or block_number > self.finalized_height
+
+    def wait_for_new_head(self, poll_interval: float):
+        """
+        Wait at the tip: wake on a newHeads notification when subscribed, otherwise poll.
+        """
+        if self.head_subscriber is not None and self.head_subscriber.connected:
+            self.head_subscriber.wait_for_head(timeout=poll_interval)
+        else:
+            time.sleep(poll_interval)
+
+    def get_start_block(self, default_start: Optional[int] = None) -> int:
         """Determine where to start syncing."""
         latest_in_db = self.repo.get_latest_block()
         if latest_in_db:
@@ -46,70 +175,336 @@ class SyncEngine:
         """
         Worker task: Fetch block + logs in parallel and validate Pydantic models.
         """
-        # 1. Parallel RPC fetch for metadata and logs
+        # 1. RPC fetch for metadata and logs
         with ThreadPoolExecutor(max_workers=2) as inner_exec:
             f_block = inner_exec.submit(self.provider.get_block, block_number, full_transactions=True)
             f_logs = inner_exec.submit(self.provider.get_logs, {"fromBlock": block_number, "toBlock": block_number})
-            
+
             raw_block = f_block.result()
             raw_logs = f_logs.result()
 
-        # 2. Pydantic Validation & Serialization
+        return self._process_block(block_number, raw_block, raw_logs)
+
+    def fetch_block_body(self, header: BlockModel) -> dict:
+        """
+        Header-first worker task: download the body and logs of an already verified header.
+
+        Both are requested by block hash, so they belong to the verified chain even
+        if the node reorgs meanwhile.
+        """
+        raw_block = self.provider.get_block(header.hash, full_transactions=True)
+        raw_logs = self.provider.get_logs({"blockHash": header.hash})
+        return self._process_block(header.number, raw_block, raw_logs)
+
+    def _process_block(self, block_number: int, raw_block: Mapping, raw_logs: List[Any]) -> dict:
+        """Validate a fetched block and derive everything the write path needs."""
         block_model = BlockModel.model_validate(dict(raw_block))
         
-        txs_data = [
-            TransactionModel.model_validate(dict(tx)).model_dump(by_alias=False)
-            for tx in raw_block.get("transactions", [])
-        ]
-        
-        logs_data = []
-        for log in raw_logs:
-            try:
-                logs_data.append(LogModel.model_validate(dict(log)).model_dump(by_alias=False))
-            except Exception:
-                continue
+        # Rows are built once from the payload and bound directly by the repository
+        txs_data = [TransactionRow.from_rpc(tx) for tx in raw_block.get("transactions", [])]
+        logs_data = self._validate_logs(raw_logs)
+        transfers = self._decode_transfers(logs_data)
 
         return {
             "block_number": block_number,
+            # What the block holds while it waits in the prefetch buffer (rows dominate; the header is small)
+            "size_bytes": estimate_size(txs_data) + estimate_size(logs_data),
             "block_model": block_model,
             "txs_data": txs_data,
-            "logs_data": logs_data
+            "logs_data": logs_data,
+            "transfers": transfers,
+            "balance_deltas": net_transfer_deltas(transfers) if self.track_token_balances else {},
+            "block_stats": compute_block_stats(block_model, txs_data, logs_data) if self.track_chain_stats else None,
+            "address_postings": address_postings(txs_data, logs_data, transfers) if self.track_address_activity else [],
         }
 
+    def _validate_logs(self, raw_logs: List[Any]) -> List[LogRow]:
+        logs_data = []
+        for log in raw_logs:
+            try:
+                logs_data.append(LogRow.from_rpc(log))
+            except Exception:
+                continue
+        return logs_data
+
+    def _decode_transfers(self, logs_data: Sequence[Mapping]) -> List[TransferEvent]:
+        """ERC-20 transfers in a block's logs, decoded only when balances, activity or the Parquet sink need them."""
+        if not self.track_token_balances and not self.track_address_activity and self.parquet_sink is None:
+            return []
+        return [t for t in (self.decoder.decode_transfer_row(log) for log in logs_data) if t]
+
+    def _sink_batch(
+        self, blocks: List[BlockModel], txs: Sequence[Mapping], logs: Sequence[Mapping], transfers: List[TransferEvent]
+    ):
+        """Hand a committed batch to the Parquet sink, if enabled."""
+        if self.parquet_sink is None:
+            return
+        self.parquet_sink.write_batch(
+            [b.model_dump() for b in blocks], txs, logs, [t.model_dump() for t in transfers]
+        )
+
+    def sync_log_range(self, start_height: int, rpc_latest: int) -> int:
+        """
+        Filtered mode: index one adaptive eth_getLogs range.
+
+        Headers are fetched first, in JSON-RPC batches, and their parent-hash chain
+        is verified before any logs are requested. Logs and transactions must then
+        belong to those headers. Blocks are stored header-only; only the
+        transactions referenced by watched logs are fetched. The range commits in
+        chunks of LOG_RANGE_COMMIT_BLOCKS blocks. Returns the next height to sync.
+        """
+        log_fetcher = self.log_fetcher
+        if log_fetcher is None:
+            raise ValueError("sync_log_range requires SYNC_MODE=filtered")
+        start, end = log_fetcher.next_range(start_height, rpc_latest)
+        headers = [BlockModel.model_validate(dict(h)) for h in self.provider.get_headers(start, end)]
+        headers = self.guard.verify_header_chain(headers)
+        end = headers[-1].number
+        hashes = {header.number: header.hash for header in headers}
+
+        raw_logs = log_fetcher.fetch(start, end)
+        logs = self._logs_on_chain(self._validate_logs(raw_logs), hashes, log_fetcher.watch_params)
+        tx_blocks = {log.transaction_hash: log.block_number for log in logs}
+        txs = [TransactionRow.from_rpc(tx) for tx in self.executor.map(self.provider.get_transaction, list(tx_blocks))]
+
+        # A transaction outside its log's verified block means the node's chain moved on; keep the prefix before it
+        stale = [tx_blocks[tx.hash] for tx in txs if tx.block_hash != hashes[tx_blocks[tx.hash]]]
+        if stale:
+            cut = min(stale)
+            logger.warning(f"Transactions in block {cut} no longer match its verified header. Keeping blocks below it.")
+            self.provider.invalidate_from(cut)
+            headers = [header for header in headers if header.number < cut]
+            if not headers:
+                return start
+            end = headers[-1].number
+            logs = [log for log in logs if log.block_number < cut]
+            txs = [tx for tx in txs if tx_blocks[tx.hash] < cut]
+
+        txs_by_block, logs_by_block = defaultdict(list), defaultdict(list)
+        for tx in txs:
+            txs_by_block[tx.block_number].append(tx)
+        for log in logs:
+            logs_by_block[log.block_number].append(log)
+        for i in range(0, len(headers), LOG_RANGE_COMMIT_BLOCKS):
+            self._commit_log_chunk(headers[i:i + LOG_RANGE_COMMIT_BLOCKS], txs_by_block, logs_by_block)
+        logger.info(f"Indexed blocks {start}-{end} (filtered) | {len(txs)} txs | {len(logs)} logs")
+        return end + 1
+
+    def _logs_on_chain(self, logs: List[LogRow], hashes: Mapping[int, str], watch_params: Mapping) -> List[LogRow]:
+        """
+        Logs of the verified headers only.
+
+        A block whose logs carry another hash was reorged after its header was
+        fetched; its logs are requested again by the verified hash.
+        """
+        stale = sorted({log.block_number for log in logs if hashes.get(log.block_number) != log.block_hash})
+        if not stale:
+            return logs
+        logger.warning(f"Logs of {len(stale)} blocks do not match their verified headers. Refetching by hash.")
+        logs = [log for log in logs if log.block_number not in stale]
+        for block_number in stale:
+            params = {"blockHash": hashes[block_number], **watch_params}
+            raw_logs = self.provider.get_logs(params)
+            logs.extend(self._validate_logs(raw_logs))
+        return sorted(logs, key=lambda log: (log.block_number, log.log_index))
+
+    def _commit_log_chunk(self, headers: List[BlockModel], txs_by_block: Mapping, logs_by_block: Mapping):
+        """Write a verified run of filtered-mode blocks in one transaction."""
+        txs = [tx for header in headers for tx in txs_by_block.get(header.number, [])]
+        logs = [log for header in headers for log in logs_by_block.get(header.number, [])]
+        transfers = self._decode_transfers(logs)
+        transfers_by_block = defaultdict(list)
+        for transfer in transfers:
+            transfers_by_block[transfer.block_number].append(transfer)
+
+        balance_deltas, postings = {}, []
+        for header in headers:
+            block_transfers = transfers_by_block[header.number]
+            if self.track_token_balances and block_transfers:
+                balance_deltas[(header.number, header.hash)] = net_transfer_deltas(block_transfers)
+            if self.track_address_activity:
+                postings.extend(
+                    address_postings(
+                        txs_by_block.get(header.number, []), logs_by_block.get(header.number, []), block_transfers
+                    )
+                )
+
+        with self.repo.pipeline(batch_addresses(txs, logs, postings)):
+            for header in headers:
+                staging = self.is_staged(header.number)
+                self.repo.insert_blocks_bulk([header], staging=staging)
+                if txs_by_block.get(header.number):
+                    self.repo.insert_transactions_bulk(txs_by_block[header.number], staging=staging)
+                if logs_by_block.get(header.number):
+                    self.repo.insert_logs_bulk(logs_by_block[header.number], staging=staging)
+            if balance_deltas:
+                self.repo.apply_balance_deltas(balance_deltas)
+            self.repo.insert_address_activity(postings)
+        # Merging ranges reads sync_ranges, so it runs once the pipeline has drained
+        self.repo.mark_synced(headers[0].number, headers[-1].number)
+        self.db.commit()
+        self._sink_batch(headers, txs, logs, transfers)
+
+    def commit_block(self, data: dict):
+        """Write one processed block (and its derived rows) in a single transaction."""
+        block_number = data["block_number"]
+        staging = self.is_staged(block_number)
+        addresses = batch_addresses(data["txs_data"], data["logs_data"], data["address_postings"])
+        with self.repo.pipeline(addresses):
+            self.repo.insert_blocks_bulk([data["block_model"]], staging=staging)
+            if data["txs_data"]:
+                self.repo.insert_transactions_bulk(data["txs_data"], staging=staging)
+            if data["logs_data"]:
+                self.repo.insert_logs_bulk(data["logs_data"], staging=staging)
+            if data["balance_deltas"]:
+                self.repo.apply_balance_deltas({(block_number, data["block_model"].hash): data["balance_deltas"]})
+            if data["block_stats"]:
+                self.repo.apply_block_stats([data["block_stats"]])
+            if data["address_postings"]:
+                self.repo.insert_address_activity(data["address_postings"])
+        # Merging ranges reads sync_ranges, so it runs once the pipeline has drained
+        self.repo.mark_synced(block_number, block_number)
+
+        self.db.commit()
+        self._sink_batch([data["block_model"]], data["txs_data"], data["logs_data"], data["transfers"])
+        logger.info(f"Indexed block {block_number} | {len(data['txs_data'])} txs | {len(data['logs_data'])} logs")
+
+    def sync_header_range(self, start_height: int, rpc_latest: int) -> int:
+        """
+        Header-first mode: verify a range of headers, then download bodies in parallel.
+
+        Headers are fetched in JSON-RPC batches and their parent-hash chain is
+        checked in memory, so a reorg is detected before any body work. Bodies and
+        logs download out of order within a bounded window; blocks still commit in
+        order, one transaction each. Returns the next height to sync.
+        """
+        end = min(start_height + self.header_first_range - 1, rpc_latest)
+        headers = [BlockModel.model_validate(dict(h)) for h in self.provider.get_headers(start_height, end)]
+        headers = self.guard.verify_header_chain(headers)
+
+        pending = iter(headers)
+        window: Deque[Future] = deque()
+        try:
+            while True:
+                self._fill_body_window(window, pending)
+                if not window:
+                    break
+                self.commit_block(window.popleft().result())
+        finally:
+            for future in window:
+                future.cancel()
+        return start_height + len(headers)
+
+    def _fill_body_window(self, window: Deque[Future], pending: Iterator[BlockModel]):
+        """
+        Submit body downloads while the window has room.
+
+        At most `body_window` downloads are in flight or waiting to commit, and
+        none are added while the finished ones already hold the prefetch byte
+        budget, so a slow block at the head of the window cannot let the rest of
+        the range pile up in memory.
+        """
+        while len(window) < self.body_window:
+            held = sum(f.result()["size_bytes"] for f in window if f.done() and f.exception() is None)
+            if window and held >= self.block_buffer.max_bytes:
+                return
+            header = next(pending, None)
+            if header is None:
+                return
+            window.append(self.body_executor.submit(self.fetch_block_body, header))
+
+    def restore_orphaned_block(self, block_number: int) -> bool:
+        """
+        After a reorg, re-apply a block from the orphan journal if the chain flipped back to it.
+
+        Costs a single header request instead of refetching the block and its logs.
+        The first height whose canonical hash is not journaled ends the attempt: its
+        descendants cannot be in the journal either.
+        """
+        if self.orphan_ceiling is None or block_number > self.orphan_ceiling:
+            return False
+
+        block_model = BlockModel.model_validate(
+            dict(self.provider.get_block(block_number, full_transactions=False))
+        )
+        self.guard.validate_block_continuity(block_model)
+        if not self.repo.restore_orphaned_block(block_model.hash, staging=self.is_staged(block_number)):
+            self.db.rollback()
+            self.orphan_ceiling = None
+            return False
+
+        txs = [row for part in self.repo.iter_transactions(block_number, block_number) for row in part]
+        logs = [row for part in self.repo.iter_logs(block_number, block_number) for row in part]
+        transfers = self._decode_transfers(logs)
+        if self.track_token_balances and transfers:
+            self.repo.apply_balance_deltas({(block_number, block_model.hash): net_transfer_deltas(transfers)})
+        if self.track_chain_stats:
+            self.repo.apply_block_stats([compute_block_stats(block_model, txs, logs)])
+        if self.track_address_activity:
+            self.repo.insert_address_activity(address_postings(txs, logs, transfers))
+        self.repo.mark_synced(block_number, block_number)
+        self.db.commit()
+        self._sink_batch([block_model], txs, logs, transfers)
+        self.orphans_restored += 1
+        logger.info(f"Restored block {block_number} from the orphan journal | {len(txs)} txs | {len(logs)} logs")
+        return True
+
     def _refill_buffer(self, start_height: int, rpc_latest: int):
         """Background task to keep the pre-fetch buffer full."""
         for bn in range(start_height, rpc_latest + 1):
             if not self.is_running:
                 break
             try:
-                # This will block if the buffer is full, effectively throttling the pre-fetcher
-                if bn not in [item[0] for item in self.block_buffer.queue]:
+                if bn not in self.block_buffer:
                     processed = self.fetch_and_validate_block(bn)
-                    self.block_buffer.put((bn, processed))
+                    # Blocks while the byte budget is used up, throttling the pre-fetcher
+                    while self.is_running:
+                        try:
+                            self.block_buffer.put(bn, processed, processed["size_bytes"], timeout=1)
+                            break
+                        except Full:
+                            continue
             except Exception as e:
                 logger.error(f"Pre-fetch error for block {bn}: {e}")
                 time.sleep(1) # Wait before retry
 
     def run(self, poll_interval: int = 5):
         """Main indexing loop: Pipelined and High-Speed."""
+        if self.repo.seed_sync_ranges():
+            self.db.commit()
         current_height = self.get_start_block()
         logger.info(f"Starting PIPELINED sync engine from block {current_height}")
         self.is_running = True
+        if self.parquet_sink is not None and current_height > 0:
+            self.parquet_sink.catch_up(self.repo, self.decoder, current_height - 1)
+        if self.orphan_limit > 0:
+            self.orphan_ceiling = self.repo.get_orphan_ceiling()
 
         while self.is_running:
             try:
                 rpc_latest = self.provider.w3.eth.block_number
+                self.refresh_finality()
 
-                if current_height <= rpc_latest:
+                if current_height <= rpc_latest and self.restore_orphaned_block(current_height):
+                    current_height += 1
+                elif current_height <= rpc_latest and self.log_fetcher is not None:
+                    current_height = self.sync_log_range(current_height, rpc_latest)
+                elif current_height <= rpc_latest and self.header_first_range > 0:
+                    current_height = self.sync_header_range(current_height, rpc_latest)
+                elif current_height <= rpc_latest:
                     # Greedily process blocks until we reach rpc_latest
                     while current_height <= rpc_latest:
+                        if self.restore_orphaned_block(current_height):
+                            current_height += 1
+                            continue
+
                         # 1. Fetch data (check buffer first, then fall back to direct fetch)
                         try:
                             # Try to get from buffer with a tiny timeout
                             bn, data = self.block_buffer.get(timeout=0.1)
                             if bn != current_height:
                                 # Wrong block in buffer, discard and fetch directly
-                                self.block_buffer = PriorityQueue(maxsize=self.buffer_size)
+                                self.block_buffer.clear()
                                 data = self.fetch_and_validate_block(current_height)
                         except Empty:
                             data = self.fetch_and_validate_block(current_height)
@@ -121,32 +516,34 @@ class SyncEngine:
                         self.guard.validate_block_continuity(data["block_model"])
 
                         # 4. Atomic Database Write
-                        self.repo.insert_blocks_bulk([data["block_model"]])
-                        if data["txs_data"]:
-                            self.repo.insert_transactions_bulk(data["txs_data"])
-                        if data["logs_data"]:
-                            self.repo.insert_logs_bulk(data["logs_data"])
-                            
-                        self.db.commit()
-                        logger.info(f"Indexed block {current_height} | {len(data['txs_data'])} txs | {len(data['logs_data'])} logs")
+                        self.commit_block(data)
                         current_height += 1
                 else:
                     # We are at the tip, wait for the next block
                     logger.debug(f"At chain tip. Waiting...")
-                    time.sleep(poll_interval)
+                    self.wait_for_new_head(poll_interval)
 
             except ReorgException as e:
                 self.db.rollback()
                 logger.warning(f"REORG detected at {e.block_number}. Resetting pipeline...")
-                self.db_service.rollback_to_block(e.block_number - 1)
+                rolled_back_to = self.db_service.rollback_to_block(
+                    e.block_number - 1, finalized_height=self.finalized_height, orphan_limit=self.orphan_limit
+                )
+                if self.orphan_limit > 0:
+                    self.orphan_ceiling = self.repo.get_orphan_ceiling()
+                # Cached lookups by number above the fork point may belong to the old branch
+                self.provider.invalidate_from(rolled_back_to)
+                if self.parquet_sink is not None:
+                    self.parquet_sink.rollback_from_height(rolled_back_to)
                 # Clear buffer on reorg
-                while not self.block_buffer.empty():
-                    try: self.block_buffer.get_nowait()
-                    except Empty: break
+                self.block_buffer.clear()
                 current_height = self.get_start_block()
                 
             except Exception as e:
                 self.db.rollback()
                 logger.error(f"Sync loop error: {e}")
                 time.sleep(2)
-                current_height = self.get_start_block()
\ No newline at end of file
+                current_height = self.get_start_block()
+
+        if self.parquet_sink is not None:
+            self.parquet_sink.flush()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from web3 import Web3
+
+from core.provider import BlockchainProvider, LogRangeTooLargeError
+
+logger = logging.getLogger(__name__)
+
+# Successes near the rejected span after which it is forgotten and growth may probe again.
+# Result limits depend on log density, so a span refused in a hot region can pass later.
+REJECTED_SPAN_RESET_SUCCESSES = 8
+
+
+def watch_filter_params(addresses: Sequence[str] = (), topics: Sequence[str] = ()) -> Dict[str, Any]:
+    """eth_getLogs filter fields for a watch list of contract addresses and topic0s."""
+    params: Dict[str, Any] = {}
+    if addresses:
+        params["address"] = [Web3.to_checksum_address(a) for a in addresses]
+    if topics:
+        params["topics"] = [[t.lower() for t in topics]]
+    return params
+
+
+class AdaptiveLogFetcher:
+    """
+    Fetches watched logs over wide block ranges with eth_getLogs.
+
+    Ranges the node refuses are bisected, and the next range size is tuned from
+    the result density of recent ranges so each call returns ~`target_results` logs.
+    Growth stays below the smallest refused span until REJECTED_SPAN_RESET_SUCCESSES
+    ranges wider than half of it have succeeded in a row.
+    """
+
+    def __init__(
+        self,
+        provider: BlockchainProvider,
+        addresses: Sequence[str] = (),
+        topics: Sequence[str] = (),
+        initial_range: int = 1000,
+        target_results: int = 2000,
+        min_range: int = 1,
+        max_range: int = 100_000,
+    ):
+        self.provider = provider
+        self.watch_params = watch_filter_params(addresses, topics)
+        self.range_size = initial_range
+        self.target_results = target_results
+        self.min_range = min_range
+        self.max_range = max_range
+        # Exponentially weighted logs-per-block of recent ranges
+        self.density: Optional[float] = None
+        # Smallest span the node has rejected; growth stays below it
+        self.rejected_span: Optional[int] = None
+        self.successes_near_rejected = 0
+
+    def filter_params(self, from_block: int, to_block: int) -> Dict[str, Any]:
+        return {"fromBlock": from_block, "toBlock": to_block, **self.watch_params}
+
+    def next_range(self, start: int, latest: int) -> Tuple[int, int]:
+        return start, min(start + self.range_size - 1, latest)
+
+    def fetch(self, from_block: int, to_block: int) -> List[Any]:
+        """
+        Fetch all watched logs in [from_block, to_block], splitting the range on size errors.
+        """
+        try:
+            logs = self.provider.get_logs(self.filter_params(from_block, to_block))
+        except LogRangeTooLargeError:
+            if from_block == to_block:
+                raise
+            span = to_block - from_block + 1
+            if self.rejected_span is None or span < self.rejected_span:
+                self.rejected_span = span
+            self.successes_near_rejected = 0
+            mid = (from_block + to_block) // 2
+            self.range_size = max(self.min_range, mid - from_block + 1)
+            logger.info(f"Log range {from_block}-{to_block} too large. Splitting at {mid}")
+            return self.fetch(from_block, mid) + self.fetch(mid + 1, to_block)
+
+        self._observe(to_block - from_block + 1, len(logs))
+        return logs
+
+    def _observe(self, span: int, result_count: int):
+        # Bisected halves of a refused range are at most half its span and do not count
+        if self.rejected_span is not None and span > self.rejected_span // 2:
+            self.successes_near_rejected += 1
+            if self.successes_near_rejected >= REJECTED_SPAN_RESET_SUCCESSES:
+                logger.debug(f"Forgetting rejected log range span {self.rejected_span}")
+                self.rejected_span = None
+                self.successes_near_rejected = 0
+        density = result_count / span
+        self.density = density if self.density is None else 0.5 * self.density + 0.5 * density
+        if self.density > 0:
+            ideal = int(self.target_results / self.density)
+        else:
+            ideal = self.range_size * 2
+        # Grow at most 2x per step so one empty range cannot jump straight into a hot region
+        ideal = min(ideal, self.range_size * 2)
+        if self.rejected_span is not None:
+            ideal = min(ideal, self.rejected_span - 1)
+        self.range_size = max(self.min_range, min(self.max_range, ideal))
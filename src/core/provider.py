@@ -1,83 +1,308 @@
 import logging
-from typing import Any, Dict, Optional, Union
-
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+from tenacity import (before_sleep_log, retry, stop_after_attempt,
+                      wait_exponential)
+from tenacity.retry import retry_base
 from web3 import Web3
-from web3.exceptions import Web3Exception
+from web3.exceptions import (BlockNotFound, TransactionNotFound, Web3Exception,
+                             Web3RPCError)
 from web3.types import BlockData, TxData
 
+from core.block_cache import BlockCache, hash_key
 from core.config import settings
+from core.resilience import (PERMANENT, CircuitBreaker, RetryBudget,
+                             classify_error, is_retryable, is_throttling,
+                             rpc_error_code)
 
 logger = logging.getLogger(__name__)
 
+# Known provider messages for an eth_getLogs range with too many results or blocks.
+# Only specific phrases: an unrelated error (e.g. an invalid range) must not be bisected
+LOG_RANGE_TOO_LARGE_MARKERS = (
+    "too many results",
+    "query returned more than",
+    "query exceeds max results",
+    "response size exceeded",
+    "response is too big",
+    "maximum block range",
+    "block range is too wide",
+    "block range too large",
+    "exceeds maximum range",
+    "eth_getlogs is limited to",
+)
+# EIP-1474 "limit exceeded"; throttling reuses it and is ruled out by message first
+LOG_RANGE_TOO_LARGE_CODE = -32005
+
+
+class LogRangeTooLargeError(Web3Exception):
+    """Raised when the node refuses an eth_getLogs range; retrying the same range is pointless."""
+
+
+def is_log_range_too_large(error: Exception) -> bool:
+    """Whether the node refused the range size. Throttling is checked first: it needs backoff, not a split."""
+    if is_throttling(error):
+        return False
+    if isinstance(error, Web3RPCError) and rpc_error_code(error) == LOG_RANGE_TOO_LARGE_CODE:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in LOG_RANGE_TOO_LARGE_MARKERS)
+
+
+class retry_if_transient(retry_base):
+    """
+    Retry transport and throttling errors while the provider's budget for `method` lasts.
+
+    Permanent errors (and `permanent` types) are raised on the first attempt.
+    """
+
+    def __init__(self, method: str, permanent: tuple = ()):
+        self.method = method
+        self.permanent = permanent
+
+    def __call__(self, retry_state) -> bool:
+        if not retry_state.outcome.failed:
+            return False
+        error = retry_state.outcome.exception()
+        if not is_retryable(error, self.permanent):
+            return False
+        budget = retry_state.args[0].retry_budgets[self.method]
+        if not budget.try_withdraw():
+            logger.warning(f"Retry budget for {self.method} exhausted; not retrying {type(error).__name__}")
+            return False
+        return True
+
+
+def _deposit_retry_budget(method: str):
+    def before(retry_state):
+        if retry_state.attempt_number == 1:
+            retry_state.args[0].retry_budgets[method].deposit()
+    return before
+
+
+def rpc_retry(method: str, permanent: tuple = ()):
+    """Exponential-backoff retry for a BlockchainProvider method, gated by error class and budget."""
+    return retry(
+        retry=retry_if_transient(method, permanent),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        stop=stop_after_attempt(settings.retry_max_attempts),
+        before=_deposit_retry_budget(method),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+
+
+def _is_block_hash(identifier: Any) -> bool:
+    if isinstance(identifier, (bytes, bytearray)):
+        return len(identifier) == 32
+    return isinstance(identifier, str) and len(identifier) == 66 and identifier.startswith("0x")
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (bytes, bytearray)):
+        return hash_key(value)
+    return value.lower() if isinstance(value, str) else value
+
+
+def logs_cache_key(filter_params: Dict[str, Any]) -> Tuple[Optional[Hashable], Optional[int]]:
+    """
+    (cache key, height) for an eth_getLogs filter, or (None, None) when it should not be cached.
+
+    Filters scoped to a block hash never go stale; numeric ranges are invalidated by
+    a reorg at or below their upper bound. Tags such as "latest" are not cached.
+    """
+    key = ("logs", tuple(sorted((name, _freeze(value)) for name, value in filter_params.items())))
+    if "blockHash" in filter_params:
+        return key, None
+    from_block, to_block = filter_params.get("fromBlock"), filter_params.get("toBlock")
+    if isinstance(from_block, int) and isinstance(to_block, int):
+        return key, to_block
+    return None, None
+
+
+RPC_METHODS = ("get_block", "get_headers", "get_transaction", "get_logs", "get_finalized_block_number")
+
+# Requests per JSON-RPC batch; public nodes commonly reject batches above 100
+MAX_BATCH_REQUESTS = 100
+
+
 class BlockchainProvider:
-    def __init__(self, rpc_url: Optional[str] = None):
+    def __init__(self, rpc_url: Optional[str] = None, cache_bytes: Optional[int] = None):
         self.rpc_url = rpc_url or settings.rpc_url
+        if not self.rpc_url:
+            raise ValueError("RPC_URL must be set to run the sync worker")
         # Add a 30 second timeout to prevent infinite hanging
         self.w3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={'timeout': 30}))
-        
+
+        # Blocks and logs re-requested after pipeline resets and reorgs are served from memory
+        cache_bytes = settings.rpc_cache_bytes if cache_bytes is None else cache_bytes
+        self.cache: Optional[BlockCache] = BlockCache(cache_bytes) if cache_bytes > 0 else None
+
+        # One breaker per endpoint: a dead node fails fast instead of every call backing off
+        self.breaker = CircuitBreaker(
+            self.rpc_url, settings.circuit_failure_threshold, settings.circuit_reset_seconds
+        )
+        self.retry_budgets: Dict[str, RetryBudget] = {
+            method: RetryBudget(settings.retry_budget_ratio, settings.retry_budget_capacity)
+            for method in RPC_METHODS
+        }
+
+    def invalidate_from(self, block_number: int):
+        """Drop number-keyed cache entries at or above a reorged height."""
+        if self.cache is not None:
+            dropped = self.cache.invalidate_from(block_number)
+            logger.info(f"Invalidated {dropped} cached RPC lookups from block {block_number} | {self.cache.stats()}")
+
     def is_connected(self) -> bool:
         return self.w3.is_connected()
 
-    @retry(
-        retry=retry_if_exception_type((Web3Exception, ConnectionError, Exception)),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        stop=stop_after_attempt(settings.retry_max_attempts),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
-    def get_block(self, block_identifier: Union[int, str], full_transactions: bool = False) -> BlockData:
+    def _call(self, fn, *args):
+        """Run one RPC request through the circuit breaker."""
+        self.breaker.before_call()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            # A permanent error is still an answer: the endpoint itself is healthy
+            if is_log_range_too_large(e) or classify_error(e) == PERMANENT:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    @rpc_retry("get_block")
+    def _fetch_block(self, block_identifier: Union[int, str], full_transactions: bool = False) -> BlockData:
         """
         Fetch a block by number or hash with retry logic.
         """
         try:
-            block = self.w3.eth.get_block(block_identifier, full_transactions)
+            block = self._call(self.w3.eth.get_block, block_identifier, full_transactions)
             if not block:
-                raise Web3Exception(f"Block {block_identifier} not found")
+                raise BlockNotFound(f"Block {block_identifier} not found")
             return block
         except Exception as e:
             logger.error(f"Error fetching block {block_identifier}: {e}")
             raise
 
-    @retry(
-        retry=retry_if_exception_type((Web3Exception, ConnectionError, Exception)),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        stop=stop_after_attempt(settings.retry_max_attempts),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
+    @rpc_retry("get_headers")
+    def _fetch_headers(self, block_numbers: List[int]) -> List[BlockData]:
+        """
+        Fetch header-only blocks in a single JSON-RPC batch with retry logic.
+        """
+        def send_batch():
+            with self.w3.batch_requests() as batch:
+                for number in block_numbers:
+                    batch.add(self.w3.eth.get_block(number, False))
+                return batch.execute()
+
+        try:
+            headers = self._call(send_batch)
+            for number, header in zip(block_numbers, headers):
+                if not header:
+                    raise BlockNotFound(f"Block {number} not found")
+            return headers
+        except Exception as e:
+            logger.error(f"Error fetching headers {block_numbers[0]}-{block_numbers[-1]}: {e}")
+            raise
+
+    def get_headers(self, start: int, end: int) -> List[BlockData]:
+        """
+        Header-only blocks start..end (inclusive), batched, from the cache when possible.
+        """
+        numbers = range(start, end + 1)
+        headers = {}
+        if self.cache is not None:
+            for number in numbers:
+                header = self.cache.get_block(number, False)
+                if header is not None:
+                    headers[number] = header
+        missing = [number for number in numbers if number not in headers]
+        for i in range(0, len(missing), MAX_BATCH_REQUESTS):
+            for header in self._fetch_headers(missing[i:i + MAX_BATCH_REQUESTS]):
+                headers[header["number"]] = header
+                if self.cache is not None:
+                    self.cache.put_block(header, False)
+        return [headers[number] for number in numbers]
+
+    @rpc_retry("get_transaction")
     def get_transaction(self, tx_hash: str) -> TxData:
         """
         Fetch a transaction by hash with retry logic.
         """
         try:
-            tx = self.w3.eth.get_transaction(tx_hash)
+            tx = self._call(self.w3.eth.get_transaction, tx_hash)
             if not tx:
-                raise Web3Exception(f"Transaction {tx_hash} not found")
+                raise TransactionNotFound(f"Transaction {tx_hash} not found")
             return tx
         except Exception as e:
             logger.error(f"Error fetching transaction {tx_hash}: {e}")
             raise
 
-    @retry(
-        retry=retry_if_exception_type((Web3Exception, ConnectionError, Exception)),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        stop=stop_after_attempt(settings.retry_max_attempts),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
-    def get_logs(self, filter_params: Dict[str, Any]) -> list:
+    @rpc_retry("get_logs", permanent=(LogRangeTooLargeError,))
+    def _fetch_logs(self, filter_params: Dict[str, Any]) -> list:
         """
         Fetch logs with retry logic.
+
+        Raises:
+            LogRangeTooLargeError: If the node rejects the range size (not retried).
         """
         try:
-            return self.w3.eth.get_logs(filter_params)
+            return self._call(self.w3.eth.get_logs, filter_params)
         except Exception as e:
+            if is_log_range_too_large(e):
+                raise LogRangeTooLargeError(str(e)) from e
             logger.error(f"Error fetching logs with params {filter_params}: {e}")
             raise
+
+    def get_block(self, block_identifier: Union[int, str], full_transactions: bool = False) -> BlockData:
+        """
+        Fetch a block by number or hash, from the cache when possible.
+
+        Tags ("latest", "finalized", ...) always go to the node.
+        """
+        cacheable = isinstance(block_identifier, int) or _is_block_hash(block_identifier)
+        cache = self.cache if cacheable else None
+        if cache is not None:
+            block = cache.get_block(block_identifier, full_transactions)
+            if block is not None:
+                return block
+        block = self._fetch_block(block_identifier, full_transactions)
+        if cache is not None:
+            cache.put_block(block, full_transactions)
+        return block
+
+    def get_logs(self, filter_params: Dict[str, Any]) -> list:
+        """
+        Fetch logs, from the cache when the filter is scoped to a block hash or a numeric range.
+
+        Raises:
+            LogRangeTooLargeError: If the node rejects the range size (not retried).
+        """
+        cache = self.cache
+        key, height = logs_cache_key(filter_params) if cache is not None else (None, None)
+        if cache is not None and key is not None:
+            logs = cache.get(key)
+            if logs is not None:
+                return logs
+        logs = self._fetch_logs(filter_params)
+        if cache is not None and key is not None:
+            cache.put(key, logs, height)
+        return logs
+
+    @rpc_retry("get_finalized_block_number")
+    def get_finalized_block_number(self, tag: Optional[str] = None) -> int:
+        """
+        Fetch the height of the node's "finalized" (or "safe") block with retry logic.
+        """
+        tag = tag or settings.finality_tag
+        try:
+            block = self._call(self.w3.eth.get_block, tag)
+            if not block:
+                raise BlockNotFound(f"Block tag {tag} not supported by node")
+            return block["number"]
+        except Exception as e:
+            logger.error(f"Error fetching {tag} block: {e}")
+            raise
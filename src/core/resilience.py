@@ -0,0 +1,192 @@
+"""
+Failure handling for RPC calls: error classification, a circuit breaker and retry budgets.
+
+Only transport and throttling errors are worth retrying. Permanent errors (a block
+the node does not have yet, invalid params, a decoding bug) fail fast instead of
+stalling the pipeline for the whole backoff schedule.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+import requests
+from web3.exceptions import (BadResponseFormat, BlockNotFound, InvalidAddress,
+                             MethodUnavailable, ProviderConnectionError,
+                             TimeExhausted, TooManyRequests,
+                             TransactionNotFound, Web3Exception, Web3RPCError,
+                             Web3ValidationError)
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT = "transport"
+THROTTLED = "throttled"
+PERMANENT = "permanent"
+
+# JSON-RPC error codes for malformed requests: retrying the same call cannot succeed
+INVALID_REQUEST_CODES = {-32600, -32601, -32602}
+THROTTLING_CODES = {429, -32005}
+THROTTLING_MARKERS = (
+    "rate limit", "too many requests", "capacity exceeded", "exceeded the quota", "compute units",
+)
+# Nodes answer with these while a block is not available (yet) rather than a typed error
+NOT_AVAILABLE_MARKERS = ("header not found", "unknown block", "block not found")
+
+
+class CircuitOpenError(Web3Exception):
+    """Raised without calling the node while its circuit breaker is open."""
+
+
+def rpc_error_code(error: Web3RPCError) -> Optional[int]:
+    """The JSON-RPC error code of a node error, if the response carried one."""
+    response = error.rpc_response
+    body = response.get("error") if isinstance(response, dict) else None
+    code = body.get("code") if isinstance(body, dict) else None
+    return code if isinstance(code, int) else None
+
+
+def classify_error(error: BaseException, permanent: tuple = ()) -> str:
+    """
+    TRANSPORT, THROTTLED or PERMANENT.
+
+    Unrecognised node errors (plain Web3Exception) are treated as transient;
+    anything that is not an RPC or I/O error is a bug and therefore permanent.
+    """
+    if isinstance(error, (CircuitOpenError, *permanent)):
+        return PERMANENT
+    if isinstance(
+        error,
+        (BlockNotFound, TransactionNotFound, MethodUnavailable, Web3ValidationError, BadResponseFormat, InvalidAddress),
+    ):
+        return PERMANENT
+    if isinstance(error, TooManyRequests):
+        return THROTTLED
+    message = str(error).lower()
+    if isinstance(error, Web3RPCError):
+        code = rpc_error_code(error)
+        if code in THROTTLING_CODES or any(marker in message for marker in THROTTLING_MARKERS):
+            return THROTTLED
+        if code in INVALID_REQUEST_CODES or any(marker in message for marker in NOT_AVAILABLE_MARKERS):
+            return PERMANENT
+        return TRANSPORT
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        if status == 429:
+            return THROTTLED
+        return TRANSPORT if status is None or status >= 500 else PERMANENT
+    if isinstance(error, (OSError, ProviderConnectionError, TimeExhausted)):
+        return TRANSPORT
+    if isinstance(error, (ValueError, TypeError, KeyError, AttributeError, AssertionError)):
+        return PERMANENT
+    if isinstance(error, Web3Exception):
+        return THROTTLED if any(marker in message for marker in THROTTLING_MARKERS) else TRANSPORT
+    return PERMANENT
+
+
+def is_throttling(error: BaseException) -> bool:
+    """
+    Rate limiting, recognised by type, HTTP status or message.
+
+    Error codes alone are not enough: some providers reuse -32005 for eth_getLogs
+    results that are too large.
+    """
+    if isinstance(error, TooManyRequests):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        if error.response.status_code == 429:
+            return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLING_MARKERS)
+
+
+def is_retryable(error: BaseException, permanent: tuple = ()) -> bool:
+    return classify_error(error, permanent) != PERMANENT
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker: after `failure_threshold` consecutive transport/throttling
+    failures, calls fail fast for `reset_timeout` seconds. Then a single probe is let
+    through (half-open); its success closes the circuit, its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless the call may go to the endpoint."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"Circuit for {self.name} half-open: probing")
+                return
+            raise CircuitOpenError(f"Circuit for {self.name} is open; failing fast")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    logger.error(
+                        f"Circuit for {self.name} open after {self.failures} failures; "
+                        f"failing fast for {self.reset_timeout:.0f}s"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of calls, so retries cannot multiply load during an outage.
+
+    Every call deposits `ratio` tokens (up to `capacity`); every retry withdraws one.
+    The bucket starts full, so a quiet worker can still ride out a short blip.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.tokens = capacity
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
@@ -0,0 +1,104 @@
+import json
+import logging
+import threading
+from typing import Optional
+
+from websockets.sync.client import ClientConnection, connect
+
+logger = logging.getLogger(__name__)
+
+
+class NewHeadsSubscriber:
+    """
+    Follows the chain tip through an `eth_subscribe("newHeads")` WebSocket subscription.
+
+    Runs in a background thread and reconnects with exponential backoff. While
+    disconnected, `wait_for_head` simply times out so callers fall back to polling.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        self.ws_url = ws_url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.latest_head: Optional[int] = None
+        self.connected = False
+
+        self._head_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._ws: Optional[ClientConnection] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="newheads-subscriber", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._ws is not None:
+            self._ws.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        # Release anyone blocked in wait_for_head
+        self._head_event.set()
+
+    def wait_for_head(self, timeout: float) -> bool:
+        """
+        Block until a new header arrives or the timeout elapses.
+
+        Returns:
+            True if woken by a header (or a disconnect), False on timeout.
+        """
+        triggered = self._head_event.wait(timeout)
+        self._head_event.clear()
+        return triggered
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop_event.is_set():
+            try:
+                with connect(self.ws_url, open_timeout=10) as ws:
+                    self._ws = ws
+                    self._subscribe(ws)
+                    self.connected = True
+                    delay = self.reconnect_delay
+                    logger.info(f"Subscribed to newHeads on {self.ws_url}")
+                    for message in ws:
+                        self._handle_message(message)
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    logger.warning(f"newHeads subscription lost: {e}. Falling back to polling.")
+            finally:
+                self._ws = None
+                if self.connected:
+                    self.connected = False
+                    # Wake the engine so it re-polls and catches up on missed heights
+                    self._head_event.set()
+
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _subscribe(self, ws: ClientConnection):
+        ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}))
+        response = json.loads(ws.recv(timeout=10))
+        if "error" in response:
+            raise ConnectionError(f"eth_subscribe rejected: {response['error']}")
+
+    def _handle_message(self, message):
+        payload = json.loads(message)
+        if payload.get("method") != "eth_subscription":
+            return
+        header = payload["params"]["result"]
+        number = int(header["number"], 16)
+        if self.latest_head is None or number > self.latest_head:
+            self.latest_head = number
+        logger.debug(f"newHeads: block {number}")
+        self._head_event.set()
@@ -0,0 +1,113 @@
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# A child that stayed up this long is considered healthy again; its backoff resets
+STABLE_UPTIME = 60.0
+
+
+def _child_main(target: Callable[[], None]):
+    # Forked children inherit the supervisor's signal handlers; restore the defaults
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    target()
+
+
+class ProcessSupervisor:
+    """
+    Runs each role (e.g. "sync", "api") in its own process and restarts it when it exits.
+
+    Restarts back off exponentially per role, from `restart_delay` up to
+    `max_restart_delay`, so a crash loop (bad RPC URL, database down) does not spin.
+    """
+
+    def __init__(
+        self,
+        targets: Dict[str, Callable[[], None]],
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        start_method: str = "spawn",
+    ):
+        self.targets = targets
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.context = multiprocessing.get_context(start_method)
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        self.started_at: Dict[str, float] = {}
+        self.next_start: Dict[str, float] = {}
+        self.delays: Dict[str, float] = {name: restart_delay for name in targets}
+        self.restarts: Dict[str, int] = {name: 0 for name in targets}
+        self.is_running = False
+
+    def _start(self, name: str):
+        process = self.context.Process(  # type: ignore[attr-defined]
+            target=_child_main, args=(self.targets[name],), name=f"lindy-{name}"
+        )
+        process.start()
+        self.processes[name] = process
+        self.started_at[name] = time.monotonic()
+        logger.info(f"Started {name} process (pid {process.pid})")
+
+    def poll(self):
+        """Restart children that exited, honouring each role's backoff."""
+        now = time.monotonic()
+        for name in self.targets:
+            process = self.processes.get(name)
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                # The child just exited: schedule its restart
+                uptime = now - self.started_at[name]
+                if uptime >= STABLE_UPTIME:
+                    self.delays[name] = self.restart_delay
+                logger.error(
+                    f"{name} process exited with code {process.exitcode} after {uptime:.1f}s; "
+                    f"restarting in {self.delays[name]:.1f}s"
+                )
+                process.close()
+                del self.processes[name]
+                self.next_start[name] = now + self.delays[name]
+                self.delays[name] = min(self.delays[name] * 2, self.max_restart_delay)
+                self.restarts[name] += 1
+            if now >= self.next_start.get(name, 0.0):
+                self._start(name)
+
+    def run(self, poll_interval: float = 1.0, max_iterations: Optional[int] = None):
+        """Supervise until stop() or SIGTERM/SIGINT; children are terminated on the way out."""
+        self.is_running = True
+        previous_handlers = {}
+        if multiprocessing.current_process().name == "MainProcess":
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                try:
+                    previous_handlers[sig] = signal.signal(sig, lambda *_: self.stop())
+                except ValueError:
+                    # Not on the main thread (e.g. under a test runner thread)
+                    pass
+        try:
+            iterations = 0
+            while self.is_running and (max_iterations is None or iterations < max_iterations):
+                self.poll()
+                iterations += 1
+                time.sleep(poll_interval)
+        finally:
+            self.terminate()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+    def stop(self):
+        self.is_running = False
+
+    def terminate(self, timeout: float = 10.0):
+        for name, process in list(self.processes.items()):
+            if process.is_alive():
+                logger.info(f"Stopping {name} process (pid {process.pid})")
+                process.terminate()
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.processes.clear()
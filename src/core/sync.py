@@ -1,4 +1,5 @@
 import logging
+from typing import List, Optional, Tuple
 
 from database.repository import BlockchainRepository
 from domain.schemas import BlockModel
@@ -16,38 +17,92 @@ class ReorgException(Exception):
             f"Expected parent hash {expected_parent_hash}, but got {actual_parent_hash}"
         )
 
+class FinalizedReorgException(Exception):
+    """Raised when a reorg conflicts with a finalized block, which is never rolled back."""
+    def __init__(self, block_number: int, finalized_height: int):
+        self.block_number = block_number
+        self.finalized_height = finalized_height
+        super().__init__(
+            f"Reorg at block {block_number} conflicts with the finalized chain (finalized height "
+            f"{finalized_height}); nothing above it was left to roll back. Check the node and the stored blocks."
+        )
+
 class IntegrityGuard:
-    def __init__(self, repository: BlockchainRepository):
+    def __init__(self, repository: BlockchainRepository, finalized_height: Optional[int] = None):
         self.repo = repository
+        # Blocks at or below this height can no longer be reorganized
+        self.finalized_height = finalized_height
+        # (number, hash) of the last block that passed the continuity check
+        self.last_verified: Optional[Tuple[int, str]] = None
+
+    def is_finalized(self, block_number: int) -> bool:
+        return self.finalized_height is not None and block_number <= self.finalized_height
 
     def validate_block_continuity(self, new_block: BlockModel) -> bool:
         """
         Verify that the new block's parent hash matches the hash of the previous block in the DB.
-        
+
+        The DB lookup is skipped only when the previous block already passed this
+        check and is finalized: its hash can no longer change, so the new block is
+        compared against the verified hash instead.
+
         Returns:
             True if continuous.
         Raises:
             ReorgException: If a mismatch is detected.
         """
         previous_block_number = new_block.number - 1
-        
-        # Use Raw SQL via Repository
-        previous_block = self.repo.get_block_by_number(previous_block_number)
-        
-        if not previous_block:
-            logger.info(f"No previous block found in DB for height {previous_block_number}. Skipping continuity check.")
-            return True
-
-        if previous_block.hash != new_block.parent_hash:
+
+        if (
+            self.last_verified is not None
+            and self.last_verified[0] == previous_block_number
+            and self.is_finalized(previous_block_number)
+        ):
+            previous_hash = self.last_verified[1]
+        else:
+            # Use Raw SQL via Repository
+            previous_block = self.repo.get_block_by_number(previous_block_number)
+
+            if not previous_block:
+                logger.info(f"No previous block found in DB for height {previous_block_number}. Skipping continuity check.")
+                self.last_verified = (new_block.number, new_block.hash)
+                return True
+            previous_hash = previous_block.hash
+
+        if previous_hash != new_block.parent_hash:
             logger.error(
                 f"Integrity check failed for block {new_block.number}. "
-                f"DB Hash: {previous_block.hash}, New Block Parent Hash: {new_block.parent_hash}"
+                f"DB Hash: {previous_hash}, New Block Parent Hash: {new_block.parent_hash}"
             )
             raise ReorgException(
                 block_number=new_block.number,
-                expected_parent_hash=previous_block.hash,
+                expected_parent_hash=previous_hash,
                 actual_parent_hash=new_block.parent_hash
             )
 
         logger.debug(f"Block {new_block.number} passed integrity check.")
-        return True
\ No newline at end of file
+        self.last_verified = (new_block.number, new_block.hash)
+        return True
+
+    def verify_header_chain(self, headers: List[BlockModel]) -> List[BlockModel]:
+        """
+        Verify a range of headers before any body is downloaded.
+
+        The first header is checked against the DB (raising ReorgException as
+        usual); the rest are checked against each other in memory. If the node's
+        chain changed while the range was being fetched, only the prefix up to
+        the break is returned and the rest is fetched again later.
+        """
+        if not headers:
+            return []
+        self.validate_block_continuity(headers[0])
+        for i in range(1, len(headers)):
+            if headers[i].parent_hash != headers[i - 1].hash:
+                logger.warning(
+                    f"Header chain breaks at block {headers[i].number} (node reorged during fetch). "
+                    f"Keeping {i} verified headers."
+                )
+                headers = headers[:i]
+                break
+        self.last_verified = (headers[-1].number, headers[-1].hash)
+        return headers
@@ -0,0 +1,79 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.orm import Session
+
+# ~100 bytes per entry; the hot working set (busy contracts, top EOAs) fits easily
+DEFAULT_ADDRESS_CACHE_SIZE = 100_000
+
+
+class AddressDictionary:
+    """
+    Bounded LRU of address -> id mappings over the `addresses` dimension table.
+
+    Fact tables store the BIGINT id instead of the 42-char address. Addresses not
+    in the cache are upserted and looked up once per batch, so a warm cache costs
+    no extra round trips. Ids created in a transaction that rolls back are gone, so
+    a rollback of any session that created ids clears the cache.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_ADDRESS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._sessions: "weakref.WeakSet[Session]" = weakref.WeakSet()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ids(self, db: Session, addresses: Iterable[Optional[str]]) -> Dict[str, int]:
+        """Ids for the given (lowercase) addresses, creating rows for unseen ones. None is skipped."""
+        found: Dict[str, int] = {}
+        missing = []
+        with self._lock:
+            for address in set(addresses):
+                if address is None:
+                    continue
+                address_id = self._entries.get(address)
+                if address_id is None:
+                    missing.append(address)
+                    continue
+                self._entries.move_to_end(address)
+                found[address] = address_id
+            self.hits += len(found)
+            self.misses += len(missing)
+        if not missing:
+            return found
+
+        if isinstance(db, Session) and db not in self._sessions:
+            event.listen(db, "after_rollback", lambda session: self.clear())
+            self._sessions.add(db)
+        # Concurrent writers lock new rows in the same order, so they wait instead of deadlocking
+        missing.sort()
+        db.execute(
+            text("INSERT INTO addresses (address) VALUES (:address) ON CONFLICT (address) DO NOTHING"),
+            [{"address": address} for address in missing],
+        )
+        rows = db.execute(
+            text("SELECT id, address FROM addresses WHERE address IN :addresses").bindparams(
+                bindparam("addresses", expanding=True)
+            ),
+            {"addresses": missing},
+        )
+        with self._lock:
+            for address_id, address in rows:
+                found[address] = address_id
+                self._entries[address] = address_id
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return found
+
+    def clear(self):
+        """Forget cached ids, e.g. after the session that created them rolled back."""
+        with self._lock:
+            self._entries.clear()
@@ -1,24 +1,59 @@
-from typing import Generator
+from typing import Any, Dict, Generator, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from core.config import settings
+from database.read_router import ReadRouter
 
-# Create engine
-# Note: StaticPool is used here to support SQLite in-memory testing correctly.
-# In a production Postgres setup, SQLAlchemy will use its default QueuePool.
-engine = create_engine(
-    settings.database_url,
-    pool_size=20,
-    max_overflow=10,
-    pool_pre_ping=True,
-    poolclass=StaticPool if settings.database_url.startswith("sqlite") else None,
-)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(database_url: str, pool_size: int = 20, max_overflow: int = 10) -> Dict[str, Any]:
+    """
+    create_engine() keyword arguments for a database URL.
+
+    - SQLite (tests): StaticPool so an in-memory database is shared; no pool sizing.
+    - postgresql+psycopg (psycopg 3): server-side prepared statements after
+      `DB_PREPARE_THRESHOLD` executions, and executemany left to the driver, which
+      pipelines one prepared INSERT instead of SQLAlchemy rendering a differently
+      sized multi-row VALUES statement (a new statement to prepare) per batch.
+    - postgresql+psycopg2: the default QueuePool with SQLAlchemy's insertmanyvalues.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    options: Dict[str, Any] = {"pool_size": pool_size, "max_overflow": max_overflow, "pool_pre_ping": True}
+    if url.get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": settings.db_prepare_threshold}
+        options["use_insertmanyvalues"] = False
+    return options
+
+
+def create_db_engine(database_url: str, pool_size: int = 20, max_overflow: int = 10) -> Engine:
+    return create_engine(database_url, **engine_options(database_url, pool_size, max_overflow))
+
+
+def create_session_factory(role: str = "api", database_url: Optional[str] = None) -> sessionmaker:
+    """
+    Session factory with its own engine, its pool sized for a process role.
+
+    The API serves concurrent requests; the sync worker writes from one thread and
+    only needs a connection or two.
+    """
+    pool_sizes = {
+        "api": (settings.api_db_pool_size, settings.api_db_max_overflow),
+        "sync": (settings.sync_db_pool_size, settings.sync_db_max_overflow),
+    }
+    pool_size, max_overflow = pool_sizes[role]
+    engine = create_db_engine(database_url or settings.database_url, pool_size, max_overflow)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+# API sessions; the sync worker builds its own factory with create_session_factory("sync")
+SessionLocal = create_session_factory("api")
+engine = SessionLocal.kw["bind"]
 
 
 class Base(DeclarativeBase):
@@ -31,3 +66,19 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def create_read_router() -> ReadRouter:
+    replicas = [create_session_factory("api", url) for url in settings.database_read_urls]
+    return ReadRouter(SessionLocal, replicas, strategy=settings.read_routing)
+
+
+# Built on first use so processes that never serve reads do not create replica engines
+_read_router: Optional[ReadRouter] = None
+
+
+def get_read_router() -> ReadRouter:
+    global _read_router
+    if _read_router is None:
+        _read_router = create_read_router()
+    return _read_router
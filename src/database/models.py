@@ -2,12 +2,33 @@ from datetime import datetime
 from typing import List, Optional
 
 from sqlalchemy import (JSON, BigInteger, DateTime, ForeignKey, Index, Integer,
-                        String, Text)
+                        LargeBinary, Numeric, String, Text, UniqueConstraint,
+                        func)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.connection import Base
 
 
+class Address(Base):
+    """Address dictionary: fact tables store this BIGINT id instead of the 42-char string."""
+
+    __tablename__ = "addresses"
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    address: Mapped[str] = mapped_column(String(42), unique=True, nullable=False)
+
+
+class PayloadBlob(Base):
+    """Compressed calldata / log data above PAYLOAD_OFFLOAD_BYTES, keyed by the SHA-256 of the raw bytes."""
+
+    __tablename__ = "payload_blobs"
+
+    hash: Mapped[str] = mapped_column(String(66), primary_key=True)
+    codec: Mapped[str] = mapped_column(String(8), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
 class Block(Base):
     __tablename__ = "blocks"
 
@@ -23,6 +44,7 @@ class Block(Base):
     gas_limit: Mapped[int] = mapped_column(BigInteger, nullable=False)
     gas_used: Mapped[int] = mapped_column(BigInteger, nullable=False)
     base_fee_per_gas: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    logs_bloom: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     transactions: Mapped[List["Transaction"]] = relationship(back_populates="block", cascade="all, delete-orphan")
     logs: Mapped[List["Log"]] = relationship(back_populates="block", cascade="all, delete-orphan")
@@ -40,12 +62,14 @@ class Transaction(Base):
     block_hash: Mapped[str] = mapped_column(String(66), nullable=False, index=True)
     block_number: Mapped[int] = mapped_column(BigInteger, ForeignKey("blocks.number"), nullable=False, index=True)
     transaction_index: Mapped[int] = mapped_column(Integer, nullable=False)
-    from_address: Mapped[str] = mapped_column(String(42), nullable=False, index=True)
-    to_address: Mapped[Optional[str]] = mapped_column(String(42), nullable=True, index=True)
+    from_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    to_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True, index=True)
     value: Mapped[int] = mapped_column(BigInteger, nullable=False)
     gas_price: Mapped[int] = mapped_column(BigInteger, nullable=False)
     gas: Mapped[int] = mapped_column(BigInteger, nullable=False)
     input: Mapped[str] = mapped_column(Text, nullable=False)
+    # Set when the payload was offloaded to payload_blobs; `input` then keeps the selector
+    input_blob: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)
 
     block: Mapped["Block"] = relationship(back_populates="transactions")
     logs: Mapped[List["Log"]] = relationship(back_populates="transaction", cascade="all, delete-orphan")
@@ -56,34 +80,217 @@ class Log(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     log_index: Mapped[int] = mapped_column(Integer, nullable=False)
     transaction_hash: Mapped[str] = mapped_column(String(66), ForeignKey("transactions.hash"), nullable=False, index=True)
-    address: Mapped[str] = mapped_column(String(42), nullable=False, index=True)
+    address_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     data: Mapped[str] = mapped_column(Text, nullable=False)
+    data_blob: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)
     topics: Mapped[List[str]] = mapped_column(JSON, nullable=False)
     block_number: Mapped[int] = mapped_column(BigInteger, ForeignKey("blocks.number"), nullable=False, index=True)
-    block_hash: Mapped[str] = mapped_column(String(66), nullable=False, index=True)
+    block_hash: Mapped[str] = mapped_column(String(66), nullable=False)
 
     block: Mapped["Block"] = relationship(back_populates="logs")
     transaction: Mapped["Transaction"] = relationship(back_populates="logs")
 
     __table_args__ = (
+        # Natural key: replayed or overlapping batches upsert instead of duplicating
+        UniqueConstraint("block_hash", "log_index", name="uq_logs_block_hash_log_index"),
         Index("idx_logs_transaction_hash", "transaction_hash"),
         Index("idx_logs_block_number", "block_number"),
     )
-    transaction_hash: Mapped[str] = mapped_column(
-        String(66), ForeignKey("transactions.hash"), nullable=False, index=True
-    )
-    address: Mapped[str] = mapped_column(String(42), nullable=False, index=True)
+
+
+class HotBlock(Base):
+    """Staging copy of `blocks` for unfinalized heights."""
+
+    __tablename__ = "hot_blocks"
+
+    number: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    hash: Mapped[str] = mapped_column(String(66), unique=True, nullable=False)
+    parent_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    miner: Mapped[str] = mapped_column(String(42), nullable=False)
+    difficulty: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total_difficulty: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    extra_data: Mapped[str] = mapped_column(Text, nullable=False)
+    gas_limit: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    gas_used: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    base_fee_per_gas: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    logs_bloom: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+
+class HotTransaction(Base):
+    """Staging copy of `transactions` for unfinalized heights."""
+
+    __tablename__ = "hot_transactions"
+
+    hash: Mapped[str] = mapped_column(String(66), primary_key=True)
+    nonce: Mapped[int] = mapped_column(Integer, nullable=False)
+    block_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    block_number: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    transaction_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    from_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    to_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    gas_price: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    gas: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    input: Mapped[str] = mapped_column(Text, nullable=False)
+    # Set when the payload was offloaded to payload_blobs; `input` then keeps the selector
+    input_blob: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)
+
+
+class HotLog(Base):
+    """Staging copy of `logs` for unfinalized heights."""
+
+    __tablename__ = "hot_logs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    log_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    transaction_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    address_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     data: Mapped[str] = mapped_column(Text, nullable=False)
+    data_blob: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)
     topics: Mapped[List[str]] = mapped_column(JSON, nullable=False)
-    block_number: Mapped[int] = mapped_column(
-        BigInteger, ForeignKey("blocks.number"), nullable=False, index=True
-    )
-    block_hash: Mapped[str] = mapped_column(String(66), nullable=False, index=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    block_hash: Mapped[str] = mapped_column(String(66), nullable=False)
 
-    block: Mapped["Block"] = relationship(back_populates="logs")
-    transaction: Mapped["Transaction"] = relationship(back_populates="logs")
+    __table_args__ = (UniqueConstraint("block_hash", "log_index", name="uq_hot_logs_block_hash_log_index"),)
 
-    __table_args__ = (
-        Index("idx_logs_transaction_hash", "transaction_hash"),
-        Index("idx_logs_block_number", "block_number"),
-    )
+
+class TokenBalance(Base):
+    """Running ERC-20 balance per (token, holder), maintained incrementally at ingest."""
+
+    __tablename__ = "token_balances"
+
+    token_address: Mapped[str] = mapped_column(String(42), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(42), primary_key=True)
+    balance: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+
+
+class TokenBalanceDelta(Base):
+    """Per-block netted balance changes, replayed backwards on reorg."""
+
+    __tablename__ = "token_balance_deltas"
+
+    block_hash: Mapped[str] = mapped_column(String(66), primary_key=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    token_address: Mapped[str] = mapped_column(String(42), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(42), primary_key=True)
+    delta: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+
+
+class BlockStats(Base):
+    """Per-block aggregates computed at ingest, subtracted from the rollups on reorg."""
+
+    __tablename__ = "block_stats"
+
+    number: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    minute_bucket: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    hour_bucket: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    tx_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    log_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    gas_used: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    base_fee_per_gas: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    fees_burned: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+    total_value: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+    unique_senders: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ChainStatsRollup:
+    """Additive time-bucket totals; sender_block_count sums per-block distinct senders."""
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    block_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    tx_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    log_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    gas_used: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+    fees_burned: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+    total_value: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+    base_fee_sum: Mapped[int] = mapped_column(Numeric(78, 0), nullable=False)
+    sender_block_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class ChainStatsMinute(ChainStatsRollup, Base):
+    __tablename__ = "chain_stats_minute"
+
+
+class ChainStatsHour(ChainStatsRollup, Base):
+    __tablename__ = "chain_stats_hour"
+
+
+class AddressActivity(Base):
+    """Posting per (address id, role); the primary key serves newest-first history per address."""
+
+    __tablename__ = "address_activity"
+
+    address_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    tx_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    log_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    role: Mapped[str] = mapped_column(String(16), primary_key=True)
+    transaction_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+
+
+class OrphanedBlock(Base):
+    """Block removed by a reorg, kept so it can be restored if its hash becomes canonical again."""
+
+    __tablename__ = "orphaned_blocks"
+
+    hash: Mapped[str] = mapped_column(String(66), primary_key=True)
+    number: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    parent_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    miner: Mapped[str] = mapped_column(String(42), nullable=False)
+    difficulty: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total_difficulty: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    extra_data: Mapped[str] = mapped_column(Text, nullable=False)
+    gas_limit: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    gas_used: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    base_fee_per_gas: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    logs_bloom: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    orphaned_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+
+
+class OrphanedTransaction(Base):
+    """Transactions of an orphaned block."""
+
+    __tablename__ = "orphaned_transactions"
+
+    block_hash: Mapped[str] = mapped_column(String(66), primary_key=True)
+    hash: Mapped[str] = mapped_column(String(66), primary_key=True)
+    nonce: Mapped[int] = mapped_column(Integer, nullable=False)
+    block_number: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    transaction_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    from_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    to_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    gas_price: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    gas: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    input: Mapped[str] = mapped_column(Text, nullable=False)
+    # Set when the payload was offloaded to payload_blobs; `input` then keeps the selector
+    input_blob: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)
+
+
+class OrphanedLog(Base):
+    """Logs of an orphaned block."""
+
+    __tablename__ = "orphaned_logs"
+
+    block_hash: Mapped[str] = mapped_column(String(66), primary_key=True)
+    log_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    transaction_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    address_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    data: Mapped[str] = mapped_column(Text, nullable=False)
+    data_blob: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)
+    topics: Mapped[List[str]] = mapped_column(JSON, nullable=False)
+    block_number: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class SyncRange(Base):
+    """A contiguous run of indexed heights; the tip and backfill cursors each extend one."""
+
+    __tablename__ = "sync_ranges"
+
+    start_block: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    end_block: Mapped[int] = mapped_column(BigInteger, nullable=False)
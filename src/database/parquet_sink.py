@@ -0,0 +1,145 @@
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from utils.arrow import require_parquet, require_pyarrow, rows_to_record_batch
+
+logger = logging.getLogger(__name__)
+
+SINK_TABLES = ("blocks", "transactions", "logs", "transfers")
+
+# {first:012d}-{last:012d}.parquet inside a range=... partition directory
+FILE_PATTERN = re.compile(r"^(\d{12})-(\d{12})\.parquet$")
+
+
+def _block_number(table: str, row: Mapping) -> int:
+    return row["number"] if table == "blocks" else row["block_number"]
+
+
+class ParquetSink:
+    """
+    Columnar copy of committed batches for analytics (DuckDB, Polars, ...).
+
+    Layout: {root}/{table}/range={start:012d}/{first:012d}-{last:012d}.parquet, where
+    each range directory covers `partition_blocks` blocks. Rows are buffered until
+    `flush_blocks` blocks have been committed so files stay reasonably large. On
+    reorg, buffered rows are dropped and the trailing files are deleted or rewritten.
+    """
+
+    def __init__(self, root: str, partition_blocks: int = 100_000, flush_blocks: int = 1000):
+        require_parquet()
+        self.root = root
+        self.partition_blocks = partition_blocks
+        self.flush_blocks = flush_blocks
+        self.buffers: Dict[str, List[Mapping]] = {table: [] for table in SINK_TABLES}
+        self.buffered_blocks = 0
+
+    def write_batch(
+        self,
+        blocks: Iterable[Mapping],
+        transactions: Iterable[Mapping] = (),
+        logs: Iterable[Mapping] = (),
+        transfers: Iterable[Mapping] = (),
+    ):
+        """Buffer rows of a batch that has already been committed to the database."""
+        blocks = list(blocks)
+        self.buffers["blocks"].extend(blocks)
+        self.buffers["transactions"].extend(transactions)
+        self.buffers["logs"].extend(logs)
+        self.buffers["transfers"].extend(transfers)
+        self.buffered_blocks += len(blocks)
+        if self.buffered_blocks >= self.flush_blocks:
+            self.flush()
+
+    def flush(self):
+        for table, rows in self.buffers.items():
+            if not rows:
+                continue
+            for partition_start, partition_rows in self._split_by_partition(table, rows):
+                self._write_file(table, partition_start, partition_rows)
+            self.buffers[table] = []
+        self.buffered_blocks = 0
+
+    def last_block(self) -> Optional[int]:
+        """Highest block number written or buffered for the `blocks` table."""
+        if self.buffers["blocks"]:
+            return max(row["number"] for row in self.buffers["blocks"])
+        files = self._files("blocks")
+        return max(last for _, last, _ in files) if files else None
+
+    def rollback_from_height(self, block_number: int):
+        """Drop everything at or above block_number from the buffers and the trailing files."""
+        for table in SINK_TABLES:
+            self.buffers[table] = [r for r in self.buffers[table] if _block_number(table, r) < block_number]
+        self.buffered_blocks = len(self.buffers["blocks"])
+
+        pq = require_parquet()
+        for table in SINK_TABLES:
+            for first, last, path in self._files(table):
+                if last < block_number:
+                    continue
+                if first >= block_number:
+                    os.remove(path)
+                    continue
+                # Trailing file straddles the rollback height: rewrite the surviving prefix
+                kept = pq.read_table(path).to_pylist()
+                kept = [r for r in kept if _block_number(table, r) < block_number]
+                os.remove(path)
+                if kept:
+                    partition_start = first - first % self.partition_blocks
+                    self._write_file(table, partition_start, kept)
+                logger.info(f"Rewrote {path} below block {block_number}")
+
+    def _split_by_partition(self, table: str, rows: List[dict]) -> Iterable[Tuple[int, List[dict]]]:
+        partitions: Dict[int, List[dict]] = {}
+        for row in rows:
+            bn = _block_number(table, row)
+            partitions.setdefault(bn - bn % self.partition_blocks, []).append(row)
+        return sorted(partitions.items())
+
+    def _write_file(self, table: str, partition_start: int, rows: List[dict]):
+        pa = require_pyarrow()
+        pq = require_parquet()
+        first = min(_block_number(table, r) for r in rows)
+        last = max(_block_number(table, r) for r in rows)
+        directory = os.path.join(self.root, table, f"range={partition_start:012d}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{first:012d}-{last:012d}.parquet")
+
+        batch = rows_to_record_batch(rows, table)
+        tmp_path = path + ".tmp"
+        pq.write_table(pa.Table.from_batches([batch]), tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+    def _files(self, table: str) -> List[Tuple[int, int, str]]:
+        files: List[Tuple[int, int, str]] = []
+        table_dir = os.path.join(self.root, table)
+        if not os.path.isdir(table_dir):
+            return files
+        for partition in os.listdir(table_dir):
+            partition_dir = os.path.join(table_dir, partition)
+            for name in os.listdir(partition_dir):
+                match = FILE_PATTERN.match(name)
+                if match:
+                    files.append((int(match.group(1)), int(match.group(2)), os.path.join(partition_dir, name)))
+        return sorted(files)
+
+    def catch_up(self, repo, decoder, to_block: int, batch_size: int = 5000):
+        """
+        Re-export committed blocks the sink lost (e.g. a crash before the buffer flushed).
+
+        Only resumes after the last written block; an empty sink starts at the live tip.
+        """
+        last = self.last_block()
+        if last is None or last >= to_block:
+            return
+        logger.info(f"Parquet sink catching up on blocks {last + 1}-{to_block} from the database")
+        for start in range(last + 1, to_block + 1, batch_size):
+            end = min(start + batch_size - 1, to_block)
+            blocks = [row for part in repo.iter_blocks(start, end) for row in part]
+            transactions = [row for part in repo.iter_transactions(start, end) for row in part]
+            logs = [row for part in repo.iter_logs(start, end) for row in part]
+            transfers = [t.model_dump() for t in (decoder.decode_transfer_row(log) for log in logs) if t]
+            self.write_batch(blocks, transactions, logs, transfers)
+        self.flush()
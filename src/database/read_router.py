@@ -0,0 +1,88 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from database.repository import BlockchainRepository
+
+logger = logging.getLogger(__name__)
+
+ROUTING_STRATEGIES = ("round_robin", "least_connections")
+
+# Replica heights are re-read at most this often; a stale (lower) height only sends
+# more reads to the primary, never a read to a replica that is behind
+REPLICA_HEIGHT_TTL = 1.0
+
+
+class ReadRouter:
+    """
+    Spreads API read sessions across read replicas, falling back to the primary.
+
+    Reads that need a given block height (e.g. a range ending at `to_block`) only go
+    to a replica whose latest block has reached it; otherwise they use the primary.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replicas: List[sessionmaker],
+        strategy: str = "round_robin",
+        height_ttl: float = REPLICA_HEIGHT_TTL,
+    ):
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown read routing strategy {strategy!r}; expected one of {ROUTING_STRATEGIES}")
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.height_ttl = height_ttl
+        self.active = [0] * len(replicas)
+        self._heights: Dict[int, Tuple[float, Optional[int]]] = {}
+        self._round_robin = itertools.cycle(range(len(replicas)))
+        self._lock = threading.Lock()
+
+    def _pick(self) -> int:
+        with self._lock:
+            if self.strategy == "least_connections":
+                return min(range(len(self.replicas)), key=lambda i: self.active[i])
+            return next(self._round_robin)
+
+    def replica_height(self, index: int) -> Optional[int]:
+        """Latest block on a replica, cached for `height_ttl` seconds."""
+        now = time.monotonic()
+        cached = self._heights.get(index)
+        if cached is not None and now - cached[0] < self.height_ttl:
+            return cached[1]
+        session = self.replicas[index]()
+        try:
+            latest = BlockchainRepository(session).get_latest_block()
+        finally:
+            session.close()
+        height = latest.number if latest else None
+        self._heights[index] = (now, height)
+        return height
+
+    def acquire(self, min_height: Optional[int] = None) -> Session:
+        """A read session, from a replica when one is configured and caught up to `min_height`."""
+        if not self.replicas:
+            return self.primary()
+        index = self._pick()
+        if min_height is not None:
+            height = self.replica_height(index)
+            if height is None or height < min_height:
+                logger.debug(f"Replica {index} at {height} is behind block {min_height}; reading from primary")
+                return self.primary()
+        with self._lock:
+            self.active[index] += 1
+        session = self.replicas[index]()
+        session.info["replica"] = index
+        return session
+
+    def release(self, session: Session):
+        index = session.info.pop("replica", None)
+        session.close()
+        if index is not None:
+            with self._lock:
+                self.active[index] -= 1
@@ -1,14 +1,135 @@
-import json
+import hashlib
 import logging
-from typing import List, Optional
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import (Any, Dict, Iterable, Iterator, List, Mapping, Optional,
+                    Sequence, Tuple, cast)
 
-from sqlalchemy import text
+from sqlalchemy import CursorResult, TextClause, bindparam, text
 from sqlalchemy.orm import Session
 
+from database.address_dictionary import AddressDictionary
+from domain.rows import LogRow
 from domain.schemas import BlockModel
+from domain.stats import ROLLUP_COLUMNS, STATS_INTERVALS, rollup_deltas
+from utils import compression, fast_json
 
 logger = logging.getLogger(__name__)
 
+# Column order shared by the canonical tables and their hot staging copies
+BLOCK_COLUMNS = (
+    "number", "hash", "parent_hash", "timestamp", "miner",
+    "difficulty", "total_difficulty", "size", "extra_data",
+    "gas_limit", "gas_used", "base_fee_per_gas", "logs_bloom",
+)
+TRANSACTION_COLUMNS = (
+    "hash", "nonce", "block_hash", "block_number", "transaction_index",
+    "from_id", "to_id", "value", "gas_price", "gas", "input", "input_blob",
+)
+LOG_COLUMNS = (
+    "log_index", "transaction_hash", "address_id", "data",
+    "topics", "block_number", "block_hash", "data_blob",
+)
+
+# Fields as rows are written and read; addresses are stored as ids into `addresses`
+TRANSACTION_FIELDS = (
+    "hash", "nonce", "block_hash", "block_number", "transaction_index",
+    "from_address", "to_address", "value", "gas_price", "gas", "input",
+)
+LOG_FIELDS = (
+    "log_index", "transaction_hash", "address", "data",
+    "topics", "block_number", "block_hash",
+)
+
+# Payload column and its payload_blobs reference; offloaded rows keep a 4-byte prefix inline
+OFFLOADED_PAYLOADS = {
+    "transactions": ("input", "input_blob"),
+    "logs": ("data", "data_blob"),
+}
+PAYLOAD_PREFIX_HEX = 2 + 8
+ENCODED_ADDRESSES = {
+    "transactions": {"from_address": "from_id", "to_address": "to_id"},
+    "logs": {"address": "address_id"},
+}
+BLOCK_STATS_COLUMNS = (
+    "number", "timestamp", "minute_bucket", "hour_bucket", "tx_count", "log_count",
+    "gas_used", "base_fee_per_gas", "fees_burned", "total_value", "unique_senders",
+)
+
+# Unfinalized blocks can be staged here and promoted in bulk once finalized
+HOT_TABLES = {
+    "blocks": "hot_blocks",
+    "transactions": "hot_transactions",
+    "logs": "hot_logs",
+}
+
+
+# Balance journal rows per INSERT ... RETURNING (5 bind parameters each)
+BALANCE_JOURNAL_CHUNK = 1000
+
+# Reorged-out blocks kept in the orphan journal (see journal_orphans)
+DEFAULT_ORPHAN_LIMIT = 256
+
+
+def _table(name: str, staging: bool) -> str:
+    return HOT_TABLES[name] if staging else name
+
+
+def _select(name: str, table: str, fields: Sequence[str], where: str) -> str:
+    """SELECT of `fields` from `table`, joining `addresses` to decode address ids."""
+    encoded = ENCODED_ADDRESSES.get(name, {})
+    columns, joins = [], []
+    for field in fields:
+        if field in encoded:
+            alias = f"a_{field}"
+            columns.append(f"{alias}.address AS {field}")
+            joins.append(f"LEFT JOIN addresses {alias} ON {alias}.id = {table}.{encoded[field]}")
+        else:
+            columns.append(f"{table}.{field}")
+    return f"SELECT {', '.join(columns)} FROM {table} {' '.join(joins)} WHERE {where}"
+
+
+def _with_staged(name: str, fields: Sequence[str], where: str) -> str:
+    """
+    SELECT over a canonical table and its hot staging copy, which holds unfinalized rows.
+
+    Payload tables also return their blob reference, resolved by `_inflate`.
+    """
+    if name in OFFLOADED_PAYLOADS:
+        fields = (*fields, OFFLOADED_PAYLOADS[name][1])
+    return f"{_select(name, name, fields, where)} UNION ALL {_select(name, HOT_TABLES[name], fields, where)}"
+
+
+def _address_filter(column: str, param: str) -> str:
+    """Match an address id column against an address (no id means no rows)."""
+    return f" AND {column} = (SELECT id FROM addresses WHERE address = :{param})"
+
+
+def _topic0_filter(topic0: str) -> Tuple[str, str]:
+    """
+    Clause and bind value matching logs whose first topic is topic0.
+
+    The serialized topics array starts with topic0 on both jsonb and SQLite JSON;
+    LIKE wildcards in the value are escaped so it only matches as a literal prefix.
+    """
+    literal = topic0.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return " AND CAST(topics AS TEXT) LIKE :topic0_prefix ESCAPE '\\'", f'["{literal}"%'
+
+
+def _topics_json(data: Mapping):
+    """Bind value for the topics column (LogRow serializes its own)."""
+    if isinstance(data, LogRow):
+        return data.topics_json
+    topics = data["topics"]
+    return fast_json.dumps(topics) if isinstance(topics, (list, dict)) else topics
+
+
+def _log_row(row) -> dict:
+    """Log row as a dict with topics decoded (jsonb arrives as a list, SQLite JSON as text)."""
+    topics = row["topics"]
+    return {**row, "topics": fast_json.loads(topics) if isinstance(topics, str) else topics}
+
 
 class BlockchainRepository:
     """
@@ -16,23 +137,129 @@ class BlockchainRepository:
     Uses optimized multi-row insertions for maximum throughput.
     """
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        addresses: Optional[AddressDictionary] = None,
+        payload_offload_bytes: Optional[int] = None,
+    ):
         self.db = db
+        # Shared across batches by the sync engine; API reads decode ids in SQL instead
+        self.addresses = addresses if addresses is not None else AddressDictionary()
+        # Payloads larger than this many bytes go to payload_blobs (None keeps everything inline)
+        self.payload_offload_bytes = payload_offload_bytes
+        # Ids resolved up front for the current pipeline block, so its inserts issue no reads
+        self._pinned_ids: Dict[str, int] = {}
+
+    def _offload(self, params: List[dict], name: str):
+        """
+        Move payloads above the threshold into payload_blobs, in place on the bind parameters.
 
-    def insert_blocks_bulk(self, blocks: List[BlockModel]):
+        The row keeps the first 4 bytes (a call's selector) and the blob's SHA-256.
+        """
+        field, ref = OFFLOADED_PAYLOADS[name]
+        blobs: Dict[str, bytes] = {}
+        threshold = self.payload_offload_bytes
+        for row in params:
+            payload = row[field]
+            if threshold is None or (len(payload) - 2) // 2 <= threshold:
+                row[ref] = None
+                continue
+            raw = bytes.fromhex(payload[2:])
+            blob_hash = "0x" + hashlib.sha256(raw).hexdigest()
+            blobs[blob_hash] = raw
+            row[field] = payload[:PAYLOAD_PREFIX_HEX]
+            row[ref] = blob_hash
+        if not blobs:
+            return
+        logger.debug(f"Executing Raw SQL: INSERT {len(blobs)} payload_blobs")
+        rows = []
+        for blob_hash, raw in blobs.items():
+            codec, data = compression.compress(raw)
+            rows.append({"hash": blob_hash, "codec": codec, "size": len(raw), "data": data})
+        self.db.execute(
+            text(
+                """
+                INSERT INTO payload_blobs (hash, codec, size, data)
+                VALUES (:hash, :codec, :size, :data)
+                ON CONFLICT (hash) DO NOTHING
+            """
+            ),
+            rows,
+        )
+
+    def _inflate(self, rows: List[dict], name: str) -> List[dict]:
+        """Replace offloaded payload prefixes with the full payload (one blob query per call)."""
+        field, ref = OFFLOADED_PAYLOADS[name]
+        hashes = {row[ref] for row in rows if row[ref]}
+        payloads = {}
+        if hashes:
+            sql = text("SELECT hash, codec, data FROM payload_blobs WHERE hash IN :hashes").bindparams(
+                bindparam("hashes", expanding=True)
+            )
+            for blob_hash, codec, data in self.db.execute(sql, {"hashes": list(hashes)}):
+                payloads[blob_hash] = "0x" + compression.decompress(codec, bytes(data)).hex()
+        for row in rows:
+            blob_hash = row.pop(ref)
+            if blob_hash:
+                row[field] = payloads[blob_hash]
+        return rows
+
+    def address_ids(self, addresses: Iterable[Optional[str]]) -> Dict[str, int]:
+        """Dictionary ids for a batch's addresses, upserting unseen ones."""
+        addresses = set(addresses)
+        pinned = {address: self._pinned_ids[address] for address in addresses if address in self._pinned_ids}
+        if len(pinned) == len(addresses - {None}):
+            return pinned
+        return {**pinned, **self.addresses.ids(self.db, addresses.difference(pinned))}
+
+    @contextmanager
+    def pipeline(self, addresses: Iterable[Optional[str]] = ()):
+        """
+        Queue the statements issued inside the block and send them in one round trip.
+
+        Uses psycopg 3 pipeline mode; with other drivers it is a no-op. Statements
+        inside must not need their results (e.g. rowcount) before the block exits,
+        and any read forces a sync. Pass the addresses the block's inserts will use:
+        their ids are upserted and looked up before the pipeline starts.
+        """
+        self._pinned_ids = self.address_ids(addresses)
+        try:
+            connection = self.db.connection()
+            driver_connection = connection.connection.driver_connection
+            if connection.dialect.driver != "psycopg" or driver_connection is None:
+                yield
+                return
+            with driver_connection.pipeline():
+                yield
+        finally:
+            self._pinned_ids = {}
+
+    def _execute_dml(self, sql: TextClause, params: Mapping[str, Any]) -> int:
+        """Run an INSERT, UPDATE or DELETE and return the number of rows it affected."""
+        return cast(CursorResult, self.db.execute(sql, params)).rowcount
+
+    def _jsonb(self, param: str) -> str:
+        """Bind expression for a JSON column (SQLite has no jsonb type to cast to)."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return f"CAST(:{param} AS jsonb)"
+        return f":{param}"
+
+    def insert_blocks_bulk(self, blocks: List[BlockModel], staging: bool = False):
         if not blocks:
             return
-        logger.debug(f"Executing Raw SQL: Bulk INSERT {len(blocks)} blocks")
+        table = _table("blocks", staging)
+        logger.debug(f"Executing Raw SQL: Bulk INSERT {len(blocks)} {table}")
         sql = text(
-            """
-            INSERT INTO blocks (
+            f"""
+            INSERT INTO {table} (
                 number, hash, parent_hash, timestamp, miner, 
                 difficulty, total_difficulty, size, extra_data, 
-                gas_limit, gas_used, base_fee_per_gas
+                gas_limit, gas_used, base_fee_per_gas, logs_bloom
             ) VALUES (
                 :number, :hash, :parent_hash, :timestamp, :miner, 
                 :difficulty, :total_difficulty, :size, :extra_data, 
-                :gas_limit, :gas_used, :base_fee_per_gas
+                :gas_limit, :gas_used, :base_fee_per_gas, :logs_bloom
             )
             ON CONFLICT (number) DO NOTHING
         """
@@ -40,70 +267,602 @@ class BlockchainRepository:
         self.db.execute(sql, [b.model_dump(by_alias=False) for b in blocks])
 
     def get_latest_block(self) -> Optional[BlockModel]:
-        sql = text("SELECT * FROM blocks ORDER BY number DESC LIMIT 1")
+        """Latest block across the canonical table and the hot staging table."""
+        columns = ", ".join(BLOCK_COLUMNS)
+        sql = text(
+            f"""
+            SELECT {columns} FROM (
+                SELECT {columns} FROM blocks ORDER BY number DESC LIMIT 1
+            ) AS b
+            UNION ALL
+            SELECT {columns} FROM (
+                SELECT {columns} FROM hot_blocks ORDER BY number DESC LIMIT 1
+            ) AS h
+            ORDER BY number DESC LIMIT 1
+        """
+        )
         result = self.db.execute(sql).mappings().first()
         if result:
             return BlockModel.model_validate(dict(result))
         return None
 
     def get_block_by_number(self, number: int) -> Optional[BlockModel]:
-        sql = text("SELECT * FROM blocks WHERE number = :number")
+        columns = ", ".join(BLOCK_COLUMNS)
+        sql = text(
+            f"""
+            SELECT {columns} FROM hot_blocks WHERE number = :number
+            UNION ALL
+            SELECT {columns} FROM blocks WHERE number = :number
+        """
+        )
         result = self.db.execute(sql, {"number": number}).mappings().first()
         if result:
             return BlockModel.model_validate(dict(result))
         return None
 
-    def insert_transactions_bulk(self, transactions_data: List[dict]):
-        """Fastest multi-row insert for transactions."""
+    def get_block_blooms(self, from_block: int, to_block: int) -> List[Tuple[int, Optional[str]]]:
+        """(number, logs_bloom) pairs for a block range, for bloom prefiltering."""
+        sql = text(
+            f"""
+            {_with_staged("blocks", ("number", "logs_bloom"), "number BETWEEN :from_block AND :to_block")}
+            ORDER BY number
+        """
+        )
+        rows = self.db.execute(sql, {"from_block": from_block, "to_block": to_block})
+        return [(row.number, row.logs_bloom) for row in rows]
+
+    def get_logs(
+        self,
+        block_numbers: Sequence[int],
+        address: Optional[str] = None,
+        topic0: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[dict]:
+        """Logs in the given blocks, optionally restricted to one contract address and topic0."""
+        if not block_numbers:
+            return []
+        clauses = ""
+        params = {"block_numbers": list(block_numbers), "limit": limit}
+        if address:
+            clauses += _address_filter("address_id", "address")
+            params["address"] = address.lower()
+        if topic0:
+            clause, params["topic0_prefix"] = _topic0_filter(topic0)
+            clauses += clause
+        sql = text(
+            f"""
+            {_with_staged("logs", LOG_FIELDS, f"block_number IN :block_numbers{clauses}")}
+            ORDER BY block_number, log_index
+            LIMIT :limit
+        """
+        ).bindparams(bindparam("block_numbers", expanding=True))
+        rows = self.db.execute(sql, params).mappings().all()
+        return self._inflate([_log_row(row) for row in rows], "logs")
+
+    def iter_blocks(self, from_block: int, to_block: int, batch_size: int = 5000) -> Iterator[List[dict]]:
+        """
+        Stream blocks in a range through a server-side cursor, `batch_size` rows at a time.
+        """
+        sql = text(
+            f"""
+            {_with_staged("blocks", BLOCK_COLUMNS, "number BETWEEN :from_block AND :to_block")}
+            ORDER BY number
+        """
+        )
+        result = self.db.execute(
+            sql,
+            {"from_block": from_block, "to_block": to_block},
+            execution_options={"stream_results": True, "yield_per": batch_size},
+        )
+        for partition in result.mappings().partitions(batch_size):
+            yield [dict(row) for row in partition]
+
+    def iter_logs(
+        self,
+        from_block: int,
+        to_block: int,
+        address: Optional[str] = None,
+        topic0: Optional[str] = None,
+        batch_size: int = 5000,
+    ) -> Iterator[List[dict]]:
+        """
+        Stream logs in a block range through a server-side cursor, `batch_size` rows at a time.
+        """
+        clauses = ""
+        params: Dict[str, Any] = {"from_block": from_block, "to_block": to_block}
+        if address:
+            clauses += _address_filter("address_id", "address")
+            params["address"] = address.lower()
+        if topic0:
+            clause, params["topic0_prefix"] = _topic0_filter(topic0)
+            clauses += clause
+        sql = text(
+            f"""
+            {_with_staged("logs", LOG_FIELDS, f"block_number BETWEEN :from_block AND :to_block{clauses}")}
+            ORDER BY block_number, log_index
+        """
+        )
+        result = self.db.execute(
+            sql, params, execution_options={"stream_results": True, "yield_per": batch_size}
+        )
+        for partition in result.mappings().partitions(batch_size):
+            yield self._inflate([_log_row(row) for row in partition], "logs")
+
+    def iter_transactions(
+        self,
+        from_block: int,
+        to_block: int,
+        from_address: Optional[str] = None,
+        to_address: Optional[str] = None,
+        batch_size: int = 5000,
+    ) -> Iterator[List[dict]]:
+        """
+        Stream transactions in a block range through a server-side cursor, `batch_size` rows at a time.
+        """
+        clauses = ""
+        params: Dict[str, Any] = {"from_block": from_block, "to_block": to_block}
+        if from_address:
+            clauses += _address_filter("from_id", "from_address")
+            params["from_address"] = from_address.lower()
+        if to_address:
+            clauses += _address_filter("to_id", "to_address")
+            params["to_address"] = to_address.lower()
+        sql = text(
+            f"""
+            {_with_staged("transactions", TRANSACTION_FIELDS, f"block_number BETWEEN :from_block AND :to_block{clauses}")}
+            ORDER BY block_number, transaction_index
+        """
+        )
+        result = self.db.execute(
+            sql, params, execution_options={"stream_results": True, "yield_per": batch_size}
+        )
+        for partition in result.mappings().partitions(batch_size):
+            yield self._inflate([dict(row) for row in partition], "transactions")
+
+    def get_transaction(self, tx_hash: str) -> Optional[dict]:
+        sql = text(_with_staged("transactions", TRANSACTION_FIELDS, "hash = :hash"))
+        row = self.db.execute(sql, {"hash": tx_hash.lower()}).mappings().first()
+        if row is None:
+            return None
+        return self._inflate([dict(row)], "transactions")[0]
+
+    def insert_transactions_bulk(
+        self, transactions_data: Sequence[Mapping], staging: bool = False
+    ):
+        """Fastest multi-row insert for transactions (TransactionRow records or plain dicts), addresses as ids."""
         if not transactions_data:
             return
+        table = _table("transactions", staging)
         logger.debug(
-            f"Executing Raw SQL: Bulk INSERT {len(transactions_data)} transactions"
+            f"Executing Raw SQL: Bulk INSERT {len(transactions_data)} {table}"
         )
         sql = text(
-            """
-            INSERT INTO transactions (
+            f"""
+            INSERT INTO {table} (
                 hash, nonce, block_hash, block_number, transaction_index, 
-                from_address, to_address, value, gas_price, gas, input
+                from_id, to_id, value, gas_price, gas, input, input_blob
             ) VALUES (
                 :hash, :nonce, :block_hash, :block_number, :transaction_index, 
-                :from_address, :to_address, :value, :gas_price, :gas, :input
+                :from_id, :to_id, :value, :gas_price, :gas, :input, :input_blob
             )
             ON CONFLICT (hash) DO NOTHING
         """
         )
+        ids = self.address_ids(
+            address for tx in transactions_data for address in (tx["from_address"], tx["to_address"])
+        )
+        params = [
+            {**tx, "from_id": ids[tx["from_address"]], "to_id": ids.get(tx["to_address"])}
+            for tx in transactions_data
+        ]
+        self._offload(params, "transactions")
         # SQLAlchemy + Psycopg2 will optimize this into a single efficient command
-        self.db.execute(sql, transactions_data)
+        self.db.execute(sql, params)
 
-    def insert_logs_bulk(self, logs_data: List[dict]):
-        """Fastest multi-row insert for logs."""
+    def insert_logs_bulk(self, logs_data: Sequence[Mapping], staging: bool = False):
+        """
+        Fastest multi-row insert for logs (LogRow records or plain dicts), addresses as ids.
+
+        Idempotent: logs already stored under (block_hash, log_index) are skipped.
+        """
         if not logs_data:
             return
-        logger.debug(f"Executing Raw SQL: Bulk INSERT {len(logs_data)} logs")
+        table = _table("logs", staging)
+        logger.debug(f"Executing Raw SQL: Bulk INSERT {len(logs_data)} {table}")
         sql = text(
-            """
-            INSERT INTO logs (
-                log_index, transaction_hash, address, data, 
-                topics, block_number, block_hash
+            f"""
+            INSERT INTO {table} (
+                log_index, transaction_hash, address_id, data, 
+                topics, block_number, block_hash, data_blob
             ) VALUES (
-                :log_index, :transaction_hash, :address, :data, 
-                CAST(:topics AS jsonb), :block_number, :block_hash
+                :log_index, :transaction_hash, :address_id, :data, 
+                {self._jsonb("topics_json")}, :block_number, :block_hash, :data_blob
             )
+            ON CONFLICT (block_hash, log_index) DO NOTHING
         """
         )
 
-        # Ensure topics are serialized to JSON strings for PostgreSQL jsonb column
-        for data in logs_data:
-            if "topics" in data and isinstance(data["topics"], (list, dict)):
-                data["topics"] = json.dumps(data["topics"])
+        # Bind parameters are copies, so the caller's rows (still used by the Parquet sink) are untouched
+        ids = self.address_ids(data["address"] for data in logs_data)
+        params = [
+            {**data, "topics_json": _topics_json(data), "address_id": ids[data["address"]]}
+            for data in logs_data
+        ]
+        self._offload(params, "logs")
+        self.db.execute(sql, params)
 
-        self.db.execute(sql, logs_data)
+    def apply_balance_deltas(self, block_deltas: Dict[Tuple[int, str], Dict[Tuple[str, str], int]]):
+        """
+        Journal per-block token balance deltas and apply them, netted across the batch.
+
+        Journal rows are keyed by block hash, so a replayed block inserts nothing
+        and only the deltas of newly journaled rows reach the balances. Finalized
+        rows are pruned, so a block is deduplicated until it finalizes.
 
-    def rollback_from_height(self, block_number: int):
-        """Delete all data from a certain height onwards (Atomic Reorg Handling)."""
+        Args:
+            block_deltas: {(block_number, block_hash): {(token_address, holder): delta}}
+        """
+        journal = [
+            (number, block_hash, token, holder, delta)
+            for (number, block_hash), deltas in block_deltas.items()
+            for (token, holder), delta in deltas.items()
+        ]
+        if not journal:
+            return
+        netted: Dict[Tuple[str, str], int] = defaultdict(int)
+        for start in range(0, len(journal), BALANCE_JOURNAL_CHUNK):
+            chunk = journal[start : start + BALANCE_JOURNAL_CHUNK]
+            # executemany cannot return rows, so each chunk is one multi-row INSERT
+            values = ", ".join(f"(:n{i}, :b{i}, :t{i}, :h{i}, :d{i})" for i in range(len(chunk)))
+            params: Dict[str, Any] = {}
+            for i, row in enumerate(chunk):
+                params.update(zip((f"n{i}", f"b{i}", f"t{i}", f"h{i}", f"d{i}"), row))
+            inserted = self.db.execute(
+                text(
+                    f"""
+                    INSERT INTO token_balance_deltas (block_number, block_hash, token_address, holder, delta)
+                    VALUES {values}
+                    ON CONFLICT (block_hash, token_address, holder) DO NOTHING
+                    RETURNING token_address, holder, delta
+                """
+                ),
+                params,
+            )
+            for token, holder, delta in inserted:
+                netted[(token, holder)] += int(delta)
+        if not netted:
+            logger.debug(f"All {len(journal)} balance deltas were already journaled")
+            return
+
+        logger.debug(f"Executing Raw SQL: {len(journal)} balance deltas, {len(netted)} balances")
+        self.db.execute(
+            text(
+                """
+                INSERT INTO token_balances (token_address, holder, balance)
+                VALUES (:token_address, :holder, :delta)
+                ON CONFLICT (token_address, holder)
+                DO UPDATE SET balance = token_balances.balance + EXCLUDED.balance
+            """
+            ),
+            [
+                {"token_address": token, "holder": holder, "delta": delta}
+                for (token, holder), delta in netted.items()
+                if delta
+            ],
+        )
+
+    def get_token_balance(self, token_address: str, holder: str) -> Optional[int]:
+        sql = text(
+            """
+            SELECT balance FROM token_balances
+            WHERE token_address = :token_address AND holder = :holder
+        """
+        )
+        balance = self.db.execute(
+            sql, {"token_address": token_address.lower(), "holder": holder.lower()}
+        ).scalar()
+        return int(balance) if balance is not None else None
+
+    def apply_block_stats(self, block_stats: Sequence[Mapping]):
+        """
+        Store per-block stats and add them to the minute/hour rollups, netted per bucket.
+
+        A block's stats are inserted once; a duplicate height fails the batch rather
+        than being counted twice in the rollups.
+        """
+        if not block_stats:
+            return
+        columns = ", ".join(BLOCK_STATS_COLUMNS)
+        values = ", ".join(f":{column}" for column in BLOCK_STATS_COLUMNS)
+        logger.debug(f"Executing Raw SQL: INSERT {len(block_stats)} block_stats")
+        self.db.execute(text(f"INSERT INTO block_stats ({columns}) VALUES ({values})"), list(block_stats))
+        for interval in STATS_INTERVALS:
+            self._add_to_rollup(interval, rollup_deltas(block_stats, interval))
+
+    def _add_to_rollup(self, interval: str, deltas: List[dict]):
+        if not deltas:
+            return
+        table = STATS_INTERVALS[interval][0]
+        columns = ", ".join(ROLLUP_COLUMNS)
+        values = ", ".join(f":{column}" for column in ROLLUP_COLUMNS)
+        updates = ", ".join(f"{column} = {table}.{column} + EXCLUDED.{column}" for column in ROLLUP_COLUMNS)
+        self.db.execute(
+            text(
+                f"""
+                INSERT INTO {table} (bucket_start, {columns})
+                VALUES (:bucket_start, {values})
+                ON CONFLICT (bucket_start) DO UPDATE SET {updates}
+            """
+            ),
+            deltas,
+        )
+
+    def revert_block_stats(self, block_number: int):
+        """Subtract the stats of blocks at or above block_number from the rollups, then drop them."""
+        params = {"num": block_number}
+        columns = ", ".join(BLOCK_STATS_COLUMNS)
+        reverted = self.db.execute(
+            text(f"SELECT {columns} FROM block_stats WHERE number >= :num"), params
+        ).mappings().all()
+        if not reverted:
+            return
+        for interval, (table, _) in STATS_INTERVALS.items():
+            self._add_to_rollup(interval, rollup_deltas(reverted, interval, sign=-1))
+            self.db.execute(text(f"DELETE FROM {table} WHERE block_count <= 0"))
+        self.db.execute(text("DELETE FROM block_stats WHERE number >= :num"), params)
+
+    def get_chain_stats(
+        self,
+        interval: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 60,
+    ) -> List[dict]:
+        """The latest `limit` rollup buckets in [start, end], oldest first."""
+        table = STATS_INTERVALS[interval][0]
+        clauses = []
+        params: Dict[str, Any] = {"limit": limit}
+        if start is not None:
+            clauses.append("bucket_start >= :start")
+            params["start"] = start
+        if end is not None:
+            clauses.append("bucket_start <= :end")
+            params["end"] = end
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = text(
+            f"""
+            SELECT bucket_start, {", ".join(ROLLUP_COLUMNS)} FROM {table}
+            {where}
+            ORDER BY bucket_start DESC
+            LIMIT :limit
+        """
+        )
+        rows = self.db.execute(sql, params).mappings().all()
+        return [dict(row) for row in reversed(rows)]
+
+    def insert_address_activity(self, postings: Sequence[Mapping]):
+        if not postings:
+            return
+        logger.debug(f"Executing Raw SQL: Bulk INSERT {len(postings)} address_activity")
+        ids = self.address_ids(posting["address"] for posting in postings)
+        self.db.execute(
+            text(
+                """
+                INSERT INTO address_activity (
+                    address_id, block_number, tx_index, log_index, role, transaction_hash
+                ) VALUES (
+                    :address_id, :block_number, :tx_index, :log_index, :role, :transaction_hash
+                )
+                ON CONFLICT (address_id, block_number, tx_index, log_index, role) DO NOTHING
+            """
+            ),
+            [{**posting, "address_id": ids[posting["address"]]} for posting in postings],
+        )
+
+    def get_address_activity(
+        self,
+        address: str,
+        before: Optional[Tuple[int, int, int, str]] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """
+        An address's postings, newest first.
+
+        Keyset pagination: pass the (block_number, tx_index, log_index, role) of the
+        last row of the previous page as `before`.
+        """
+        address = address.lower()
+        clause = ""
+        params = {"address": address, "limit": limit}
+        if before is not None:
+            clause = "AND (block_number, tx_index, log_index, role) < (:block_number, :tx_index, :log_index, :role)"
+            params.update(zip(("block_number", "tx_index", "log_index", "role"), before))
+        sql = text(
+            f"""
+            SELECT block_number, tx_index, log_index, role, transaction_hash
+            FROM address_activity
+            WHERE address_id = (SELECT id FROM addresses WHERE address = :address) {clause}
+            ORDER BY block_number DESC, tx_index DESC, log_index DESC, role DESC
+            LIMIT :limit
+        """
+        )
+        return [{"address": address, **row} for row in self.db.execute(sql, params).mappings()]
+
+    def mark_synced(self, start: int, end: int):
+        """Record heights start..end as indexed, merging with overlapping or adjacent ranges."""
+        params = {"start": start, "end": end}
+        touching = "end_block >= :start - 1 AND start_block <= :end + 1"
+        merged = self.db.execute(
+            text(f"SELECT MIN(start_block), MAX(end_block) FROM sync_ranges WHERE {touching}"), params
+        ).one()
+        if merged[0] is not None:
+            params = {"start": min(start, merged[0]), "end": max(end, merged[1])}
+            self.db.execute(text(f"DELETE FROM sync_ranges WHERE {touching}"), params)
+        self.db.execute(
+            text(
+                """
+                INSERT INTO sync_ranges (start_block, end_block) VALUES (:start, :end)
+                ON CONFLICT (start_block) DO UPDATE SET end_block = CASE
+                    WHEN excluded.end_block > sync_ranges.end_block THEN excluded.end_block
+                    ELSE sync_ranges.end_block
+                END
+            """
+            ),
+            params,
+        )
+
+    def get_sync_ranges(self) -> List[Tuple[int, int]]:
+        """
+        Indexed height ranges, ascending and merged.
+
+        The tip and backfill workers write from separate sessions, so rows they
+        committed concurrently may overlap; they are merged on read.
+        """
+        rows = self.db.execute(text("SELECT start_block, end_block FROM sync_ranges ORDER BY start_block"))
+        ranges: List[Tuple[int, int]] = []
+        for start, end in rows:
+            if ranges and start <= ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def seed_sync_ranges(self) -> bool:
+        """
+        Record the blocks indexed before ranges were tracked as one range.
+
+        The block-by-block engine only ever extended a contiguous chain, so
+        min..max of the indexed heights is covered. No-op once any range exists.
+        """
+        if self.db.execute(text("SELECT 1 FROM sync_ranges LIMIT 1")).first() is not None:
+            return False
+        bounds = self.db.execute(
+            text(
+                """
+                SELECT MIN(lo), MAX(hi) FROM (
+                    SELECT MIN(number) AS lo, MAX(number) AS hi FROM blocks
+                    UNION ALL
+                    SELECT MIN(number), MAX(number) FROM hot_blocks
+                ) AS b
+            """
+            )
+        ).one()
+        if bounds[0] is None:
+            return False
+        self.mark_synced(bounds[0], bounds[1])
+        return True
+
+    def prune_balance_journal(self, finalized_height: int):
+        """Finalized deltas can never be reverted, so their journal rows are dropped."""
+        self.db.execute(
+            text("DELETE FROM token_balance_deltas WHERE block_number <= :num"),
+            {"num": finalized_height},
+        )
+
+    def promote_finalized(self, finalized_height: int) -> int:
+        """
+        Move staged blocks at or below the finalized height into the canonical tables.
+
+        Returns:
+            The number of blocks promoted.
+        """
+        params = {"num": finalized_height}
+        block_cols = ", ".join(BLOCK_COLUMNS)
+        tx_cols = ", ".join(TRANSACTION_COLUMNS)
+        log_cols = ", ".join(LOG_COLUMNS)
+        promoted = self._execute_dml(
+            text(
+                f"""
+                INSERT INTO blocks ({block_cols})
+                SELECT {block_cols} FROM hot_blocks WHERE number <= :num
+                ON CONFLICT (number) DO NOTHING
+            """
+            ),
+            params,
+        )
+        self.db.execute(
+            text(
+                f"""
+                INSERT INTO transactions ({tx_cols})
+                SELECT {tx_cols} FROM hot_transactions WHERE block_number <= :num
+                ON CONFLICT (hash) DO NOTHING
+            """
+            ),
+            params,
+        )
+        self.db.execute(
+            text(
+                f"""
+                INSERT INTO logs ({log_cols})
+                SELECT {log_cols} FROM hot_logs WHERE block_number <= :num
+                ON CONFLICT (block_hash, log_index) DO NOTHING
+            """
+            ),
+            params,
+        )
+        self.db.execute(text("DELETE FROM hot_logs WHERE block_number <= :num"), params)
+        self.db.execute(
+            text("DELETE FROM hot_transactions WHERE block_number <= :num"), params
+        )
+        self.db.execute(text("DELETE FROM hot_blocks WHERE number <= :num"), params)
+        if promoted:
+            logger.info(f"Promoted {promoted} finalized blocks up to {finalized_height}")
+        return promoted
+
+    def rollback_from_height(self, block_number: int, orphan_limit: int = DEFAULT_ORPHAN_LIMIT):
+        """
+        Delete all data from a certain height onwards (Atomic Reorg Handling).
+
+        The deleted rows are first copied into the orphan journal, which keeps the
+        `orphan_limit` most recent blocks (0 disables the journal). Returns the
+        number of blocks deleted.
+        """
+        if orphan_limit > 0:
+            self.journal_orphans(block_number)
+            self.prune_orphans(orphan_limit)
         logger.warning(
             f"Executing Raw SQL: DELETE FROM ... WHERE block_number >= {block_number}"
         )
+        self.revert_block_stats(block_number)
+        self.db.execute(text("DELETE FROM sync_ranges WHERE start_block >= :num"), {"num": block_number})
+        self.db.execute(
+            text("UPDATE sync_ranges SET end_block = :num - 1 WHERE end_block >= :num"), {"num": block_number}
+        )
+        self.db.execute(
+            text("DELETE FROM address_activity WHERE block_number >= :num"),
+            {"num": block_number},
+        )
+        # Subtract reverted balance deltas before dropping their journal rows
+        self.db.execute(
+            text(
+                """
+                UPDATE token_balances
+                SET balance = balance - (
+                    SELECT SUM(d.delta) FROM token_balance_deltas d
+                    WHERE d.block_number >= :num
+                      AND d.token_address = token_balances.token_address
+                      AND d.holder = token_balances.holder
+                )
+                WHERE (token_address, holder) IN (
+                    SELECT token_address, holder FROM token_balance_deltas
+                    WHERE block_number >= :num
+                )
+            """
+            ),
+            {"num": block_number},
+        )
+        self.db.execute(
+            text("DELETE FROM token_balance_deltas WHERE block_number >= :num"),
+            {"num": block_number},
+        )
+        for table in ("hot_logs", "hot_transactions"):
+            self.db.execute(
+                text(f"DELETE FROM {table} WHERE block_number >= :num"),
+                {"num": block_number},
+            )
+        deleted = self._execute_dml(
+            text("DELETE FROM hot_blocks WHERE number >= :num"), {"num": block_number}
+        )
         self.db.execute(
             text("DELETE FROM logs WHERE block_number >= :num"), {"num": block_number}
         )
@@ -111,6 +870,121 @@ class BlockchainRepository:
             text("DELETE FROM transactions WHERE block_number >= :num"),
             {"num": block_number},
         )
-        self.db.execute(
+        deleted += self._execute_dml(
             text("DELETE FROM blocks WHERE number >= :num"), {"num": block_number}
         )
+        return deleted
+
+    def journal_orphans(self, block_number: int):
+        """Copy canonical and staged rows at or above block_number into the orphan journal."""
+        params = {"num": block_number}
+        block_cols = ", ".join(BLOCK_COLUMNS)
+        tx_cols = ", ".join(TRANSACTION_COLUMNS)
+        log_cols = ", ".join(LOG_COLUMNS)
+        for staging in (False, True):
+            self.db.execute(
+                text(
+                    f"""
+                    INSERT INTO orphaned_blocks ({block_cols})
+                    SELECT {block_cols} FROM {_table("blocks", staging)} WHERE number >= :num
+                    ON CONFLICT (hash) DO NOTHING
+                """
+                ),
+                params,
+            )
+            self.db.execute(
+                text(
+                    f"""
+                    INSERT INTO orphaned_transactions ({tx_cols})
+                    SELECT {tx_cols} FROM {_table("transactions", staging)} WHERE block_number >= :num
+                    ON CONFLICT (block_hash, hash) DO NOTHING
+                """
+                ),
+                params,
+            )
+            self.db.execute(
+                text(
+                    f"""
+                    INSERT INTO orphaned_logs ({log_cols})
+                    SELECT {log_cols} FROM {_table("logs", staging)} WHERE block_number >= :num
+                    ON CONFLICT (block_hash, log_index) DO NOTHING
+                """
+                ),
+                params,
+            )
+
+    def prune_orphans(self, limit: int):
+        """Keep only the `limit` most recently orphaned blocks (highest first within a reorg)."""
+        self.db.execute(
+            text(
+                """
+                DELETE FROM orphaned_blocks WHERE hash NOT IN (
+                    SELECT hash FROM orphaned_blocks
+                    ORDER BY orphaned_at DESC, number DESC LIMIT :limit
+                )
+            """
+            ),
+            {"limit": limit},
+        )
+        for table in ("orphaned_transactions", "orphaned_logs"):
+            self.db.execute(
+                text(
+                    f"DELETE FROM {table} WHERE block_hash NOT IN (SELECT hash FROM orphaned_blocks)"
+                )
+            )
+
+    def get_orphan_ceiling(self) -> Optional[int]:
+        """Highest orphaned block number, i.e. the last height a flip-back could restore."""
+        return self.db.execute(text("SELECT MAX(number) FROM orphaned_blocks")).scalar()
+
+    def restore_orphaned_block(self, block_hash: str, staging: bool = False) -> bool:
+        """
+        Move a journaled block, its transactions and logs back into the live tables.
+
+        Returns:
+            False if the hash is not in the journal (or its height is already occupied).
+        """
+        params = {"hash": block_hash}
+        block_cols = ", ".join(BLOCK_COLUMNS)
+        tx_cols = ", ".join(TRANSACTION_COLUMNS)
+        log_cols = ", ".join(LOG_COLUMNS)
+        restored = self._execute_dml(
+            text(
+                f"""
+                INSERT INTO {_table("blocks", staging)} ({block_cols})
+                SELECT {block_cols} FROM orphaned_blocks WHERE hash = :hash
+                ON CONFLICT (number) DO NOTHING
+            """
+            ),
+            params,
+        )
+        if not restored:
+            return False
+        self.db.execute(
+            text(
+                f"""
+                INSERT INTO {_table("transactions", staging)} ({tx_cols})
+                SELECT {tx_cols} FROM orphaned_transactions WHERE block_hash = :hash
+                ON CONFLICT (hash) DO NOTHING
+            """
+            ),
+            params,
+        )
+        self.db.execute(
+            text(
+                f"""
+                INSERT INTO {_table("logs", staging)} ({log_cols})
+                SELECT {log_cols} FROM orphaned_logs WHERE block_hash = :hash
+                ON CONFLICT (block_hash, log_index) DO NOTHING
+            """
+            ),
+            params,
+        )
+        for table, column in (
+            ("orphaned_logs", "block_hash"),
+            ("orphaned_transactions", "block_hash"),
+            ("orphaned_blocks", "hash"),
+        ):
+            self.db.execute(text(f"DELETE FROM {table} WHERE {column} = :hash"), params)
+        logger.info(f"Restored block {block_hash} from the orphan journal")
+        return True
@@ -0,0 +1,43 @@
+from typing import Dict, Iterable, List, Mapping
+
+from domain.schemas import TransferEvent
+
+# log_index stored for postings that come from a transaction rather than a log
+TX_LEVEL = -1
+
+
+def address_postings(
+    txs: Iterable[Mapping], logs: Iterable[Mapping], transfers: Iterable[TransferEvent]
+) -> List[Dict]:
+    """
+    One address_activity row per (address, role) a block's rows touch.
+
+    Roles: "from"/"to" of a transaction, "log" for the emitting contract, and
+    "transfer_from"/"transfer_to" for decoded ERC-20 transfer participants.
+    """
+    tx_index: Dict[str, int] = {}
+    postings = []
+
+    def post(address, block_number, index, log_index, role, tx_hash):
+        postings.append({
+            "address": address,
+            "block_number": block_number,
+            "tx_index": index,
+            "log_index": log_index,
+            "role": role,
+            "transaction_hash": tx_hash,
+        })
+
+    for tx in txs:
+        tx_index[tx["hash"]] = tx["transaction_index"]
+        post(tx["from_address"], tx["block_number"], tx["transaction_index"], TX_LEVEL, "from", tx["hash"])
+        if tx["to_address"]:
+            post(tx["to_address"], tx["block_number"], tx["transaction_index"], TX_LEVEL, "to", tx["hash"])
+    for log in logs:
+        index = tx_index.get(log["transaction_hash"], TX_LEVEL)
+        post(log["address"], log["block_number"], index, log["log_index"], "log", log["transaction_hash"])
+    for transfer in transfers:
+        index = tx_index.get(transfer.transaction_hash, TX_LEVEL)
+        for address, role in ((transfer.from_address, "transfer_from"), (transfer.to_address, "transfer_to")):
+            post(address, transfer.block_number, index, transfer.log_index, role, transfer.transaction_hash)
+    return postings
@@ -1,5 +1,6 @@
 import logging
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from web3 import Web3
 from web3._utils.events import get_event_data
@@ -24,6 +25,29 @@ TRANSFER_EVENT_TOPIC = (
     "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 )
 
+ZERO_ADDRESS = "0x" + "0" * 40
+
+
+def net_transfer_deltas(
+    transfers: Iterable[TransferEvent],
+) -> Dict[Tuple[str, str], int]:
+    """
+    Net a batch of transfers into per-(token, holder) balance changes.
+
+    Mints and burns only move the counterparty; the zero address is not tracked.
+    """
+    deltas: Dict[Tuple[str, str], int] = defaultdict(int)
+    for transfer in transfers:
+        token = transfer.token_address
+        if token is None:
+            # Only transfers decoded from a log know their token
+            continue
+        if transfer.from_address != ZERO_ADDRESS:
+            deltas[(token, transfer.from_address)] -= transfer.value
+        if transfer.to_address != ZERO_ADDRESS:
+            deltas[(token, transfer.to_address)] += transfer.value
+    return {key: delta for key, delta in deltas.items() if delta}
+
 
 class LogDecoder:
     def __init__(self):
@@ -70,6 +94,29 @@ class LogDecoder:
             logger.error(f"Failed to decode log: {e}")
             return None
 
+    def decode_transfer_row(self, log: Mapping[str, Any]) -> Optional[TransferEvent]:
+        """
+        Decode a validated log row (snake_case keys, lowercase hex) as an ERC-20 Transfer.
+
+        Skips the ABI codec: both addresses are indexed topics and the value is the
+        only data word. ERC-721 transfers (tokenId as a 4th topic) are ignored.
+        """
+        topics = log.get("topics") or []
+        if len(topics) != 3 or topics[0] != TRANSFER_EVENT_TOPIC:
+            return None
+        data = log.get("data") or ""
+        if len(data) != 66:
+            return None
+        return TransferEvent(
+            from_address="0x" + topics[1][-40:],
+            to_address="0x" + topics[2][-40:],
+            value=int(data, 16),
+            transaction_hash=log["transaction_hash"],
+            block_number=log["block_number"],
+            log_index=log["log_index"],
+            token_address=log["address"],
+        )
+
     def decode_batch(self, logs: List[Dict[str, Any]]) -> List[TransferEvent]:
         """Decode a list of logs and return only valid TransferEvents."""
         decoded_events = []
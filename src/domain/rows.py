@@ -0,0 +1,113 @@
+"""
+Compact ingest rows built once, straight from RPC payloads.
+
+Rows are slotted dataclasses whose fields follow the table's column order. They
+also read like mappings, so the repository can expand them into bind parameters
+and decoders / the Parquet sink can keep using row["..."].
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional
+
+from domain.schemas import validate_hex
+from utils import fast_json
+
+
+def _uint(value: Any, name: str) -> int:
+    if isinstance(value, str):
+        value = int(value, 16) if value.startswith("0x") else int(value)
+    if not isinstance(value, int) or value < 0:
+        raise ValueError(f"{name} must be a non-negative integer, got {value!r}")
+    return value
+
+
+class _Row(Mapping):
+    """Read-only mapping view over a slotted dataclass's fields."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+
+@dataclass(slots=True)
+class TransactionRow(_Row):
+    hash: str
+    nonce: int
+    block_hash: str
+    block_number: int
+    transaction_index: int
+    from_address: str
+    to_address: Optional[str]
+    value: int
+    gas_price: int
+    gas: int
+    input: str
+
+    @classmethod
+    def from_rpc(cls, tx: Mapping) -> "TransactionRow":
+        """Validate an eth_getTransaction / full-block transaction payload (camelCase keys)."""
+        to_address = tx.get("to")
+        return cls(
+            validate_hex(tx["hash"], 64),
+            _uint(tx["nonce"], "nonce"),
+            validate_hex(tx["blockHash"], 64),
+            _uint(tx["blockNumber"], "blockNumber"),
+            _uint(tx["transactionIndex"], "transactionIndex"),
+            validate_hex(tx["from"], 40),
+            None if to_address is None else validate_hex(to_address, 40),
+            _uint(tx["value"], "value"),
+            _uint(tx["gasPrice"], "gasPrice"),
+            _uint(tx["gas"], "gas"),
+            validate_hex(tx["input"]),
+        )
+
+
+@dataclass(slots=True)
+class LogRow(_Row):
+    log_index: int
+    transaction_hash: str
+    address: str
+    data: str
+    topics: List[str]
+    block_number: int
+    block_hash: str
+
+    @classmethod
+    def from_rpc(cls, log: Mapping) -> "LogRow":
+        """Validate an eth_getLogs entry (camelCase keys)."""
+        return cls(
+            _uint(log["logIndex"], "logIndex"),
+            validate_hex(log["transactionHash"], 64),
+            validate_hex(log["address"], 40),
+            validate_hex(log["data"]),
+            [validate_hex(t, 64) for t in log["topics"]],
+            _uint(log["blockNumber"], "blockNumber"),
+            validate_hex(log["blockHash"], 64),
+        )
+
+    @property
+    def topics_json(self) -> str:
+        """Topics serialized for the JSON column, computed at bind time only."""
+        return fast_json.dumps(self.topics)
+
+    # topics_json is bindable but not a column, so it is left out of iteration
+    def __getitem__(self, key: str) -> Any:
+        if key == "topics_json":
+            return self.topics_json
+        return _Row.__getitem__(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key == "topics_json" or _Row.__contains__(self, key)
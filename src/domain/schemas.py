@@ -1,6 +1,7 @@
 import re
 from datetime import datetime
 from typing import Annotated, Any, List, Optional
+
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 # Hex string patterns
@@ -73,12 +74,20 @@ class TransferEvent(BaseModel):
     transaction_hash: Hash32
     block_number: int = Field(ge=0)
     log_index: int = Field(ge=0)
+    token_address: Optional[Address] = None
 
     @field_validator("from_address", "to_address", mode="before")
     @classmethod
     def validate_addresses(cls, v: str) -> str:
         return validate_hex(v, 40)
 
+    @field_validator("token_address", mode="before")
+    @classmethod
+    def validate_token_address(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return None
+        return validate_hex(v, 40)
+
     @field_validator("transaction_hash", mode="before")
     @classmethod
     def validate_hash(cls, v: str) -> str:
@@ -131,6 +140,7 @@ class BlockModel(BaseModel):
     gas_limit: int = Field(ge=0, alias="gasLimit")
     gas_used: int = Field(ge=0, alias="gasUsed")
     base_fee_per_gas: Optional[int] = Field(None, ge=0, alias="baseFeePerGas")
+    logs_bloom: Optional[HexData] = Field(None, alias="logsBloom")
 
     @field_validator("hash", "parent_hash", mode="before")
     @classmethod
@@ -147,9 +157,69 @@ class BlockModel(BaseModel):
     def validate_extra_data(cls, v: Any) -> str:
         return validate_hex(v)
 
+    @field_validator("logs_bloom", mode="before")
+    @classmethod
+    def validate_logs_bloom(cls, v: Any) -> Optional[str]:
+        if v is None:
+            return None
+        return validate_hex(v, 512)
+
     @field_validator("timestamp", mode="before")
     @classmethod
-    def validate_timestamp(cls, v: any) -> datetime:
+    def validate_timestamp(cls, v: Any) -> datetime:
         if isinstance(v, (int, float)):
             return datetime.fromtimestamp(v)
         return v
+
+
+class TokenBalanceModel(BaseModel):
+    token_address: Address
+    holder: Address
+    # uint256 balances do not fit in a JSON number, so they are served as decimal strings
+    balance: str
+
+
+class ChainStatsModel(BaseModel):
+    bucket_start: datetime
+    block_count: int
+    tx_count: int
+    log_count: int
+    gas_used: int
+    # uint256 totals are served as decimal strings, like token balances
+    fees_burned: str
+    total_value: str
+    # The same totals in Ether, 18 decimal places
+    fees_burned_ether: str
+    total_value_ether: str
+    avg_base_fee_per_gas: int
+    # A sender active in several blocks counts once per block
+    sender_block_count: int = Field(..., description="Sum of per-block distinct senders, not distinct per bucket")
+
+
+class AddressActivityModel(BaseModel):
+    address: Address
+    block_number: int
+    tx_index: int
+    # -1 for transaction-level roles ("from", "to")
+    log_index: int
+    role: str
+    transaction_hash: Hash32
+
+
+class AddressActivityPageModel(BaseModel):
+    items: List[AddressActivityModel]
+    # Pass back as `cursor` for the next (older) page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class SyncRangeModel(BaseModel):
+    start_block: int
+    end_block: int
+    block_count: int
+
+
+class SyncRangesModel(BaseModel):
+    # Fully indexed runs of heights, ascending
+    ranges: List[SyncRangeModel]
+    # Heights between the lowest and highest indexed block still missing (backfill work left)
+    gaps: List[SyncRangeModel]
@@ -0,0 +1,69 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from domain.schemas import BlockModel
+
+# Rollup granularities: table name and the timestamp fields truncated to form a bucket
+STATS_INTERVALS: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "minute": ("chain_stats_minute", {"second": 0, "microsecond": 0}),
+    "hour": ("chain_stats_hour", {"minute": 0, "second": 0, "microsecond": 0}),
+}
+
+# Additive rollup columns: a reorg reverses a block by subtracting its row
+ROLLUP_COLUMNS = (
+    "block_count", "tx_count", "log_count", "gas_used",
+    "fees_burned", "total_value", "base_fee_sum", "sender_block_count",
+)
+
+
+def bucket_start(timestamp: datetime, interval: str) -> datetime:
+    return timestamp.replace(**STATS_INTERVALS[interval][1])
+
+
+def compute_block_stats(block: BlockModel, txs: Iterable[Mapping], logs: Iterable[Mapping]) -> Dict[str, Any]:
+    """
+    Per-block aggregates, computed from rows already in memory at ingest.
+
+    fees_burned is base fee x gas used (EIP-1559); pre-London blocks burn nothing.
+    """
+    tx_count, total_value, senders = 0, 0, set()
+    for tx in txs:
+        tx_count += 1
+        total_value += int(tx["value"])
+        senders.add(tx["from_address"])
+    base_fee = block.base_fee_per_gas or 0
+    return {
+        "number": block.number,
+        "timestamp": block.timestamp,
+        "minute_bucket": bucket_start(block.timestamp, "minute"),
+        "hour_bucket": bucket_start(block.timestamp, "hour"),
+        "tx_count": tx_count,
+        "log_count": sum(1 for _ in logs),
+        "gas_used": block.gas_used,
+        "base_fee_per_gas": block.base_fee_per_gas,
+        "fees_burned": base_fee * block.gas_used,
+        "total_value": total_value,
+        "unique_senders": len(senders),
+    }
+
+
+def rollup_deltas(block_stats: Iterable[Mapping], interval: str, sign: int = 1) -> List[Dict[str, Any]]:
+    """Net per-block stats into one additive delta per bucket (sign=-1 reverses them)."""
+    bucket_key = f"{interval}_bucket"
+    buckets: Dict[Any, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(ROLLUP_COLUMNS, 0))
+    for stats in block_stats:
+        bucket = buckets[stats[bucket_key]]
+        bucket["block_count"] += 1
+        bucket["tx_count"] += stats["tx_count"]
+        bucket["log_count"] += stats["log_count"]
+        bucket["gas_used"] += stats["gas_used"]
+        bucket["fees_burned"] += int(stats["fees_burned"])
+        bucket["total_value"] += int(stats["total_value"])
+        bucket["base_fee_sum"] += stats["base_fee_per_gas"] or 0
+        # Distinct senders do not add across blocks: a bucket counts (sender, block) pairs
+        bucket["sender_block_count"] += stats["unique_senders"]
+    return [
+        {"bucket_start": start, **{column: sign * value for column, value in totals.items()}}
+        for start, totals in buckets.items()
+    ]
@@ -1,10 +1,11 @@
 import logging
 import sys
-import threading
-import uvicorn
-from database.connection import SessionLocal
-from core.provider import BlockchainProvider
-from core.engine import SyncEngine
+
+from core.config import settings
+from core.supervisor import ProcessSupervisor
+
+# The sync stack (web3, tenacity, the provider and engine) and uvicorn are imported
+# inside the entry points that need them, so an API-only process never loads web3.
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,28 +16,74 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def run_sync_engine():
-    """Function to run the sync engine in a background thread."""
-    db = SessionLocal()
+    """Run the sync engine with its own small connection pool. Crashes propagate to the caller."""
+    from core.engine import SyncEngine
+    from core.provider import BlockchainProvider
+    from core.subscription import NewHeadsSubscriber
+    from database.connection import create_session_factory
+
+    session_factory = create_session_factory("sync")
+    db = session_factory()
+    head_subscriber = NewHeadsSubscriber(settings.ws_url) if settings.ws_url else None
+    backfill = None
     try:
         provider = BlockchainProvider()
-        engine = SyncEngine(db, provider)
+        if head_subscriber:
+            head_subscriber.start()
+        engine = SyncEngine(db, provider, head_subscriber=head_subscriber)
+        if settings.backfill_start_block is not None:
+            backfill = start_backfill(session_factory, provider)
         engine.run()
-    except Exception as e:
-        logger.error(f"Sync Engine crashed: {e}")
     finally:
+        if backfill:
+            backfill.stop()
+            backfill.engine.db.close()
+        if head_subscriber:
+            head_subscriber.stop()
         db.close()
 
-def main():
-    logger.info("Starting ETH Lindy Indexer (Combined Mode)...")
-    
-    # 1. Start Sync Engine in a background daemon thread
-    sync_thread = threading.Thread(target=run_sync_engine, daemon=True)
-    sync_thread.start()
-    logger.info("Background Sync Engine started.")
+def start_backfill(session_factory, provider):
+    """Historical cursor with its own session and download pool, next to the tip engine."""
+    from core.backfill import BackfillWorker
+    from core.engine import SyncEngine
+
+    if settings.sync_mode == "filtered":
+        logger.warning("BACKFILL_START_BLOCK is ignored in filtered sync mode")
+        return None
+    backfill = BackfillWorker(
+        SyncEngine(session_factory(), provider),
+        start_block=settings.backfill_start_block,
+        direction=settings.backfill_direction,
+        workers=settings.backfill_workers,
+        chunk_size=settings.backfill_chunk_blocks,
+    )
+    backfill.start()
+    return backfill
 
-    # 2. Start FastAPI Server in the main thread
-    # We use the string import to avoid issues with reload and threading if needed
-    uvicorn.run("api.router:app", host="0.0.0.0", port=8000, log_level="info")
+def start_sync():
+    """Sync worker process: exits non-zero on a crash so a supervisor can restart it."""
+    logger.info("Starting ETH Lindy Indexer sync worker...")
+    try:
+        run_sync_engine()
+    except Exception:
+        logger.exception("Sync Engine crashed")
+        sys.exit(1)
+
+def start_api():
+    """API server process, serving reads only."""
+    import uvicorn
+
+    logger.info("Starting ETH Lindy Indexer API server...")
+    uvicorn.run("api.router:app", host=settings.api_host, port=settings.api_port, log_level="info")
+
+def main():
+    """
+    Supervisor mode: run the sync worker and the API server as separate processes,
+    so ingest CPU does not compete with request handling for the GIL, and restart
+    either one if it crashes.
+    """
+    logger.info("Starting ETH Lindy Indexer (supervisor mode)...")
+    ProcessSupervisor({"sync": start_sync, "api": start_api}).run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
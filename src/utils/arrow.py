@@ -0,0 +1,104 @@
+"""
+Arrow schemas and record-batch helpers for columnar exports.
+
+pyarrow is an optional dependency (`pip install -e ".[analytics]"`), so it is
+only imported when one of these helpers is actually called.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+# uint256 amounts exceed decimal256's 76 digits, so they are carried as decimal strings
+UINT256_COLUMNS = {"value", "difficulty", "total_difficulty"}
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # type: ignore[import-untyped]
+    except ImportError as e:
+        raise ImportError("Arrow output requires pyarrow: pip install -e '.[analytics]'") from e
+    return pyarrow
+
+
+def require_parquet():
+    require_pyarrow()
+    import pyarrow.parquet  # type: ignore[import-untyped]
+
+    return pyarrow.parquet
+
+
+def schema_for(table: str):
+    pa = require_pyarrow()
+    schemas = {
+        "blocks": pa.schema(
+            [
+                ("number", pa.int64()),
+                ("hash", pa.string()),
+                ("parent_hash", pa.string()),
+                ("timestamp", pa.timestamp("s")),
+                ("miner", pa.string()),
+                ("difficulty", pa.string()),
+                ("total_difficulty", pa.string()),
+                ("size", pa.int32()),
+                ("extra_data", pa.string()),
+                ("gas_limit", pa.int64()),
+                ("gas_used", pa.int64()),
+                ("base_fee_per_gas", pa.int64()),
+                ("logs_bloom", pa.string()),
+            ]
+        ),
+        "transactions": pa.schema(
+            [
+                ("hash", pa.string()),
+                ("nonce", pa.int64()),
+                ("block_hash", pa.string()),
+                ("block_number", pa.int64()),
+                ("transaction_index", pa.int32()),
+                ("from_address", pa.string()),
+                ("to_address", pa.string()),
+                ("value", pa.string()),
+                ("gas_price", pa.int64()),
+                ("gas", pa.int64()),
+                ("input", pa.string()),
+            ]
+        ),
+        "transfers": pa.schema(
+            [
+                ("token_address", pa.string()),
+                ("from_address", pa.string()),
+                ("to_address", pa.string()),
+                ("value", pa.string()),
+                ("transaction_hash", pa.string()),
+                ("block_number", pa.int64()),
+                ("log_index", pa.int32()),
+            ]
+        ),
+        "logs": pa.schema(
+            [
+                ("log_index", pa.int32()),
+                ("transaction_hash", pa.string()),
+                ("address", pa.string()),
+                ("data", pa.string()),
+                ("topics", pa.list_(pa.string())),
+                ("block_number", pa.int64()),
+                ("block_hash", pa.string()),
+            ]
+        ),
+    }
+    return schemas[table]
+
+
+def rows_to_record_batch(rows: List[Dict[str, Any]], table: str):
+    """Convert row dicts into a RecordBatch with the table's column types."""
+    pa = require_pyarrow()
+    schema = schema_for(table)
+    columns = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if field.name in UINT256_COLUMNS:
+            values = [None if v is None else str(v) for v in values]
+        elif field.name == "timestamp":
+            # Raw SQL on SQLite returns DATETIME columns as ISO strings
+            values = [datetime.fromisoformat(v) if isinstance(v, str) else v for v in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
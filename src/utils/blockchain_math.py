@@ -1,10 +1,12 @@
 import decimal
 from decimal import Decimal
-from typing import Union
+from typing import Iterable, List, Optional, Union
 
-# Set precision high enough to handle uint256 (max ~1.15e77)
-decimal.getcontext().prec = 80
+# Precision high enough to handle uint256 (max ~1.15e77). Kept in a local context
+# so importing this module never mutates the thread's global decimal context.
+WEI_CONTEXT = decimal.Context(prec=80)
 
+ETHER_DECIMALS = 18
 WEI_PER_ETHER = Decimal("1000000000000000000")
 
 
@@ -12,7 +14,7 @@ def wei_to_ether(wei_value: Union[int, str, Decimal]) -> Decimal:
     """
     Convert Wei (integer) to Ether (Decimal) with high precision.
     """
-    return Decimal(wei_value) / WEI_PER_ETHER
+    return WEI_CONTEXT.divide(Decimal(wei_value), WEI_PER_ETHER)
 
 
 def ether_to_wei(ether_value: Union[int, str, float, Decimal]) -> int:
@@ -20,8 +22,8 @@ def ether_to_wei(ether_value: Union[int, str, float, Decimal]) -> int:
     Convert Ether (Decimal/float/str) to Wei (int) with high precision.
     """
     # Use quantize to avoid floating point issues if a float was passed
-    wei_decimal = (Decimal(str(ether_value)) * WEI_PER_ETHER).quantize(Decimal("1"))
-    return int(wei_decimal)
+    wei_decimal = WEI_CONTEXT.multiply(Decimal(str(ether_value)), WEI_PER_ETHER)
+    return int(wei_decimal.quantize(Decimal("1"), context=WEI_CONTEXT))
 
 
 def format_ether(ether_value: Decimal, places: int = 18) -> str:
@@ -29,3 +31,63 @@ def format_ether(ether_value: Decimal, places: int = 18) -> str:
     Format a Decimal Ether value to a string with specified decimal places.
     """
     return f"{ether_value:.{places}f}"
+
+
+def parse_units(amount: Union[int, str, float, Decimal], decimals: int = ETHER_DECIMALS) -> int:
+    """
+    Convert a human-readable token amount to integer base units for a token with `decimals`.
+    """
+    scaled = WEI_CONTEXT.multiply(Decimal(str(amount)), Decimal(10**decimals))
+    return int(scaled.quantize(Decimal("1"), context=WEI_CONTEXT))
+
+
+def format_units(value: Union[int, str], decimals: int = ETHER_DECIMALS, places: Optional[int] = None) -> str:
+    """
+    Render integer base units as a fixed-point string using only integer divmod.
+
+    `places` defaults to `decimals`; fewer places round half-to-even like `format_ether`.
+    """
+    return format_units_batch((value,), decimals, places)[0]
+
+
+def format_units_batch(
+    values: Iterable[Union[int, str]], decimals: int = ETHER_DECIMALS, places: Optional[int] = None
+) -> List[str]:
+    """
+    Render many integer amounts of a token with `decimals` as fixed-point strings.
+
+    The scale factors are computed once per batch; each value is rendered with one
+    int-to-str conversion and a split at the decimal point, with no Decimal work.
+    """
+    places = decimals if places is None else places
+    # Digits that come from the integer value; extra places are zero padding
+    digits = min(places, decimals)
+    pad = "0" * (places - digits)
+    # Dropping digits rounds half-to-even, like format_ether
+    round_unit = 10 ** (decimals - digits)
+    # At least one integer digit before the point
+    width = digits + 1
+
+    formatted = []
+    for value in values:
+        value = int(value)
+        sign = "-" if value < 0 else ""
+        magnitude = -value if value < 0 else value
+        if round_unit > 1:
+            magnitude, remainder = divmod(magnitude, round_unit)
+            twice = remainder * 2
+            if twice > round_unit or (twice == round_unit and magnitude & 1):
+                magnitude += 1
+        if places == 0:
+            formatted.append(f"{sign}{magnitude}")
+        elif digits == 0:
+            formatted.append(f"{sign}{magnitude}.{pad}")
+        else:
+            text = str(magnitude).zfill(width)
+            formatted.append(f"{sign}{text[:-digits]}.{text[-digits:]}{pad}")
+    return formatted
+
+
+def wei_to_ether_strings(wei_values: Iterable[Union[int, str]], places: Optional[int] = None) -> List[str]:
+    """Batch `format_units` for Ether amounts."""
+    return format_units_batch(wei_values, ETHER_DECIMALS, places)
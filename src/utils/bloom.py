@@ -0,0 +1,70 @@
+from typing import Iterable, Optional, Tuple, Union
+
+# Ethereum header blooms are 2048 bits; every item sets 3 bits derived from keccak256(item)
+BLOOM_BITS = 2048
+
+
+def _to_bytes(value: Union[str, bytes]) -> bytes:
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return bytes(value)
+
+
+def bloom_bit_indexes(item: Union[str, bytes]) -> Tuple[int, int, int]:
+    """The three bloom bit positions set by an address or topic."""
+    # Imported on first use: picking the keccak backend is a noticeable share of API cold start
+    from eth_hash.auto import keccak
+
+    digest = keccak(_to_bytes(item))
+    first, second, third = (((digest[i] << 8) | digest[i + 1]) % BLOOM_BITS for i in (0, 2, 4))
+    return first, second, third
+
+
+def bloom_mask(item: Union[str, bytes]) -> int:
+    mask = 0
+    for bit in bloom_bit_indexes(item):
+        mask |= 1 << bit
+    return mask
+
+
+def parse_bloom(bloom: Union[str, bytes, None]) -> Optional[int]:
+    """Parse a 256-byte logsBloom (hex string or bytes) into an int, bit i being bloom bit i."""
+    if bloom is None:
+        return None
+    return int.from_bytes(_to_bytes(bloom), "big")
+
+
+def add_to_bloom(bloom: int, item: Union[str, bytes]) -> int:
+    return bloom | bloom_mask(item)
+
+
+def format_bloom(bloom: int) -> str:
+    return "0x" + bloom.to_bytes(BLOOM_BITS // 8, "big").hex()
+
+
+class LogBloomFilter:
+    """
+    Tests block blooms against a watch list of addresses and topic0s.
+
+    A block may contain a watched log only if its bloom has one of the addresses
+    (when any are watched) and one of the topics (when any are watched).
+    False positives are possible, false negatives are not.
+    """
+
+    def __init__(self, addresses: Iterable[str] = (), topics: Iterable[str] = ()):
+        self.address_masks = [bloom_mask(a) for a in addresses]
+        self.topic_masks = [bloom_mask(t) for t in topics]
+
+    def __bool__(self) -> bool:
+        return bool(self.address_masks or self.topic_masks)
+
+    def matches(self, bloom: Union[str, bytes, int, None]) -> bool:
+        if bloom is None:
+            # Without a bloom we cannot rule the block out
+            return True
+        value = bloom if isinstance(bloom, int) else int.from_bytes(_to_bytes(bloom), "big")
+        if self.address_masks and not any(value & m == m for m in self.address_masks):
+            return False
+        if self.topic_masks and not any(value & m == m for m in self.topic_masks):
+            return False
+        return True
@@ -0,0 +1,37 @@
+"""
+Payload compression for the blob side table: zstd when installed, zlib otherwise.
+
+zstandard is an optional dependency (`pip install -e ".[speedups]"`). Each blob
+records the codec it was written with, so a database can mix both; reading a
+zstd blob does require zstandard.
+"""
+
+import zlib
+from typing import Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised when the extra is not installed
+    zstandard = None  # type: ignore[assignment]
+
+HAS_ZSTD = zstandard is not None
+
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """(codec, compressed bytes) with the best available codec."""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("Reading zstd payloads requires zstandard: pip install -e '.[speedups]'")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown payload codec {codec!r}")
@@ -0,0 +1,56 @@
+"""
+JSON encoding for hot paths: orjson when installed, the stdlib otherwise.
+
+orjson is an optional dependency (`pip install -e ".[speedups]"`). Both backends
+produce compact output and serialize Decimal (NUMERIC columns) as strings.
+orjson only handles 64-bit integers, so documents carrying a uint256 int fall
+back to the stdlib encoder.
+"""
+
+import json
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is not installed
+    orjson = None  # type: ignore[assignment]
+
+HAS_ORJSON = orjson is not None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, default=_default, separators=(",", ":"))
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default)
+        except TypeError:
+            # Integer exceeds 64-bit range (e.g. a uint256 value)
+            pass
+    return _stdlib_dumps(obj).encode()
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string (e.g. for a jsonb bind parameter)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default).decode()
+        except TypeError:
+            pass
+    return _stdlib_dumps(obj)
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
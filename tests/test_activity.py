@@ -0,0 +1,36 @@
+from domain.activity import TX_LEVEL, address_postings
+from domain.schemas import TransferEvent
+
+SENDER, CONTRACT, RECEIVER = "0x" + "1" * 40, "0x" + "2" * 40, "0x" + "3" * 40
+TX_HASH = "0x" + "a" * 64
+
+
+def test_address_postings_cover_every_role():
+    txs = [{
+        "hash": TX_HASH, "block_number": 100, "transaction_index": 4,
+        "from_address": SENDER, "to_address": CONTRACT,
+    }]
+    logs = [{"address": CONTRACT, "block_number": 100, "log_index": 7, "transaction_hash": TX_HASH}]
+    transfers = [TransferEvent(
+        from_address=SENDER, to_address=RECEIVER, value=1,
+        transaction_hash=TX_HASH, block_number=100, log_index=7, token_address=CONTRACT,
+    )]
+
+    postings = {(p["address"], p["role"]): p for p in address_postings(txs, logs, transfers)}
+
+    assert set(postings) == {
+        (SENDER, "from"), (CONTRACT, "to"), (CONTRACT, "log"),
+        (SENDER, "transfer_from"), (RECEIVER, "transfer_to"),
+    }
+    assert postings[(SENDER, "from")]["log_index"] == TX_LEVEL
+    # Log postings carry the index of the transaction that emitted them
+    assert postings[(RECEIVER, "transfer_to")]["tx_index"] == 4
+    assert postings[(CONTRACT, "log")]["log_index"] == 7
+
+
+def test_contract_creation_has_no_to_posting():
+    txs = [{
+        "hash": TX_HASH, "block_number": 1, "transaction_index": 0,
+        "from_address": SENDER, "to_address": None,
+    }]
+    assert [p["role"] for p in address_postings(txs, [], [])] == ["from"]
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from database.address_dictionary import AddressDictionary
+from database.connection import Base
+from database.repository import BlockchainRepository
+
+A, B, C = ("0x" + c * 40 for c in "abc")
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_ids_are_stable_and_cached(db_session):
+    dictionary = AddressDictionary(max_entries=10)
+    first = dictionary.ids(db_session, [A, B, A, None])
+    assert set(first) == {A, B}
+    assert dictionary.misses == 2
+
+    assert dictionary.ids(db_session, [A, B]) == first
+    assert dictionary.hits == 2
+    assert db_session.execute(text("SELECT COUNT(*) FROM addresses")).scalar() == 2
+
+
+def test_new_addresses_are_inserted_in_sorted_order(db_session):
+    # Writers sharing one insert order cannot deadlock on each other's new rows
+    ids = AddressDictionary().ids(db_session, [C, A, B, C])
+    assert ids[A] < ids[B] < ids[C]
+
+
+def test_lru_evicts_least_recently_used(db_session):
+    dictionary = AddressDictionary(max_entries=2)
+    ids = dictionary.ids(db_session, [A, B])
+    dictionary.ids(db_session, [A])
+    dictionary.ids(db_session, [C])
+    assert len(dictionary) == 2
+
+    # An evicted address is looked up again and keeps its id
+    assert dictionary.ids(db_session, [B]) == {B: ids[B]}
+    assert dictionary.misses == 4
+
+
+def test_rollback_forgets_ids_created_in_the_transaction(db_session):
+    dictionary = AddressDictionary()
+    dictionary.ids(db_session, [A])
+    db_session.rollback()
+    assert len(dictionary) == 0
+
+    dictionary.ids(db_session, [A])
+    assert db_session.execute(text("SELECT COUNT(*) FROM addresses")).scalar() == 1
+
+
+def test_repository_stores_ids_and_reads_addresses(db_session):
+    repo = BlockchainRepository(db_session)
+    tx = {
+        "hash": "0x" + "1" * 64, "nonce": 0, "block_hash": "0x" + "2" * 64, "block_number": 7,
+        "transaction_index": 0, "from_address": A, "to_address": B, "value": 1,
+        "gas_price": 1, "gas": 21000, "input": "0x",
+    }
+    repo.insert_transactions_bulk([tx])
+    db_session.commit()
+
+    stored = db_session.execute(text("SELECT from_id, to_id FROM transactions")).one()
+    assert stored == (repo.addresses.ids(db_session, [A])[A], repo.addresses.ids(db_session, [B])[B])
+    assert [row for part in repo.iter_transactions(7, 7, to_address=B) for row in part] == [tx]
+    assert list(repo.iter_transactions(7, 7, from_address=C)) == []
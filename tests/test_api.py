@@ -6,7 +6,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from api.router import app
+from api.router import LOGS_CACHE, app, get_read_db
 from database.connection import Base, get_db
 from database.repository import BlockchainRepository
 from domain.schemas import BlockModel
@@ -30,6 +30,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 
 @pytest.fixture
@@ -40,6 +41,7 @@ def client():
     Base.metadata.create_all(bind=engine)
     yield TestClient(app)
     Base.metadata.drop_all(bind=engine)
+    LOGS_CACHE.clear()
 
 
 def test_health_check(client):
@@ -80,3 +82,332 @@ def test_get_latest_block_success(client):
     data = response.json()
     assert data["number"] == 12345
     assert data["hash"] == "0x" + "a" * 64
+
+
+def test_get_logs_prefilters_by_bloom(client):
+    from utils.bloom import add_to_bloom, format_bloom
+
+    watched = "0x" + "f" * 40
+    topic0 = "0x" + "1" * 64
+    db = TestingSessionLocal()
+    repo = BlockchainRepository(db)
+
+    for number, bloom in [(100, add_to_bloom(add_to_bloom(0, watched), topic0)), (101, 0)]:
+        repo.insert_blocks_bulk(
+            [
+                BlockModel(
+                    number=number,
+                    hash=f"0x{number:064x}",
+                    parent_hash=f"0x{number - 1:064x}",
+                    timestamp=int(datetime.now(UTC).timestamp()),
+                    miner="0x" + "c" * 40,
+                    size=500,
+                    extra_data="0x",
+                    gas_limit=30000000,
+                    gas_used=15000000,
+                    logs_bloom=format_bloom(bloom),
+                )
+            ]
+        )
+        repo.insert_logs_bulk(
+            [
+                {
+                    "log_index": 0,
+                    "transaction_hash": "0x" + "d" * 64,
+                    "address": watched,
+                    "data": "0x",
+                    "topics": [topic0],
+                    "block_number": number,
+                    "block_hash": f"0x{number:064x}",
+                }
+            ]
+        )
+    db.commit()
+    db.close()
+
+    response = client.get("/logs", params={"from_block": 100, "to_block": 101, "address": watched, "topic0": topic0})
+    assert response.status_code == 200
+    # Block 101's (empty) bloom rules it out without touching its logs
+    assert [log["blockNumber"] for log in response.json()] == [100]
+
+    response = client.get("/logs", params={"from_block": 100, "to_block": 101, "topic0": "0x" + "2" * 64})
+    assert response.json() == []
+
+
+def test_get_logs_serves_cached_payload_until_head_moves(client):
+    db = TestingSessionLocal()
+    repo = BlockchainRepository(db)
+
+    def add_block(number):
+        repo.insert_blocks_bulk(
+            [
+                BlockModel(
+                    number=number,
+                    hash=f"0x{number:064x}",
+                    parent_hash=f"0x{number - 1:064x}",
+                    timestamp=int(datetime.now(UTC).timestamp()),
+                    miner="0x" + "c" * 40,
+                    size=500,
+                    extra_data="0x",
+                    gas_limit=30000000,
+                    gas_used=15000000,
+                )
+            ]
+        )
+        repo.insert_logs_bulk(
+            [
+                {
+                    "log_index": 0,
+                    "transaction_hash": "0x" + "d" * 64,
+                    "address": "0x" + "f" * 40,
+                    "data": "0x",
+                    "topics": ["0x" + "1" * 64],
+                    "block_number": number,
+                    "block_hash": f"0x{number:064x}",
+                }
+            ]
+        )
+        db.commit()
+
+    add_block(100)
+    params = {"from_block": 100, "to_block": 101}
+    first = client.get("/logs", params=params)
+    second = client.get("/logs", params=params)
+    assert first.content == second.content
+    assert (LOGS_CACHE.hits, LOGS_CACHE.misses) == (1, 1)
+    assert first.json()[0]["topics"] == ["0x" + "1" * 64]
+
+    # A new head changes the cache key, so the new block's log shows up
+    add_block(101)
+    db.close()
+    assert [log["blockNumber"] for log in client.get("/logs", params=params).json()] == [100, 101]
+
+
+def test_get_logs_rejects_wide_range(client):
+    response = client.get("/logs", params={"from_block": 0, "to_block": 1_000_000})
+    assert response.status_code == 400
+
+
+def test_get_logs_validates_filters_and_normalizes_cache_key(client):
+    params = {"from_block": 100, "to_block": 101}
+    assert client.get("/logs", params={**params, "address": "0x1234"}).status_code == 400
+    assert client.get("/logs", params={**params, "topic0": "0x" + "z" * 64}).status_code == 400
+
+    # The same filter in another case is the same query, served from the same cache entry
+    first = client.get("/logs", params={**params, "address": "0x" + "F" * 40})
+    second = client.get("/logs", params={**params, "address": "0x" + "f" * 40})
+    assert first.status_code == second.status_code == 200
+    assert (LOGS_CACHE.hits, LOGS_CACHE.misses) == (1, 1)
+
+
+def test_get_token_balance(client):
+    token, holder = "0x" + "a" * 40, "0x" + "1" * 40
+    db = TestingSessionLocal()
+    BlockchainRepository(db).apply_balance_deltas({(100, "0x" + "0" * 64): {(token, holder): 42}})
+    db.commit()
+    db.close()
+
+    response = client.get(f"/tokens/{token.upper().replace('0X', '0x')}/balances/{holder}")
+    assert response.status_code == 200
+    assert response.json() == {"token_address": token, "holder": holder, "balance": "42"}
+
+    response = client.get(f"/tokens/{token}/balances/{'0x' + '2' * 40}")
+    assert response.json()["balance"] == "0"
+
+    assert client.get(f"/tokens/not-an-address/balances/{holder}").status_code == 400
+
+
+def seed_export_rows(count):
+    db = TestingSessionLocal()
+    repo = BlockchainRepository(db)
+    repo.insert_transactions_bulk(
+        [
+            {
+                "hash": f"0x{i:064x}",
+                "nonce": i,
+                "block_hash": f"0x{100 + i:064x}",
+                "block_number": 100 + i,
+                "transaction_index": 0,
+                "from_address": "0x" + "e" * 40,
+                "to_address": "0x" + "f" * 40,
+                "value": 10**18,
+                "gas_price": 1,
+                "gas": 21000,
+                "input": "0x",
+            }
+            for i in range(count)
+        ]
+    )
+    repo.insert_logs_bulk(
+        [
+            {
+                "log_index": 0,
+                "transaction_hash": f"0x{i:064x}",
+                "address": "0x" + "f" * 40,
+                "data": "0x",
+                "topics": ["0x" + "1" * 64],
+                "block_number": 100 + i,
+                "block_hash": f"0x{100 + i:064x}",
+            }
+            for i in range(count)
+        ]
+    )
+    db.commit()
+    db.close()
+
+
+def test_export_logs_ndjson(client):
+    import json
+
+    seed_export_rows(5)
+
+    response = client.get("/export/logs", params={"from_block": 101, "to_block": 103})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["block_number"] for row in rows] == [101, 102, 103]
+    assert rows[0]["topics"] == ["0x" + "1" * 64]
+
+
+def test_export_rejects_malformed_filters(client):
+    seed_export_rows(2)
+    params = {"from_block": 100, "to_block": 101}
+
+    assert client.get("/export/logs", params={**params, "address": "0x1234"}).status_code == 400
+    # A LIKE wildcard is not a topic; before validation it matched every log
+    assert client.get("/export/logs", params={**params, "topic0": "%"}).status_code == 400
+    assert client.get("/export/transactions", params={**params, "to_address": "0x" + "g" * 40}).status_code == 400
+
+    response = client.get("/export/logs", params={**params, "topic0": "0x" + "1" * 64, "address": "0x" + "F" * 40})
+    assert len(response.text.splitlines()) == 2
+
+    # The repository matches topic0 as a literal prefix for callers that skip validation
+    db = TestingSessionLocal()
+    assert BlockchainRepository(db).get_logs([100, 101], topic0="0x1%") == []
+    assert len(BlockchainRepository(db).get_logs([100, 101], topic0="0x" + "1" * 64)) == 2
+    db.close()
+
+
+def test_export_transactions_arrow(client):
+    pa = pytest.importorskip("pyarrow")
+    seed_export_rows(5)
+
+    response = client.get(
+        "/export/transactions",
+        params={"from_block": 100, "to_block": 200, "from_address": "0x" + "e" * 40, "format": "arrow"},
+    )
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 5
+    assert table.column("value").to_pylist()[0] == str(10**18)
+
+
+def test_export_empty_range_arrow(client):
+    pa = pytest.importorskip("pyarrow")
+
+    response = client.get("/export/logs", params={"from_block": 0, "to_block": 10, "format": "arrow"})
+    assert pa.ipc.open_stream(response.content).read_all().num_rows == 0
+
+
+def test_get_chain_stats(client):
+    from domain.stats import compute_block_stats
+
+    db = TestingSessionLocal()
+    block = BlockModel(
+        number=1,
+        hash="0x" + "a" * 64,
+        parent_hash="0x" + "b" * 64,
+        timestamp=datetime(2024, 5, 1, 12, 0, 30),
+        miner="0x" + "c" * 40,
+        size=1,
+        extra_data="0x",
+        gas_limit=30_000_000,
+        gas_used=21_000,
+        base_fee_per_gas=10**9,
+    )
+    txs = [{"from_address": "0x" + "1" * 40, "value": 10**18}]
+    BlockchainRepository(db).apply_block_stats([compute_block_stats(block, txs, [])])
+    db.commit()
+    db.close()
+
+    response = client.get("/stats/minute")
+    assert response.status_code == 200
+    [bucket] = response.json()
+    assert bucket["bucket_start"] == "2024-05-01T12:00:00"
+    assert bucket["fees_burned"] == str(21_000 * 10**9)
+    assert bucket["total_value"] == str(10**18)
+    assert bucket["fees_burned_ether"] == "0.000021000000000000"
+    assert bucket["total_value_ether"] == "1.000000000000000000"
+    assert bucket["avg_base_fee_per_gas"] == 10**9
+    assert bucket["sender_block_count"] == 1
+
+    assert client.get("/stats/hour", params={"start": "2024-05-01T13:00:00"}).json() == []
+    assert client.get("/stats/day").status_code == 422
+
+
+def test_get_address_activity_paginates(client):
+    from domain.activity import address_postings
+
+    sender = "0x" + "1" * 40
+    db = TestingSessionLocal()
+    txs = [
+        {
+            "hash": f"0x{n:064x}", "block_number": n, "transaction_index": 0,
+            "from_address": sender, "to_address": "0x" + "2" * 40,
+        }
+        for n in (1, 2, 3)
+    ]
+    BlockchainRepository(db).insert_address_activity(address_postings(txs, [], []))
+    db.commit()
+    db.close()
+
+    page = client.get(f"/address/{sender}/activity", params={"limit": 2}).json()
+    assert [item["block_number"] for item in page["items"]] == [3, 2]
+    assert page["next_cursor"] == "2:0:-1:from"
+
+    page = client.get(f"/address/{sender}/activity", params={"limit": 2, "cursor": page["next_cursor"]}).json()
+    assert [item["block_number"] for item in page["items"]] == [1]
+    assert page["next_cursor"] is None
+
+    assert client.get(f"/address/{sender}/activity", params={"cursor": "bogus"}).status_code == 400
+    assert client.get("/address/0x123/activity").status_code == 400
+
+
+def test_get_transaction_inflates_offloaded_input(client):
+    calldata = "0x" + "ab" * 1000
+    db = TestingSessionLocal()
+    BlockchainRepository(db, payload_offload_bytes=100).insert_transactions_bulk([{
+        "hash": "0x" + "1" * 64, "nonce": 0, "block_hash": "0x" + "2" * 64, "block_number": 5,
+        "transaction_index": 0, "from_address": "0x" + "3" * 40, "to_address": None,
+        "value": 0, "gas_price": 1, "gas": 21000, "input": calldata,
+    }])
+    db.commit()
+    db.close()
+
+    response = client.get("/transactions/" + "0x" + "1" * 64)
+    assert response.status_code == 200
+    assert response.json()["input"] == calldata
+    assert response.json()["from"] == "0x" + "3" * 40
+
+    assert client.get("/transactions/" + "0x" + "9" * 64).status_code == 404
+    assert client.get("/transactions/0x12").status_code == 400
+
+
+def test_get_sync_ranges(client):
+    from database.models import SyncRange  # noqa: F401  (creates sync_ranges)
+
+    Base.metadata.create_all(bind=engine)
+    assert client.get("/sync/ranges").json() == {"ranges": [], "gaps": []}
+    db = TestingSessionLocal()
+    repo = BlockchainRepository(db)
+    repo.mark_synced(100, 199)
+    repo.mark_synced(500, 509)
+    db.commit()
+    db.close()
+
+    body = client.get("/sync/ranges").json()
+    assert body["ranges"] == [
+        {"start_block": 100, "end_block": 199, "block_count": 100},
+        {"start_block": 500, "end_block": 509, "block_count": 10},
+    ]
+    assert body["gaps"] == [{"start_block": 200, "end_block": 499, "block_count": 300}]
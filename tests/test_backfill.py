@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.backfill import BackfillWorker, missing_ranges
+
+
+def test_missing_ranges():
+    covered = [(5, 9), (20, 29), (40, 45)]
+    assert missing_ranges(covered, 0, 50) == [(0, 4), (10, 19), (30, 39), (46, 50)]
+    assert missing_ranges(covered, 7, 25) == [(10, 19)]
+    assert missing_ranges(covered, 20, 29) == []
+    assert missing_ranges([], 3, 4) == [(3, 4)]
+
+
+@pytest.fixture
+def engine():
+    engine = MagicMock()
+    engine.provider.get_finalized_block_number.return_value = 1000
+    # The tip cursor started at 990; 900-949 was backfilled earlier
+    engine.repo.get_sync_ranges.return_value = [(900, 949), (990, 1010)]
+    engine.fetch_and_validate_block.side_effect = lambda bn: {"block_number": bn}
+    return engine
+
+
+def test_next_range_walks_down_from_the_tip_and_stops_at_finality(engine):
+    worker = BackfillWorker(engine, start_block=0, direction="down", workers=2, chunk_size=25)
+    assert worker.next_range() == (965, 989)
+    assert engine.finalized_height == 1000
+    assert engine.parquet_sink is None
+
+    engine.repo.get_sync_ranges.return_value = [(900, 1010)]
+    assert worker.next_range() == (875, 899)
+    engine.repo.get_sync_ranges.return_value = [(0, 1010)]
+    assert worker.next_range() is None
+
+
+def test_next_range_walks_up(engine):
+    worker = BackfillWorker(engine, start_block=890, direction="up", chunk_size=25)
+    assert worker.next_range() == (890, 899)
+    engine.repo.get_sync_ranges.return_value = [(890, 949), (990, 1010)]
+    assert worker.next_range() == (950, 974)
+
+
+def test_backfill_range_commits_in_height_order(engine):
+    worker = BackfillWorker(engine, workers=4)
+    assert worker.backfill_range(10, 17) == 8
+    assert [c.args[0]["block_number"] for c in engine.commit_block.call_args_list] == list(range(10, 18))
+    assert worker.blocks_backfilled == 8
+
+
+def test_rejects_unknown_direction(engine):
+    with pytest.raises(ValueError):
+        BackfillWorker(engine, direction="sideways")
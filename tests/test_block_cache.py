@@ -0,0 +1,60 @@
+from core.block_cache import BlockCache, estimate_size
+
+
+def block(number, fork="a", txs=0):
+    return {
+        "number": number,
+        "hash": "0x" + f"{fork}{number:063x}",
+        "transactions": ["0x" + "ab" * 32] * txs,
+    }
+
+
+def test_lookup_by_number_and_hash():
+    cache = BlockCache(max_bytes=1 << 20)
+    b = block(100)
+    cache.put_block(b, full_transactions=False)
+
+    assert cache.get_block(100, False) is b
+    assert cache.get_block(b["hash"].upper().replace("0X", "0x"), False) is b
+    # Full and header-only variants are different payloads
+    assert cache.get_block(100, True) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    small = block(1)
+    cache = BlockCache(max_bytes=estimate_size(small) * 2 + 10)
+    cache.put_block(block(1), False)
+    cache.put_block(block(2), False)
+    cache.get_block(1, False)
+    cache.put_block(block(3), False)
+
+    assert cache.get_block(2, False) is None
+    assert cache.get_block(1, False) is not None
+    assert cache.bytes <= cache.max_bytes
+    # Payloads larger than the whole budget are not cached
+    cache.put_block(block(4, txs=1000), False)
+    assert cache.get_block(4, False) is None
+
+
+def test_reorg_invalidates_numbers_but_not_hashes():
+    cache = BlockCache(max_bytes=1 << 20)
+    for n in (100, 101, 102):
+        cache.put_block(block(n), False)
+    cache.put(("logs", "range"), [], height=102)
+    cache.put(("logs", "by-hash"), [])
+
+    assert cache.invalidate_from(101) == 3
+    assert cache.get_block(100, False) is not None
+    assert cache.get_block(101, False) is None
+    assert cache.get_block(block(101)["hash"], False) is not None
+    assert cache.get(("logs", "range")) is None
+    assert cache.get(("logs", "by-hash")) == []
+
+
+def test_stats_report_hit_ratio():
+    cache = BlockCache(max_bytes=1 << 20)
+    cache.put_block(block(1), False)
+    cache.get_block(1, False)
+    cache.get_block(2, False)
+    assert cache.stats()["hit_ratio"] == 0.5
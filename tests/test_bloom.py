@@ -0,0 +1,33 @@
+from utils.bloom import (LogBloomFilter, add_to_bloom, bloom_bit_indexes,
+                         format_bloom, parse_bloom)
+
+USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+APPROVAL_TOPIC = "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925"
+
+
+def test_bit_indexes_within_bloom():
+    assert all(0 <= bit < 2048 for bit in bloom_bit_indexes(USDC))
+
+
+def test_bloom_roundtrip():
+    bloom = add_to_bloom(0, USDC)
+    hex_bloom = format_bloom(bloom)
+
+    assert len(hex_bloom) == 2 + 512
+    assert parse_bloom(hex_bloom) == bloom
+
+
+def test_filter_matches_address_and_topic():
+    bloom = format_bloom(add_to_bloom(add_to_bloom(0, USDC), TRANSFER_TOPIC))
+
+    assert LogBloomFilter([USDC], [TRANSFER_TOPIC]).matches(bloom)
+    assert LogBloomFilter([WETH, USDC]).matches(bloom)
+    assert not LogBloomFilter([WETH]).matches(bloom)
+    assert not LogBloomFilter([USDC], [APPROVAL_TOPIC]).matches(bloom)
+
+
+def test_filter_without_bloom_cannot_exclude():
+    assert LogBloomFilter([USDC]).matches(None)
+    assert not LogBloomFilter()
@@ -0,0 +1,78 @@
+import threading
+from queue import Empty, Full
+
+import pytest
+
+from core.buffer import PrefetchBuffer
+
+
+def test_orders_by_block_number_and_tracks_bytes():
+    buffer = PrefetchBuffer(max_bytes=1000)
+    buffer.put(12, "c", 100)
+    buffer.put(10, "a", 200)
+    buffer.put(11, "b", 300)
+
+    assert 11 in buffer and 13 not in buffer
+    assert buffer.bytes == 600
+    assert [buffer.get_nowait() for _ in range(3)] == [(10, "a"), (11, "b"), (12, "c")]
+    assert buffer.bytes == 0
+    assert buffer.stats()["peak_bytes"] == 600
+    with pytest.raises(Empty):
+        buffer.get_nowait()
+
+
+def test_byte_budget_applies_backpressure():
+    buffer = PrefetchBuffer(max_bytes=500)
+    buffer.put(1, "small", 100)
+    buffer.put(2, "small", 100)
+    with pytest.raises(Full):
+        buffer.put(3, "large", 400, timeout=0.05)
+    assert buffer.blocked_puts == 1
+
+    # A consumer freeing room unblocks the fetcher
+    unblocked = threading.Event()
+
+    def fetcher():
+        buffer.put(3, "large", 400)
+        unblocked.set()
+
+    thread = threading.Thread(target=fetcher)
+    thread.start()
+    assert not unblocked.wait(0.05)
+    buffer.get()
+    buffer.get()
+    assert unblocked.wait(1)
+    thread.join()
+    assert buffer.bytes == 400
+
+
+def test_oversized_block_is_admitted_into_empty_buffer():
+    buffer = PrefetchBuffer(max_bytes=100)
+    buffer.put(1, "huge", 10_000, timeout=0)
+    assert len(buffer) == 1
+    with pytest.raises(Full):
+        buffer.put(2, "tiny", 1, timeout=0)
+
+
+def test_item_cap_and_clear():
+    buffer = PrefetchBuffer(max_bytes=10_000, max_items=2)
+    buffer.put(1, "a", 1)
+    buffer.put(2, "b", 1)
+    with pytest.raises(Full):
+        buffer.put(3, "c", 1, timeout=0)
+    buffer.clear()
+    assert buffer.empty() and buffer.bytes == 0
+    buffer.put(3, "c", 1, timeout=0)
+
+
+def test_reprefetching_a_buffered_height_replaces_it():
+    buffer = PrefetchBuffer(max_bytes=500, max_items=2)
+    buffer.put(1, "old", 300)
+    buffer.put(2, "b", 100)
+
+    # Counted once, and the freed bytes and slot are available to the new copy
+    buffer.put(1, "new", 350, timeout=0)
+    assert len(buffer) == 2
+    assert buffer.bytes == 450
+    assert [buffer.get_nowait() for _ in range(2)] == [(1, "new"), (2, "b")]
+    assert buffer.bytes == 0
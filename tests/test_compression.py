@@ -0,0 +1,23 @@
+import pytest
+
+from utils import compression
+
+
+def test_round_trip_with_best_codec():
+    payload = bytes(range(256)) * 64
+    codec, data = compression.compress(payload)
+    assert codec == ("zstd" if compression.HAS_ZSTD else "zlib")
+    assert len(data) < len(payload)
+    assert compression.decompress(codec, data) == payload
+
+
+def test_zlib_blobs_stay_readable(monkeypatch):
+    monkeypatch.setattr(compression, "zstandard", None)
+    codec, data = compression.compress(b"\x00" * 1000)
+    assert codec == "zlib"
+    assert compression.decompress(codec, data) == b"\x00" * 1000
+
+
+def test_unknown_codec_rejected():
+    with pytest.raises(ValueError):
+        compression.decompress("lz4", b"")
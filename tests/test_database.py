@@ -5,7 +5,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from database.connection import Base
-from database.models import Block, Log, Transaction
+from database.models import Address, Block, Log, Transaction
 
 
 @pytest.fixture
@@ -36,6 +36,11 @@ def test_create_block_with_transactions_and_logs(db_session):
     )
     db_session.add(block)
 
+    # Fact tables reference the address dictionary by id
+    sender, contract = Address(address="0x" + "e" * 40), Address(address="0x" + "f" * 40)
+    db_session.add_all([sender, contract])
+    db_session.flush()
+
     # Create transaction
     tx = Transaction(
         hash="0x" + "d" * 64,
@@ -43,8 +48,8 @@ def test_create_block_with_transactions_and_logs(db_session):
         block_hash=block.hash,
         block_number=block.number,
         transaction_index=0,
-        from_address="0x" + "e" * 40,
-        to_address="0x" + "f" * 40,
+        from_id=sender.id,
+        to_id=contract.id,
         value=10**18,
         gas_price=20000000000,
         gas=21000,
@@ -56,7 +61,7 @@ def test_create_block_with_transactions_and_logs(db_session):
     log = Log(
         log_index=0,
         transaction_hash=tx.hash,
-        address="0x" + "f" * 40,
+        address_id=contract.id,
         data="0x",
         topics=["0x" + "1" * 64],
         block_number=block.number,
@@ -73,3 +78,26 @@ def test_create_block_with_transactions_and_logs(db_session):
     assert saved_block.transactions[0].hash == tx.hash
     assert len(saved_block.logs) == 1
     assert saved_block.logs[0].transaction_hash == tx.hash
+
+
+def test_engine_options_per_driver(monkeypatch):
+    from database.connection import engine_options, settings
+
+    monkeypatch.setattr(settings, "db_prepare_threshold", 3)
+    psycopg3 = engine_options("postgresql+psycopg://u:p@localhost/db")
+    assert psycopg3["connect_args"] == {"prepare_threshold": 3}
+    assert psycopg3["use_insertmanyvalues"] is False
+
+    psycopg2 = engine_options("postgresql+psycopg2://u:p@localhost/db")
+    assert "connect_args" not in psycopg2 and psycopg2["pool_size"] == 20
+
+    # SQLite gets a shared StaticPool and no pool sizing arguments
+    assert "pool_size" not in engine_options("sqlite:///:memory:")
+
+
+def test_repository_pipeline_is_noop_without_psycopg3(db_session):
+    from database.repository import BlockchainRepository
+
+    repo = BlockchainRepository(db_session)
+    with repo.pipeline():
+        assert repo.get_latest_block() is None
@@ -62,3 +62,48 @@ def test_decode_batch():
     events = decoder.decode_batch(logs)
     assert len(events) == 1
     assert events[0].value == 10
+
+
+def test_decode_transfer_row_and_net_deltas():
+    from domain.decoder import net_transfer_deltas
+
+    decoder = LogDecoder()
+    token = "0x" + "a" * 40
+    alice = "0x" + "1" * 40
+    bob = "0x" + "2" * 40
+
+    def row(sender, receiver, value, log_index):
+        return {
+            "topics": [
+                "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef",
+                "0x" + "0" * 24 + sender[2:],
+                "0x" + "0" * 24 + receiver[2:],
+            ],
+            "data": "0x" + f"{value:064x}",
+            "address": token,
+            "transaction_hash": "0x" + "1" * 64,
+            "block_number": 12345,
+            "log_index": log_index,
+        }
+
+    mint = decoder.decode_transfer_row(row("0x" + "0" * 40, alice, 100, 0))
+    transfer = decoder.decode_transfer_row(row(alice, bob, 30, 1))
+    assert transfer.token_address == token
+    assert transfer.from_address == alice and transfer.value == 30
+
+    # The zero address is not tracked and offsetting moves are netted out
+    assert net_transfer_deltas([mint, transfer]) == {(token, alice): 70, (token, bob): 30}
+
+
+def test_decode_transfer_row_ignores_erc721():
+    decoder = LogDecoder()
+    log = {
+        "topics": [
+            "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef",
+            "0x" + "0" * 64,
+            "0x" + "0" * 64,
+            "0x" + "0" * 63 + "1",
+        ],
+        "data": "0x",
+    }
+    assert decoder.decode_transfer_row(log) is None
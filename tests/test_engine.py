@@ -1,9 +1,12 @@
-import pytest
 from unittest.mock import MagicMock, patch
+
+import pytest
+
 from core.engine import SyncEngine
 from core.sync import ReorgException
 from domain.schemas import BlockModel
 
+
 @pytest.fixture
 def mock_db():
     return MagicMock()
@@ -75,3 +78,302 @@ def test_sync_block_reorg_trigger(engine, mock_provider, mock_db, mock_repo):
     
     # Should rollback to 99
     engine.db_service.rollback_to_block.assert_called_once_with(99)
+
+def test_refresh_finality_promotes_staged_blocks(engine, mock_provider, mock_db, mock_repo):
+    engine.hot_staging = True
+    mock_provider.get_finalized_block_number.return_value = 90
+
+    assert engine.is_staged(95) is True
+    assert engine.refresh_finality(force=True) == 90
+
+    assert engine.guard.finalized_height == 90
+    mock_repo.promote_finalized.assert_called_once_with(90)
+    assert mock_db.commit.called
+    assert engine.is_staged(90) is False
+    assert engine.is_staged(91) is True
+
+def test_refresh_finality_keeps_height_on_rpc_error(engine, mock_provider):
+    engine.finalized_height = 80
+    mock_provider.get_finalized_block_number.side_effect = Exception("unsupported tag")
+
+    assert engine.refresh_finality(force=True) == 80
+
+def test_wait_for_new_head_uses_subscription(engine):
+    engine.head_subscriber = MagicMock(connected=True)
+
+    engine.wait_for_new_head(5)
+
+    engine.head_subscriber.wait_for_head.assert_called_once_with(timeout=5)
+
+def test_wait_for_new_head_falls_back_to_polling(engine):
+    engine.head_subscriber = MagicMock(connected=False)
+
+    with patch("core.engine.time.sleep") as sleep:
+        engine.wait_for_new_head(5)
+
+    sleep.assert_called_once_with(5)
+    engine.head_subscriber.wait_for_head.assert_not_called()
+
+def log_range_header(bn):
+    return {
+        "number": bn,
+        "hash": f"0x{bn:064x}",
+        "parentHash": f"0x{bn - 1:064x}",
+        "timestamp": 1673812800,
+        "miner": "0x" + "c" * 40,
+        "size": 500,
+        "extraData": "0x",
+        "gasLimit": 30000000,
+        "gasUsed": 15000000,
+    }
+
+def log_range_log(bn, tx_hash, block_hash=None):
+    return {
+        "logIndex": 0,
+        "transactionHash": tx_hash,
+        "address": "0x" + "f" * 40,
+        "data": "0x",
+        "topics": ["0x" + "1" * 64],
+        "blockNumber": bn,
+        "blockHash": block_hash or f"0x{bn:064x}",
+    }
+
+def log_range_tx(bn, tx_hash, block_hash=None):
+    return {
+        "hash": tx_hash,
+        "nonce": 0,
+        "blockHash": block_hash or f"0x{bn:064x}",
+        "blockNumber": bn,
+        "transactionIndex": 0,
+        "from": "0x" + "a" * 40,
+        "to": "0x" + "f" * 40,
+        "value": 0,
+        "gasPrice": 1,
+        "gas": 21000,
+        "input": "0x",
+    }
+
+@pytest.fixture
+def log_range_engine(engine, mock_provider):
+    engine.log_fetcher = MagicMock(watch_params={"address": ["0x" + "f" * 40]})
+    mock_provider.get_headers.side_effect = lambda start, end: [log_range_header(bn) for bn in range(start, end + 1)]
+    engine.guard.verify_header_chain.side_effect = lambda headers: headers
+    return engine
+
+def test_sync_log_range_stores_headers_and_watched_logs(log_range_engine, mock_provider, mock_db, mock_repo):
+    engine = log_range_engine
+    tx_hash = "0x" + "d" * 64
+    engine.log_fetcher.next_range.return_value = (100, 101)
+    engine.log_fetcher.fetch.return_value = [log_range_log(101, tx_hash)]
+    mock_provider.get_transaction.return_value = log_range_tx(101, tx_hash)
+
+    assert engine.sync_log_range(100, 500) == 102
+
+    # Headers come from one batched call and are verified before logs are fetched
+    mock_provider.get_headers.assert_called_once_with(100, 101)
+    assert [h.number for h in engine.guard.verify_header_chain.call_args.args[0]] == [100, 101]
+    mock_provider.get_block.assert_not_called()
+    mock_provider.get_transaction.assert_called_once_with(tx_hash)
+    assert mock_repo.insert_blocks_bulk.call_count == 2
+    mock_repo.insert_transactions_bulk.assert_called_once()
+    mock_repo.insert_logs_bulk.assert_called_once()
+    mock_repo.mark_synced.assert_called_once_with(100, 101)
+    mock_db.commit.assert_called_once()
+
+def test_sync_log_range_refetches_logs_from_another_branch(log_range_engine, mock_provider, mock_repo):
+    engine = log_range_engine
+    tx_hash = "0x" + "d" * 64
+    engine.log_fetcher.next_range.return_value = (100, 101)
+    # The range query raced a reorg: block 101's log comes from the old branch
+    engine.log_fetcher.fetch.return_value = [log_range_log(101, "0x" + "b" * 64, block_hash="0x" + "e" * 64)]
+    mock_provider.get_logs.return_value = [log_range_log(101, tx_hash)]
+    mock_provider.get_transaction.return_value = log_range_tx(101, tx_hash)
+
+    assert engine.sync_log_range(100, 500) == 102
+    mock_provider.get_logs.assert_called_once_with({"blockHash": f"0x{101:064x}", "address": ["0x" + "f" * 40]})
+    mock_provider.get_transaction.assert_called_once_with(tx_hash)
+    [[log]] = mock_repo.insert_logs_bulk.call_args.args
+    assert log["block_hash"] == f"0x{101:064x}"
+
+def test_sync_log_range_keeps_prefix_before_a_moved_transaction(log_range_engine, mock_provider, mock_repo):
+    engine = log_range_engine
+    tx_hashes = {bn: f"0x{bn:064x}" for bn in (100, 102)}
+    engine.log_fetcher.next_range.return_value = (100, 103)
+    engine.log_fetcher.fetch.return_value = [log_range_log(bn, tx_hashes[bn]) for bn in (100, 102)]
+    # Block 102's transaction has since moved to another branch
+    txs = {
+        tx_hashes[100]: log_range_tx(100, tx_hashes[100]),
+        tx_hashes[102]: log_range_tx(102, tx_hashes[102], block_hash="0x" + "e" * 64),
+    }
+    mock_provider.get_transaction.side_effect = txs.get
+
+    assert engine.sync_log_range(100, 500) == 102
+    mock_provider.invalidate_from.assert_called_once_with(102)
+    assert [c.args[0][0].number for c in mock_repo.insert_blocks_bulk.call_args_list] == [100, 101]
+    mock_repo.mark_synced.assert_called_once_with(100, 101)
+
+def test_sync_log_range_commits_in_bounded_chunks(log_range_engine, mock_db, mock_repo):
+    engine = log_range_engine
+    engine.log_fetcher.next_range.return_value = (100, 104)
+    engine.log_fetcher.fetch.return_value = []
+
+    with patch("core.engine.LOG_RANGE_COMMIT_BLOCKS", 2):
+        assert engine.sync_log_range(100, 500) == 105
+    assert [c.args for c in mock_repo.mark_synced.call_args_list] == [(100, 101), (102, 103), (104, 104)]
+    assert mock_db.commit.call_count == 3
+
+def test_full_mode_ignores_watch_list(mock_db, mock_provider, monkeypatch):
+    from core.config import settings
+
+    monkeypatch.setattr(settings, "watch_addresses", ["0x" + "a" * 40])
+    engine = SyncEngine(mock_db, mock_provider)
+    assert engine.log_fetcher is None
+
+    # Every log of the block is fetched and stored, whatever its header bloom says
+    header = BlockModel.model_validate(
+        {
+            "number": 100,
+            "hash": "0x" + "a" * 64,
+            "parentHash": "0x" + "b" * 64,
+            "timestamp": 1673812800,
+            "miner": "0x" + "c" * 40,
+            "size": 500,
+            "extraData": "0x",
+            "gasLimit": 30000000,
+            "gasUsed": 15000000,
+            "logsBloom": "0x" + "00" * 256,
+        }
+    )
+    mock_provider.get_block.return_value = {**header.model_dump(by_alias=True), "transactions": []}
+    mock_provider.get_logs.return_value = []
+    engine.fetch_block_body(header)
+    mock_provider.get_logs.assert_called_once_with({"blockHash": header.hash})
+
+def test_restore_orphaned_block_skips_refetch(engine, mock_provider, mock_db, mock_repo):
+    header = {
+        "number": 101,
+        "hash": "0x" + "a" * 64,
+        "parentHash": "0x" + "b" * 64,
+        "timestamp": 1673812800,
+        "miner": "0x" + "c" * 40,
+        "size": 500,
+        "extraData": "0x",
+        "gasLimit": 30000000,
+        "gasUsed": 15000000,
+    }
+    mock_provider.get_block.return_value = header
+    mock_repo.iter_transactions.return_value = iter([])
+    mock_repo.iter_logs.return_value = iter([])
+    engine.orphan_ceiling = 102
+
+    mock_repo.restore_orphaned_block.return_value = True
+    assert engine.restore_orphaned_block(101) is True
+    mock_provider.get_block.assert_called_once_with(101, full_transactions=False)
+    mock_provider.get_logs.assert_not_called()
+    mock_repo.restore_orphaned_block.assert_called_once_with(header["hash"], staging=False)
+    mock_db.commit.assert_called_once()
+
+    # A canonical hash missing from the journal ends restoration for this reorg
+    mock_repo.restore_orphaned_block.return_value = False
+    assert engine.restore_orphaned_block(102) is False
+    assert engine.orphan_ceiling is None
+    assert engine.restore_orphaned_block(102) is False
+    assert mock_provider.get_block.call_count == 2
+
+def test_restore_orphaned_block_reapplies_chain_stats(engine, mock_provider, mock_repo):
+    mock_provider.get_block.return_value = {
+        "number": 101,
+        "hash": "0x" + "a" * 64,
+        "parentHash": "0x" + "b" * 64,
+        "timestamp": 1673812800,
+        "miner": "0x" + "c" * 40,
+        "size": 500,
+        "extraData": "0x",
+        "gasLimit": 30000000,
+        "gasUsed": 21000,
+        "baseFeePerGas": 10,
+    }
+    mock_repo.iter_transactions.return_value = iter([[{"from_address": "0x" + "1" * 40, "value": 5}]])
+    mock_repo.iter_logs.return_value = iter([])
+    mock_repo.restore_orphaned_block.return_value = True
+    engine.orphan_ceiling = 101
+    engine.track_chain_stats = True
+
+    assert engine.restore_orphaned_block(101) is True
+    [[stats]] = mock_repo.apply_block_stats.call_args.args
+    assert (stats["number"], stats["tx_count"], stats["fees_burned"], stats["total_value"]) == (101, 1, 210000, 5)
+
+def test_sync_header_range_downloads_in_parallel_and_commits_in_order(engine, mock_provider, mock_repo):
+    import threading
+
+    hashes = ["0x" + f"{n:064x}" for n in range(99, 104)]
+    header = lambda n: {
+        "number": n,
+        "hash": hashes[n - 99],
+        "parentHash": hashes[n - 100],
+        "timestamp": 1673812800 + n,
+        "miner": "0x" + "c" * 40,
+        "size": 500,
+        "extraData": "0x",
+        "gasLimit": 30000000,
+        "gasUsed": 15000000,
+    }
+    mock_provider.get_headers.return_value = [header(n) for n in (100, 101, 102, 103)]
+    engine.header_first_range = 4
+    engine.guard.verify_header_chain.side_effect = lambda headers: headers
+    released = threading.Event()
+
+    def get_block(block_hash, full_transactions):
+        number = hashes.index(block_hash) + 99
+        # The first body is the slowest; later ones must not overtake it in the DB
+        if number == 100:
+            released.wait(1)
+        elif number == 103:
+            released.set()
+        return {**header(number), "transactions": []}
+
+    mock_provider.get_block.side_effect = get_block
+    mock_provider.get_logs.return_value = []
+
+    assert engine.sync_header_range(100, 200) == 104
+    mock_provider.get_headers.assert_called_once_with(100, 103)
+    assert released.is_set()
+    committed = [c.args[0][0].number for c in mock_repo.insert_blocks_bulk.call_args_list]
+    assert committed == [100, 101, 102, 103]
+    mock_provider.get_logs.assert_any_call({"blockHash": hashes[1]})
+
+
+def test_sync_header_range_bounds_bodies_ahead_of_commits(engine, mock_provider):
+    headers = [MagicMock(number=n) for n in range(100, 120)]
+    mock_provider.get_headers.return_value = []
+    engine.guard.verify_header_chain.return_value = headers
+    engine.header_first_range = 20
+    engine.body_window = 3
+    fetched, committed, ahead = [], [], []
+
+    def fetch_block_body(header):
+        fetched.append(header.number)
+        ahead.append(len(fetched) - len(committed))
+        return {"block_number": header.number, "size_bytes": 10}
+
+    engine.fetch_block_body = fetch_block_body
+    engine.commit_block = lambda data: committed.append(data["block_number"])
+
+    assert engine.sync_header_range(100, 200) == 120
+    assert committed == list(range(100, 120))
+    assert max(ahead) <= 3
+
+    # Finished bodies that already hold the byte budget stop further downloads
+    from concurrent.futures import Future
+
+    def submit(fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    engine.body_executor = MagicMock(submit=submit)
+    engine.block_buffer.max_bytes = 10
+    fetched.clear(), committed.clear(), ahead.clear()
+    engine.sync_header_range(100, 200)
+    assert committed == list(range(100, 120))
+    assert max(ahead) == 1
@@ -0,0 +1,34 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from utils import fast_json
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_dumps_is_compact_and_round_trips(backend):
+    topics = ["0x" + "1" * 64, "0x" + "2" * 64]
+    encoded = fast_json.dumps(topics)
+    assert encoded == '["0x' + "1" * 64 + '","0x' + "2" * 64 + '"]'
+    assert fast_json.loads(encoded) == topics
+    assert fast_json.loads(fast_json.dumps_bytes(topics)) == topics
+
+
+def test_decimal_and_uint256_values(backend):
+    row = {"value": Decimal(2**200), "big": 2**255, "small": 1}
+    decoded = json.loads(fast_json.dumps_bytes(row))
+    assert decoded == {"value": str(2**200), "big": 2**255, "small": 1}
+
+
+def test_unserializable_values_still_raise(backend):
+    with pytest.raises(TypeError):
+        fast_json.dumps({"x": object()})
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "..", "src")
+
+# Sync-only dependencies an API replica must never pay for at cold start
+SYNC_ONLY_MODULES = {"web3", "tenacity", "eth_abi", "eth_hash", "websockets", "core.provider", "core.engine"}
+
+
+def import_times(statement):
+    """Run `statement` under `python -X importtime` without RPC_URL; returns {module: cumulative µs}."""
+    env = {k: v for k, v in os.environ.items() if k != "RPC_URL"}
+    env["DATABASE_URL"] = "sqlite:///:memory:"
+    env["PYTHONPATH"] = SRC_DIR
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_api_entry_point_does_not_import_sync_stack():
+    times = import_times("import main, api.router")
+
+    loaded = SYNC_ONLY_MODULES & times.keys()
+    assert not loaded, f"API cold start imports sync-only modules: {sorted(loaded)}"
+    # Reported with -s / on failure, to track cold start over time
+    print(f"api.router cumulative import time: {times['api.router'] / 1000:.1f} ms")
+
+
+def test_settings_do_not_require_rpc_url():
+    times = import_times("from core.config import settings; assert settings.rpc_url is None")
+    assert "core.config" in times
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.log_fetcher import AdaptiveLogFetcher
+from core.provider import LogRangeTooLargeError
+
+WATCHED = "0x" + "a" * 40
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+def make_provider(max_span, logs_per_block=1):
+    """Provider stub that rejects ranges wider than max_span blocks."""
+    provider = MagicMock()
+
+    def get_logs(params):
+        span = params["toBlock"] - params["fromBlock"] + 1
+        if span > max_span:
+            raise LogRangeTooLargeError("query returned more than 10000 results")
+        return [{"blockNumber": bn} for bn in range(params["fromBlock"], params["toBlock"] + 1)] * logs_per_block
+
+    provider.get_logs.side_effect = get_logs
+    return provider
+
+
+def test_filter_params_include_watch_list():
+    fetcher = AdaptiveLogFetcher(MagicMock(), addresses=[WATCHED], topics=[TRANSFER_TOPIC])
+
+    params = fetcher.filter_params(10, 20)
+
+    assert params["fromBlock"] == 10 and params["toBlock"] == 20
+    assert params["address"][0].lower() == WATCHED
+    assert params["topics"] == [[TRANSFER_TOPIC]]
+
+
+def test_fetch_bisects_rejected_range():
+    provider = make_provider(max_span=25)
+    fetcher = AdaptiveLogFetcher(provider, addresses=[WATCHED], initial_range=100)
+
+    logs = fetcher.fetch(0, 99)
+
+    assert sorted(log["blockNumber"] for log in logs) == list(range(100))
+    assert fetcher.range_size < 50
+
+
+def test_fetch_single_block_error_is_raised():
+    provider = make_provider(max_span=0)
+    fetcher = AdaptiveLogFetcher(provider, addresses=[WATCHED])
+
+    with pytest.raises(LogRangeTooLargeError):
+        fetcher.fetch(5, 5)
+
+
+def test_range_size_adapts_to_density():
+    provider = make_provider(max_span=10_000, logs_per_block=10)
+    fetcher = AdaptiveLogFetcher(provider, addresses=[WATCHED], initial_range=1000, target_results=500)
+
+    fetcher.fetch(0, 999)
+    assert fetcher.range_size == 50
+
+    # Empty ranges grow the window, but at most 2x per step
+    provider.get_logs.side_effect = lambda params: []
+    fetcher.fetch(1000, 1049)
+    assert fetcher.range_size == 100
+
+
+def test_rejected_span_is_forgotten_after_repeated_successes():
+    from core.log_fetcher import REJECTED_SPAN_RESET_SUCCESSES
+
+    provider = make_provider(max_span=25)
+    fetcher = AdaptiveLogFetcher(provider, addresses=[WATCHED], initial_range=40, target_results=10_000)
+    fetcher.fetch(0, 39)
+    assert fetcher.rejected_span == 40
+
+    # The node now serves wider ranges (e.g. the hot region has passed)
+    provider.get_logs.side_effect = lambda params: []
+    start = 40
+    for _ in range(REJECTED_SPAN_RESET_SUCCESSES - 1):
+        start, end = fetcher.next_range(start, 10**6)
+        fetcher.fetch(start, end)
+        start = end + 1
+    assert fetcher.range_size == 39
+
+    start, end = fetcher.next_range(start, 10**6)
+    fetcher.fetch(start, end)
+    assert fetcher.rejected_span is None
+    fetcher.fetch(end + 1, end + fetcher.range_size)
+    assert fetcher.range_size > 39
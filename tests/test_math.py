@@ -30,3 +30,30 @@ def test_wei_to_ether_precision():
     wei = 1
     eth = wei_to_ether(wei)
     assert format_ether(eth, 18) == "0.000000000000000001"
+
+
+def test_import_does_not_mutate_global_context():
+    import decimal
+
+    # The module keeps its 80-digit precision in a local context
+    assert decimal.getcontext().prec == 28
+
+
+def test_format_units_batch_matches_decimal_path():
+    from utils.blockchain_math import wei_to_ether_strings
+
+    values = [0, 1, 10**18, 15 * 10**17, 2**256 - 1, -25 * 10**15]
+    for places in (0, 2, 18):
+        expected = [format_ether(wei_to_ether(v), places) for v in values]
+        assert wei_to_ether_strings(values, places) == expected
+
+
+def test_format_units_token_decimals():
+    from utils.blockchain_math import (format_units, format_units_batch,
+                                       parse_units)
+
+    assert format_units(1_234_567, decimals=6) == "1.234567"
+    assert format_units(1_234_567, decimals=6, places=2) == "1.23"
+    assert format_units(5, decimals=0, places=2) == "5.00"
+    assert format_units_batch(["1500000", 2_500_000], decimals=6, places=0) == ["2", "2"]
+    assert parse_units("1.234567", decimals=6) == 1_234_567
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.connection import Base
+from database.models import Block  # noqa: F401 (registers the tables)
+from database.repository import BlockchainRepository
+from domain.decoder import LogDecoder
+from domain.schemas import BlockModel
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from database.parquet_sink import ParquetSink  # noqa: E402
+
+
+def block_row(number):
+    return BlockModel(
+        number=number,
+        hash=f"0x{number:064x}",
+        parent_hash=f"0x{number - 1:064x}",
+        timestamp=datetime(2024, 1, 1),
+        miner="0x" + "0" * 40,
+        difficulty=0,
+        total_difficulty=0,
+        size=1,
+        extra_data="0x",
+        gas_limit=30000000,
+        gas_used=21000,
+    ).model_dump()
+
+
+def tx_row(number):
+    return {
+        "hash": f"0x{number:064x}",
+        "nonce": 0,
+        "block_hash": f"0x{number:064x}",
+        "block_number": number,
+        "transaction_index": 0,
+        "from_address": "0x" + "e" * 40,
+        "to_address": None,
+        "value": 2**200,
+        "gas_price": 1,
+        "gas": 21000,
+        "input": "0x",
+    }
+
+
+def read_blocks(root, table="blocks"):
+    return sorted(r["number" if table == "blocks" else "block_number"] for r in pq.read_table(f"{root}/{table}").to_pylist())
+
+
+def test_sink_buffers_and_partitions_by_range(tmp_path):
+    sink = ParquetSink(str(tmp_path), partition_blocks=10, flush_blocks=5)
+
+    for number in range(8, 13):
+        sink.write_batch([block_row(number)], [tx_row(number)])
+
+    # Flushed once 5 blocks were buffered, split across the range=0 and range=10 partitions
+    assert sorted(p.name for p in (tmp_path / "blocks").iterdir()) == ["range=000000000000", "range=000000000010"]
+    assert read_blocks(tmp_path) == [8, 9, 10, 11, 12]
+    values = pq.read_table(tmp_path / "transactions").column("value").to_pylist()
+    assert values[0] == str(2**200)
+
+
+def test_sink_rollback_rewrites_trailing_file(tmp_path):
+    sink = ParquetSink(str(tmp_path), partition_blocks=100, flush_blocks=3)
+    for number in range(1, 7):
+        sink.write_batch([block_row(number)], [tx_row(number)])
+    sink.write_batch([block_row(7)])
+
+    sink.rollback_from_height(5)
+
+    assert sink.buffered_blocks == 0
+    assert read_blocks(tmp_path) == [1, 2, 3, 4]
+    assert read_blocks(tmp_path, "transactions") == [1, 2, 3, 4]
+    assert sink.last_block() == 4
+
+
+def test_sink_catch_up_from_database(tmp_path):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    repo = BlockchainRepository(db)
+    repo.insert_blocks_bulk([BlockModel(**block_row(n)) for n in range(1, 6)])
+    db.commit()
+
+    sink = ParquetSink(str(tmp_path), flush_blocks=1)
+    sink.write_batch([block_row(1)])
+
+    sink.catch_up(repo, LogDecoder(), 5)
+
+    assert read_blocks(tmp_path) == [1, 2, 3, 4, 5]
+    db.close()
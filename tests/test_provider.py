@@ -1,12 +1,13 @@
 import json
 import logging
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
-from web3.exceptions import Web3Exception
+from web3.exceptions import BlockNotFound, Web3Exception, Web3RPCError
 
 from core.config import settings
 from core.provider import BlockchainProvider
+from core.resilience import CircuitOpenError, RetryBudget
 
 # Setup basic logging for inspector
 logging.basicConfig(level=logging.INFO)
@@ -67,6 +68,7 @@ def test_get_transaction_retry(provider):
 def inspect_latest_block():
     """Diagnostic tool to check RPC node response."""
     from web3 import Web3
+
     from core.config import settings
 
     public_url = settings.rpc_url
@@ -99,3 +101,147 @@ def inspect_latest_block():
 
 if __name__ == "__main__":
     inspect_latest_block()
+
+
+def simulate_reorg(provider):
+    """Sync 100-105, reset the prefetch pipeline, then handle a 3-block reorg at 103."""
+    chain = {n: {"number": n, "hash": f"0x{n:064x}"} for n in range(100, 106)}
+    by_hash = {b["hash"]: b for b in chain.values()}
+
+    def get_block(identifier, full_transactions=False):
+        if isinstance(identifier, int):
+            return chain[identifier]
+        return by_hash[identifier]
+
+    with patch.object(provider.w3.eth, "get_block", side_effect=get_block) as rpc:
+        for n in range(100, 106):
+            provider.get_block(n, full_transactions=True)
+        # Pipeline reset: the discarded prefetch buffer is refetched
+        for n in range(101, 106):
+            provider.get_block(n, full_transactions=True)
+
+        orphaned = [chain[n]["hash"] for n in (103, 104, 105)]
+        for n in (103, 104, 105):
+            chain[n] = {"number": n, "hash": f"0x{n + 0xF000:064x}"}
+            by_hash[chain[n]["hash"]] = chain[n]
+        provider.invalidate_from(103)
+        # Resync from the fork point, walking back one parent first
+        for n in range(102, 106):
+            provider.get_block(n, full_transactions=True)
+        # Orphaned blocks looked up by hash (e.g. for the audit trail) are still exact
+        for block_hash in orphaned:
+            assert provider.get_block(block_hash, full_transactions=True)["hash"] == block_hash
+        assert provider.get_block(104, full_transactions=True)["hash"] == chain[104]["hash"]
+        return rpc.call_count
+
+
+def test_block_cache_cuts_rpc_calls_during_reorg():
+    uncached = simulate_reorg(BlockchainProvider("http://localhost:8545", cache_bytes=0))
+    cached_provider = BlockchainProvider("http://localhost:8545", cache_bytes=1 << 20)
+    cached = simulate_reorg(cached_provider)
+
+    assert uncached == 19
+    # Only the 6 initial blocks and the 3 replaced heights reach the node
+    assert cached == 9
+    assert cached_provider.cache.hit_ratio > 0.5
+
+
+def test_get_logs_caches_hash_scoped_filters(provider):
+    with patch.object(provider.w3.eth, "get_logs", return_value=[{"logIndex": 0}]) as rpc:
+        provider.get_logs({"blockHash": "0x" + "a" * 64})
+        provider.get_logs({"blockHash": "0x" + "A" * 64})
+        provider.get_logs({"fromBlock": "latest", "toBlock": "latest"})
+        provider.get_logs({"fromBlock": "latest", "toBlock": "latest"})
+        assert rpc.call_count == 3
+
+
+def test_permanent_error_fails_fast(provider):
+    error = Web3RPCError("invalid argument", rpc_response={"error": {"code": -32602, "message": "invalid argument"}})
+    with patch.object(provider.w3.eth, "get_block", side_effect=error):
+        with patch("tenacity.wait_exponential.__call__", return_value=0):
+            with pytest.raises(Web3RPCError):
+                provider.get_block(100)
+        assert provider.w3.eth.get_block.call_count == 1
+    # The node answered, so the breaker stays closed
+    assert provider.breaker.state == "closed"
+
+
+def test_missing_block_is_not_retried(provider):
+    with patch.object(provider.w3.eth, "get_block", return_value=None):
+        with pytest.raises(BlockNotFound):
+            provider.get_block(100)
+        assert provider.w3.eth.get_block.call_count == 1
+
+
+def test_circuit_opens_and_fails_fast(provider):
+    provider.breaker.failure_threshold = 2
+    with patch.object(provider.w3.eth, "get_logs", side_effect=ConnectionError("refused")):
+        with patch("tenacity.wait_exponential.__call__", return_value=0):
+            with pytest.raises(CircuitOpenError):
+                provider.get_logs({"fromBlock": 1, "toBlock": 2})
+        # Two real attempts open the circuit; the retry that follows never reaches the node
+        assert provider.w3.eth.get_logs.call_count == 2
+
+
+def test_retry_budget_caps_retries(provider):
+    provider.retry_budgets["get_transaction"] = RetryBudget(ratio=0.0, capacity=1)
+    with patch.object(provider.w3.eth, "get_transaction", side_effect=ConnectionError("down")):
+        with patch("tenacity.wait_exponential.__call__", return_value=0):
+            with pytest.raises(ConnectionError):
+                provider.get_transaction("0xabc")
+        assert provider.w3.eth.get_transaction.call_count == 2
+
+
+def test_get_headers_batches_and_caches(provider):
+    headers = {n: {"number": n, "hash": "0x" + f"{n:064x}"} for n in range(10, 14)}
+    batch = MagicMock()
+    batch.__enter__.return_value = batch
+    batch.execute.side_effect = lambda: [headers[n] for n in requested]
+    requested = []
+
+    with patch.object(provider.w3, "batch_requests", return_value=batch), \
+            patch.object(provider.w3.eth, "get_block", side_effect=lambda n, full: requested.append(n)):
+        provider.cache.put_block(headers[11], False)
+        assert [h["number"] for h in provider.get_headers(10, 13)] == [10, 11, 12, 13]
+        # Cached headers are not requested again
+        assert requested == [10, 12, 13]
+        assert batch.execute.call_count == 1
+        assert provider.get_block(12)["number"] == 12
+
+
+@pytest.mark.parametrize("message, too_large", [
+    ("query returned more than 10000 results", True),
+    ("Log response size exceeded. You can make eth_getLogs requests with up to a 2K block range", True),
+    ("exceed maximum block range: 5000", True),
+    ("eth_getLogs is limited to a 10,000 range", True),
+    # Range errors that are not about size must not be bisected
+    ("invalid block range params", False),
+    ("fromBlock is greater than toBlock: invalid block range", False),
+    ("rate limit exceeded", False),
+    ("project ID request rate limit exceeded", False),
+    ("daily request count exceeded, request rate limited", False),
+])
+def test_is_log_range_too_large_ignores_throttling(message, too_large):
+    from core.provider import is_log_range_too_large
+
+    assert is_log_range_too_large(Web3RPCError(message)) is too_large
+
+
+def test_is_log_range_too_large_by_error_code():
+    from core.provider import is_log_range_too_large
+
+    def rpc_error(code, message):
+        return Web3RPCError(message, rpc_response={"jsonrpc": "2.0", "id": 1, "error": {"code": code, "message": message}})
+
+    assert is_log_range_too_large(rpc_error(-32005, "limit exceeded"))
+    assert not is_log_range_too_large(rpc_error(-32005, "project ID request rate limit exceeded"))
+    assert not is_log_range_too_large(rpc_error(-32000, "invalid block range params"))
+
+
+def test_throttled_get_logs_is_retried_not_split(provider):
+    throttled = Web3RPCError("project ID request rate limit exceeded")
+    with patch.object(provider.w3.eth, "get_logs", side_effect=[throttled, []]):
+        with patch("tenacity.wait_exponential.__call__", return_value=0):
+            assert provider.get_logs({"fromBlock": 1, "toBlock": 5000}) == []
+        assert provider.w3.eth.get_logs.call_count == 2
+    assert provider.breaker.failures == 0
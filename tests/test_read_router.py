@@ -0,0 +1,87 @@
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database.models  # noqa: F401
+from database.connection import Base
+from database.read_router import ReadRouter
+from database.repository import BlockchainRepository
+from domain.schemas import BlockModel
+
+
+def make_factory(latest_block=None):
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    if latest_block is not None:
+        session = factory()
+        BlockchainRepository(session).insert_blocks_bulk(
+            [
+                BlockModel(
+                    number=latest_block,
+                    hash=f"0x{latest_block:064x}",
+                    parent_hash=f"0x{latest_block - 1:064x}",
+                    timestamp=int(datetime.now(UTC).timestamp()),
+                    miner="0x" + "0" * 40,
+                    size=1,
+                    extra_data="0x",
+                    gas_limit=1,
+                    gas_used=1,
+                )
+            ]
+        )
+        session.commit()
+        session.close()
+    return factory
+
+
+def bound_to(session, factory):
+    return session.get_bind() is factory.kw["bind"]
+
+
+def test_without_replicas_reads_use_primary():
+    primary = make_factory()
+    router = ReadRouter(primary, [])
+    session = router.acquire()
+    assert bound_to(session, primary)
+    router.release(session)
+
+
+def test_round_robin_alternates_replicas():
+    primary, replica_a, replica_b = make_factory(), make_factory(), make_factory()
+    router = ReadRouter(primary, [replica_a, replica_b])
+
+    sessions = [router.acquire() for _ in range(4)]
+    assert [bound_to(s, replica_a) for s in sessions] == [True, False, True, False]
+    for session in sessions:
+        router.release(session)
+    assert router.active == [0, 0]
+
+
+def test_least_connections_prefers_idle_replica():
+    primary, replica_a, replica_b = make_factory(), make_factory(), make_factory()
+    router = ReadRouter(primary, [replica_a, replica_b], strategy="least_connections")
+
+    held = router.acquire()
+    assert bound_to(held, replica_a)
+    assert bound_to(router.acquire(), replica_b)
+    router.release(held)
+    assert bound_to(router.acquire(), replica_a)
+
+
+def test_lagging_replica_falls_back_to_primary():
+    primary, replica = make_factory(110), make_factory(100)
+    router = ReadRouter(primary, [replica])
+
+    assert bound_to(router.acquire(min_height=100), replica)
+    assert bound_to(router.acquire(min_height=105), primary)
+    # A primary session is not counted against the replica
+    assert router.active == [1]
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        ReadRouter(make_factory(), [], strategy="random")
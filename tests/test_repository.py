@@ -1,9 +1,10 @@
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
+import database.models  # noqa: F401  (registers the tables on Base)
 from database.connection import Base
 from database.repository import BlockchainRepository
 from domain.schemas import BlockModel
@@ -77,3 +78,332 @@ def test_repository_rollback(db_session):
     db_session.commit()
 
     assert repo.get_latest_block().number == 100
+
+
+def make_block(number):
+    return BlockModel(
+        number=number,
+        hash=f"0x{number:064x}",
+        parent_hash=f"0x{number-1:064x}",
+        timestamp=int(datetime.now(UTC).timestamp()),
+        miner="0x" + "0" * 40,
+        difficulty=1,
+        total_difficulty=1,
+        size=1,
+        extra_data="0x",
+        gas_limit=1,
+        gas_used=1,
+    )
+
+
+def make_transaction(number):
+    return {
+        "hash": f"0x{number:064x}",
+        "nonce": 0,
+        "block_hash": f"0x{number:064x}",
+        "block_number": number,
+        "transaction_index": 0,
+        "from_address": "0x" + "e" * 40,
+        "to_address": "0x" + "f" * 40,
+        "value": 1,
+        "gas_price": 1,
+        "gas": 21000,
+        "input": "0x",
+    }
+
+
+def make_log(number, log_index=0):
+    return {
+        "log_index": log_index,
+        "transaction_hash": f"0x{number:064x}",
+        "address": "0x" + "f" * 40,
+        "data": "0x",
+        "topics": ["0x" + "1" * 64],
+        "block_number": number,
+        "block_hash": f"0x{number:064x}",
+    }
+
+
+def count(db_session, table):
+    return db_session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+def test_repository_promote_finalized(db_session):
+    repo = BlockchainRepository(db_session)
+
+    repo.insert_blocks_bulk([make_block(100)])
+    for i in [101, 102]:
+        repo.insert_blocks_bulk([make_block(i)], staging=True)
+        repo.insert_transactions_bulk([make_transaction(i)], staging=True)
+        repo.insert_logs_bulk([make_log(i)], staging=True)
+    db_session.commit()
+
+    # Staged blocks are visible to the sync path before promotion
+    assert repo.get_latest_block().number == 102
+    assert repo.get_block_by_number(101) is not None
+
+    assert repo.promote_finalized(101) == 1
+    db_session.commit()
+
+    assert count(db_session, "blocks") == 2
+    assert count(db_session, "transactions") == 1
+    assert count(db_session, "logs") == 1
+    assert count(db_session, "hot_blocks") == 1
+    assert count(db_session, "hot_logs") == 1
+    assert repo.get_latest_block().number == 102
+
+
+def test_repository_rollback_clears_staging(db_session):
+    repo = BlockchainRepository(db_session)
+
+    repo.insert_blocks_bulk([make_block(100)])
+    repo.insert_blocks_bulk([make_block(101)], staging=True)
+    repo.insert_transactions_bulk([make_transaction(101)], staging=True)
+    db_session.commit()
+
+    repo.rollback_from_height(101)
+    db_session.commit()
+
+    assert repo.get_latest_block().number == 100
+    assert count(db_session, "hot_transactions") == 0
+
+
+def test_repository_iter_logs_streams_in_partitions(db_session):
+    repo = BlockchainRepository(db_session)
+    repo.insert_logs_bulk([make_log(100 + i) for i in range(5)])
+    db_session.commit()
+
+    partitions = list(repo.iter_logs(100, 104, batch_size=2))
+
+    assert [len(p) for p in partitions] == [2, 2, 1]
+    assert partitions[0][0]["topics"] == ["0x" + "1" * 64]
+
+
+def test_repository_rollback_journals_and_restores_orphans(db_session):
+    repo = BlockchainRepository(db_session)
+    for i in [100, 101, 102]:
+        repo.insert_blocks_bulk([make_block(i)], staging=i > 100)
+        repo.insert_transactions_bulk([make_transaction(i)], staging=i > 100)
+        repo.insert_logs_bulk([make_log(i)], staging=i > 100)
+    db_session.commit()
+
+    repo.rollback_from_height(101)
+    db_session.commit()
+
+    assert count(db_session, "orphaned_blocks") == 2
+    assert count(db_session, "orphaned_logs") == 2
+    assert repo.get_orphan_ceiling() == 102
+
+    # The chain flips back: the orphaned hash is re-applied without refetching
+    assert repo.restore_orphaned_block(f"0x{101:064x}") is True
+    db_session.commit()
+
+    assert repo.get_latest_block().number == 101
+    assert count(db_session, "transactions") == 2
+    assert [log["block_number"] for part in repo.iter_logs(100, 102) for log in part] == [100, 101]
+    assert count(db_session, "orphaned_blocks") == 1
+    assert repo.restore_orphaned_block("0x" + "9" * 64) is False
+
+
+def test_repository_orphan_journal_is_bounded(db_session):
+    repo = BlockchainRepository(db_session)
+    for i in range(100, 106):
+        repo.insert_blocks_bulk([make_block(i)])
+        repo.insert_logs_bulk([make_log(i)])
+    db_session.commit()
+
+    repo.rollback_from_height(101, orphan_limit=2)
+    db_session.commit()
+
+    hashes = db_session.execute(text("SELECT hash FROM orphaned_blocks ORDER BY number")).scalars().all()
+    assert hashes == [f"0x{104:064x}", f"0x{105:064x}"]
+    assert count(db_session, "orphaned_logs") == 2
+
+    repo.rollback_from_height(100, orphan_limit=0)
+    assert count(db_session, "orphaned_blocks") == 2
+
+
+def test_repository_chain_stats_rollups_revert_on_reorg(db_session):
+    from domain.stats import compute_block_stats
+
+    repo = BlockchainRepository(db_session)
+    # Blocks 100-101 share a minute; 102 starts the next one
+    stats = []
+    for number, second in [(100, 0), (101, 30), (102, 60)]:
+        block = make_block(number).model_copy(
+            update={"timestamp": datetime(2024, 5, 1, 12, 0) + timedelta(seconds=second), "base_fee_per_gas": 7}
+        )
+        stats.append(compute_block_stats(block, [make_transaction(number)], [make_log(number)]))
+    repo.apply_block_stats(stats)
+    db_session.commit()
+
+    minutes = repo.get_chain_stats("minute")
+    assert [(m["block_count"], m["tx_count"]) for m in minutes] == [(2, 2), (1, 1)]
+    [hour] = repo.get_chain_stats("hour")
+    assert hour["block_count"] == 3
+    assert int(hour["fees_burned"]) == 21
+    assert repo.get_chain_stats("minute", limit=1) == minutes[1:]
+
+    repo.rollback_from_height(101)
+    db_session.commit()
+
+    [minute] = repo.get_chain_stats("minute")
+    assert (minute["block_count"], minute["log_count"], int(minute["total_value"])) == (1, 1, 1)
+    assert repo.get_chain_stats("hour")[0]["block_count"] == 1
+    assert count(db_session, "block_stats") == 1
+
+
+def test_repository_replayed_balance_deltas_apply_once(db_session):
+    repo = BlockchainRepository(db_session)
+    token, alice, bob = "0x" + "a" * 40, "0x" + "1" * 40, "0x" + "2" * 40
+    batch = {
+        (100, "0x" + "b" * 64): {(token, alice): -30, (token, bob): 30},
+        (101, "0x" + "c" * 64): {(token, bob): 5},
+    }
+    repo.apply_balance_deltas(batch)
+    repo.apply_balance_deltas(batch)
+    # A batch overlapping the journal applies only its new block
+    repo.apply_balance_deltas({**batch, (102, "0x" + "d" * 64): {(token, alice): 7}})
+    db_session.commit()
+
+    assert repo.get_token_balance(token, alice) == -23
+    assert repo.get_token_balance(token, bob) == 35
+    assert count(db_session, "token_balance_deltas") == 4
+
+
+def test_repository_address_activity_keyset_pages_and_rollback(db_session):
+    from domain.activity import address_postings
+
+    repo = BlockchainRepository(db_session)
+    for number in (100, 101, 102):
+        repo.insert_address_activity(address_postings([make_transaction(number)], [], []))
+    db_session.commit()
+
+    sender = "0x" + "e" * 40
+    first = repo.get_address_activity(sender.upper().replace("0X", "0x"), limit=2)
+    assert [p["block_number"] for p in first] == [102, 101]
+    last = first[-1]
+    rest = repo.get_address_activity(
+        sender, before=(last["block_number"], last["tx_index"], last["log_index"], last["role"])
+    )
+    assert [p["block_number"] for p in rest] == [100]
+
+    repo.rollback_from_height(101)
+    db_session.commit()
+    assert [p["block_number"] for p in repo.get_address_activity(sender)] == [100]
+
+
+def test_repository_offloads_large_payloads_to_blobs(db_session):
+    repo = BlockchainRepository(db_session, payload_offload_bytes=64)
+    calldata = "0xa9059cbb" + "00" * 500
+    large = {**make_transaction(100), "input": calldata}
+    # Same payload in another transaction is stored once
+    duplicate = {**make_transaction(101), "input": calldata, "transaction_index": 1}
+    repo.insert_blocks_bulk([make_block(n) for n in (100, 101, 102)])
+    repo.insert_transactions_bulk([large, duplicate, make_transaction(102)])
+    repo.insert_logs_bulk([{**make_log(100), "data": "0x" + "ff" * 100}])
+    db_session.commit()
+
+    inline = db_session.execute(text("SELECT input, input_blob FROM transactions ORDER BY hash")).all()
+    assert inline[0].input == "0xa9059cbb" and inline[0].input_blob.startswith("0x")
+    assert inline[2] == ("0x", None)
+    assert count(db_session, "payload_blobs") == 2
+
+    txs = [tx for part in repo.iter_transactions(100, 102) for tx in part]
+    assert [tx["input"] for tx in txs] == [calldata, calldata, "0x"]
+    assert "input_blob" not in txs[0]
+    assert repo.get_transaction(f"0x{101:064x}")["input"] == calldata
+    assert repo.get_logs([100])[0]["data"] == "0x" + "ff" * 100
+
+    # Journaled rows keep their reference, so a restored block inflates the same way
+    repo.rollback_from_height(100)
+    assert repo.restore_orphaned_block(f"0x{100:064x}") is True
+    assert repo.get_transaction(f"0x{100:064x}")["input"] == calldata
+
+
+def test_repository_sync_ranges_merge_truncate_and_seed(db_session):
+    repo = BlockchainRepository(db_session)
+    repo.insert_blocks_bulk([make_block(n) for n in (5, 6, 7)])
+    assert repo.seed_sync_ranges()
+    assert not repo.seed_sync_ranges()
+    assert repo.get_sync_ranges() == [(5, 7)]
+
+    # Tip cursor far above, backfill cursor walking down towards it
+    repo.mark_synced(20, 20)
+    repo.mark_synced(21, 21)
+    repo.mark_synced(10, 12)
+    repo.mark_synced(8, 9)
+    assert repo.get_sync_ranges() == [(5, 12), (20, 21)]
+    repo.mark_synced(13, 19)
+    assert repo.get_sync_ranges() == [(5, 21)]
+
+    repo.rollback_from_height(18, orphan_limit=0)
+    assert repo.get_sync_ranges() == [(5, 17)]
+
+
+def test_repository_pipeline_resolves_address_ids_before_it_starts(db_session):
+    from sqlalchemy import event
+
+    repo = BlockchainRepository(db_session)
+    tx, log = make_transaction(100), make_log(100)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with repo.pipeline([tx["from_address"], tx["to_address"], log["address"]]):
+        event.listen(db_session.get_bind(), "before_cursor_execute", record)
+        repo.insert_blocks_bulk([make_block(100)])
+        repo.insert_transactions_bulk([tx])
+        repo.insert_logs_bulk([log])
+    event.remove(db_session.get_bind(), "before_cursor_execute", record)
+    db_session.commit()
+
+    # Only the writes were queued: no address upserts or lookups inside the block
+    assert len(statements) == 3
+    assert not any("addresses" in statement for statement in statements)
+    assert repo.get_logs([100])[0]["address"] == log["address"]
+    assert repo._pinned_ids == {}
+
+
+def test_repository_log_writes_are_idempotent_under_concurrent_replay(tmp_path):
+    import threading
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'replay.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    batch = [make_log(n, i) for n in (100, 101) for i in range(25)]
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def writer(staging):
+        session = Session()
+        try:
+            repo = BlockchainRepository(session)
+            barrier.wait()
+            repo.insert_logs_bulk(batch, staging=staging)
+            repo.insert_logs_bulk(batch[:10], staging=staging)
+            session.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    # Two writers replay into the canonical table, two into staging
+    threads = [threading.Thread(target=writer, args=(i % 2 == 1,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    session = Session()
+    assert count(session, "logs") == len(batch)
+    assert count(session, "hot_logs") == len(batch)
+    # Promotion and orphan restore re-apply the same rows without duplicating them
+    repo = BlockchainRepository(session)
+    repo.promote_finalized(101)
+    assert count(session, "logs") == len(batch)
+    assert count(session, "hot_logs") == 0
+    session.close()
+    engine.dispose()
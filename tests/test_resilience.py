@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from web3.exceptions import (BlockNotFound, TooManyRequests, Web3Exception,
+                             Web3RPCError)
+
+from core.provider import LogRangeTooLargeError
+from core.resilience import (PERMANENT, THROTTLED, TRANSPORT, CircuitBreaker,
+                             CircuitOpenError, RetryBudget, classify_error)
+
+
+def rpc_error(code, message):
+    return Web3RPCError(message, rpc_response={"error": {"code": code, "message": message}})
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ConnectionError("reset by peer"), TRANSPORT),
+    (TimeoutError(), TRANSPORT),
+    (http_error(502), TRANSPORT),
+    (Web3Exception("Timeout"), TRANSPORT),
+    (rpc_error(-32000, "execution aborted (timeout = 5s)"), TRANSPORT),
+    (TooManyRequests("slow down"), THROTTLED),
+    (http_error(429), THROTTLED),
+    (rpc_error(-32005, "limit exceeded"), THROTTLED),
+    (rpc_error(-32000, "daily request count exceeded, request rate limited"), THROTTLED),
+    (rpc_error(-32602, "invalid argument 0"), PERMANENT),
+    (rpc_error(-32000, "header not found"), PERMANENT),
+    (http_error(401), PERMANENT),
+    (BlockNotFound("Block 5 not found"), PERMANENT),
+    (LogRangeTooLargeError("query returned more than 10000 results"), TRANSPORT),
+    (ValueError("bad hex"), PERMANENT),
+    (KeyError("number"), PERMANENT),
+    (CircuitOpenError("open"), PERMANENT),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_classify_error_extra_permanent_types():
+    assert classify_error(LogRangeTooLargeError("too many results"), (LogRangeTooLargeError,)) == PERMANENT
+
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = CircuitBreaker("node", failure_threshold=2, reset_timeout=10)
+    with patch("core.resilience.time.monotonic", return_value=100.0):
+        breaker.before_call()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    with patch("core.resilience.time.monotonic", return_value=111.0):
+        # One probe is let through; concurrent callers keep failing fast
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        # A failed probe re-opens immediately
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    with patch("core.resilience.time.monotonic", return_value=122.0):
+        breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.failures == 0
+        breaker.before_call()
+    assert breaker.times_opened == 2
+
+
+def test_retry_budget_refills_with_calls():
+    budget = RetryBudget(ratio=0.5, capacity=2)
+    assert budget.try_withdraw() and budget.try_withdraw()
+    assert not budget.try_withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_withdraw()
+    assert budget.exhausted == 1
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2
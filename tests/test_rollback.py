@@ -5,6 +5,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from core.db_service import DatabaseService
+from core.sync import FinalizedReorgException
 from database.connection import Base
 from database.repository import BlockchainRepository
 from domain.schemas import BlockModel
@@ -64,3 +65,59 @@ def test_rollback_to_non_existent_height(db_session):
     service.rollback_to_block(200)
 
     assert repo.get_latest_block().number == 100
+
+
+def test_rollback_capped_at_finalized_height(db_session):
+    repo = BlockchainRepository(db_session)
+    service = DatabaseService(repo)
+
+    for i in range(100, 105):
+        repo.insert_blocks_bulk(
+            [
+                BlockModel(
+                    number=i,
+                    hash=f"0x{i:064x}",
+                    parent_hash=f"0x{i-1:064x}",
+                    timestamp=int(datetime.now(UTC).timestamp()),
+                    miner="0x" + "0" * 40,
+                    difficulty=1,
+                    total_difficulty=i,
+                    size=1,
+                    extra_data="0x",
+                    gas_limit=30000000,
+                    gas_used=0,
+                )
+            ]
+        )
+    db_session.commit()
+
+    # Finalized blocks (<= 102) must survive a deep rollback request
+    service.rollback_to_block(100, finalized_height=102)
+
+    assert repo.get_latest_block().number == 102
+
+    # Once only finalized blocks are left, a conflicting reorg fails instead of looping
+    with pytest.raises(FinalizedReorgException) as excinfo:
+        service.rollback_to_block(100, finalized_height=102)
+    assert excinfo.value.finalized_height == 102
+    assert repo.get_latest_block().number == 102
+
+
+def test_rollback_reverts_token_balance_deltas(db_session):
+    repo = BlockchainRepository(db_session)
+    service = DatabaseService(repo)
+    token, holder = "0x" + "a" * 40, "0x" + "1" * 40
+
+    repo.apply_balance_deltas({(100, "0x" + "a" * 64): {(token, holder): 100}})
+    repo.apply_balance_deltas({(101, "0x" + "b" * 64): {(token, holder): -30}, (102, "0x" + "c" * 64): {(token, holder): 5}})
+    db_session.commit()
+    assert repo.get_token_balance(token, holder) == 75
+
+    service.rollback_to_block(101)
+
+    assert repo.get_token_balance(token, holder) == 100
+
+    # Pruned (finalized) journal rows are no longer reverted
+    repo.prune_balance_journal(100)
+    service.rollback_to_block(100)
+    assert repo.get_token_balance(token, holder) == 100
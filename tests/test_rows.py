@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from hexbytes import HexBytes
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import database.models  # noqa: F401
+from database.connection import Base
+from database.repository import BlockchainRepository
+from domain.rows import LogRow, TransactionRow
+from domain.schemas import LogModel, TransactionModel
+
+RPC_TX = {
+    "hash": HexBytes("0x" + "AB" * 32),
+    "nonce": 7,
+    "blockHash": HexBytes("0x" + "cd" * 32),
+    "blockNumber": 100,
+    "transactionIndex": 3,
+    "from": "0x" + "E" * 40,
+    "to": None,
+    "value": 10**18,
+    "gasPrice": 1,
+    "gas": 21000,
+    "input": HexBytes("0x1234"),
+}
+
+RPC_LOG = {
+    "logIndex": 0,
+    "transactionHash": HexBytes("0x" + "ab" * 32),
+    "address": "0x" + "F" * 40,
+    "data": "0x",
+    "topics": [HexBytes("0x" + "11" * 32)],
+    "blockNumber": 100,
+    "blockHash": "0x" + "cd" * 32,
+    "removed": False,
+}
+
+
+def test_transaction_row_matches_pydantic_model():
+    row = TransactionRow.from_rpc(RPC_TX)
+    assert dict(row) == TransactionModel.model_validate(RPC_TX).model_dump(by_alias=False)
+    assert list(row) == list(TransactionRow.__slots__)
+
+
+def test_log_row_matches_pydantic_model():
+    row = LogRow.from_rpc(RPC_LOG)
+    assert dict(row) == LogModel.model_validate(RPC_LOG).model_dump(by_alias=False)
+    assert row.get("topics") == ["0x" + "11" * 32]
+    assert json.loads(row["topics_json"]) == row.topics
+    assert "topics_json" not in list(row)
+    assert "get" not in row
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [("nonce", -1), ("hash", "0x1234"), ("from", "not-hex")],
+)
+def test_transaction_row_rejects_invalid_payload(field, value):
+    with pytest.raises(ValueError):
+        TransactionRow.from_rpc({**RPC_TX, field: value})
+
+
+def test_repository_binds_rows_directly():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    repo = BlockchainRepository(session)
+
+    log = LogRow.from_rpc(RPC_LOG)
+    repo.insert_transactions_bulk([TransactionRow.from_rpc(RPC_TX)])
+    repo.insert_logs_bulk([log])
+    session.commit()
+
+    assert session.execute(text("SELECT to_id FROM transactions")).scalar() is None
+    stored = [row for part in repo.iter_logs(100, 100) for row in part]
+    assert stored[0]["topics"] == log.topics
+    session.close()
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from domain.schemas import BlockModel
+from domain.stats import bucket_start, compute_block_stats, rollup_deltas
+
+
+def make_block(number, timestamp, base_fee=10):
+    return BlockModel(
+        number=number,
+        hash=f"0x{number:064x}",
+        parent_hash=f"0x{number - 1:064x}",
+        timestamp=timestamp,
+        miner="0x" + "0" * 40,
+        size=1,
+        extra_data="0x",
+        gas_limit=30_000_000,
+        gas_used=100,
+        base_fee_per_gas=base_fee,
+    )
+
+
+def tx(sender, value):
+    return {"from_address": sender, "value": value}
+
+
+def test_bucket_start_truncates_to_interval():
+    ts = datetime(2024, 5, 1, 13, 47, 12, 500)
+    assert bucket_start(ts, "minute") == datetime(2024, 5, 1, 13, 47)
+    assert bucket_start(ts, "hour") == datetime(2024, 5, 1, 13, 0)
+
+
+def test_compute_block_stats():
+    block = make_block(1, datetime(2024, 5, 1, 13, 47, 12))
+    stats = compute_block_stats(block, [tx("0xa", 5), tx("0xa", 7), tx("0xb", 1)], [{}, {}])
+
+    assert stats["tx_count"] == 3
+    assert stats["log_count"] == 2
+    assert stats["total_value"] == 13
+    assert stats["unique_senders"] == 2
+    assert stats["fees_burned"] == 1000
+    assert stats["minute_bucket"] == datetime(2024, 5, 1, 13, 47)
+
+
+def test_pre_london_block_burns_nothing():
+    stats = compute_block_stats(make_block(1, datetime(2015, 8, 1), base_fee=None), [], [])
+    assert stats["fees_burned"] == 0
+    assert stats["base_fee_per_gas"] is None
+
+
+def test_rollup_deltas_net_per_bucket_and_reverse():
+    blocks = [
+        compute_block_stats(make_block(1, datetime(2024, 5, 1, 13, 0, 0)), [tx("0xa", 1)], []),
+        compute_block_stats(make_block(2, datetime(2024, 5, 1, 13, 0, 12)), [tx("0xa", 2)], []),
+        compute_block_stats(make_block(3, datetime(2024, 5, 1, 13, 1, 0)), [], []),
+    ]
+
+    minutes = {d["bucket_start"]: d for d in rollup_deltas(blocks, "minute")}
+    assert minutes[datetime(2024, 5, 1, 13, 0)]["block_count"] == 2
+    assert minutes[datetime(2024, 5, 1, 13, 0)]["total_value"] == 3
+    assert minutes[datetime(2024, 5, 1, 13, 0)]["sender_block_count"] == 2
+    assert minutes[datetime(2024, 5, 1, 13, 1)]["block_count"] == 1
+
+    [hour] = rollup_deltas(blocks, "hour", sign=-1)
+    assert hour["block_count"] == -3
+    assert hour["base_fee_sum"] == -30
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+
+import pytest
+from websockets.sync.server import serve
+
+from core.subscription import NewHeadsSubscriber
+
+
+class NewHeadsStub:
+    """Local WebSocket node that answers eth_subscribe and pushes the queued headers."""
+
+    def __init__(self, heads_per_connection):
+        self.heads_per_connection = list(heads_per_connection)
+        self.connections = 0
+        self.server = serve(self.handler, "127.0.0.1", 0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.socket.getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    def handler(self, ws):
+        request = json.loads(ws.recv())
+        assert request["method"] == "eth_subscribe"
+        ws.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "0xsub"}))
+
+        heads = self.heads_per_connection[self.connections] if self.connections < len(self.heads_per_connection) else []
+        self.connections += 1
+        for number in heads:
+            ws.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "method": "eth_subscription",
+                        "params": {"subscription": "0xsub", "result": {"number": hex(number)}},
+                    }
+                )
+            )
+        # Dropping the connection simulates a node restart
+        time.sleep(0.1)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_subscriber_receives_heads():
+    with NewHeadsStub([[100, 101]]) as stub:
+        subscriber = NewHeadsSubscriber(stub.url, reconnect_delay=0.05)
+        subscriber.start()
+        try:
+            assert subscriber.wait_for_head(timeout=5) is True
+            assert wait_until(lambda: subscriber.latest_head == 101)
+        finally:
+            subscriber.stop()
+
+
+def test_subscriber_reconnects_after_disconnect():
+    with NewHeadsStub([[100], [105]]) as stub:
+        subscriber = NewHeadsSubscriber(stub.url, reconnect_delay=0.05)
+        subscriber.start()
+        try:
+            assert wait_until(lambda: subscriber.latest_head == 105)
+            assert stub.connections >= 2
+        finally:
+            subscriber.stop()
+
+
+def test_wait_for_head_times_out_without_connection():
+    subscriber = NewHeadsSubscriber("ws://127.0.0.1:1", reconnect_delay=0.05)
+    subscriber.start()
+    try:
+        assert subscriber.connected is False
+        assert subscriber.wait_for_head(timeout=0.1) is False
+    finally:
+        subscriber.stop()
@@ -0,0 +1,38 @@
+import os
+import threading
+import time
+
+from core.supervisor import ProcessSupervisor
+
+
+def crash():
+    os._exit(3)
+
+
+def serve():
+    time.sleep(30)
+
+
+def test_supervisor_restarts_crashed_process_with_backoff():
+    supervisor = ProcessSupervisor(
+        {"sync": crash, "api": serve}, restart_delay=0.05, max_restart_delay=0.1, start_method="fork"
+    )
+    started = time.monotonic()
+    supervisor.run(poll_interval=0.05, max_iterations=30)
+
+    assert supervisor.restarts["sync"] >= 3
+    assert supervisor.restarts["api"] == 0
+    # Backoff doubles per crash up to the ceiling
+    assert supervisor.delays["sync"] == 0.1
+    # Children are terminated (not killed after the join timeout) when supervision ends
+    assert supervisor.processes == {}
+    assert time.monotonic() - started < 5
+
+
+def test_supervisor_stop_ends_run():
+    supervisor = ProcessSupervisor({"api": serve}, start_method="fork")
+    threading.Timer(0.2, supervisor.stop).start()
+    supervisor.run(poll_interval=0.01)
+
+    assert supervisor.restarts["api"] == 0
+    assert supervisor.processes == {}
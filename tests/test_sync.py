@@ -69,3 +69,46 @@ def test_validate_continuity_reorg_detected(db_session):
     assert excinfo.value.block_number == 101
     assert excinfo.value.expected_parent_hash == prev_hash
     assert excinfo.value.actual_parent_hash == wrong_parent_hash
+
+
+def test_validate_continuity_checks_finalized_blocks_against_db(db_session):
+    repo = BlockchainRepository(db_session)
+    repo.insert_blocks_bulk([create_mock_block_model(100, "0x" + "a" * 64, "0x" + "0" * 64)])
+    db_session.commit()
+
+    # The stored block 100 was never verified, so finality alone does not vouch for it
+    guard = IntegrityGuard(repo, finalized_height=101)
+    new_block = create_mock_block_model(101, "0x" + "b" * 64, "0x" + "f" * 64)
+
+    with pytest.raises(ReorgException):
+        guard.validate_block_continuity(new_block)
+
+
+def test_validate_continuity_uses_verified_finalized_parent(db_session, monkeypatch):
+    repo = BlockchainRepository(db_session)
+    repo.insert_blocks_bulk([create_mock_block_model(100, "0x" + "a" * 64, "0x" + "0" * 64)])
+    db_session.commit()
+    guard = IntegrityGuard(repo, finalized_height=102)
+    assert guard.validate_block_continuity(create_mock_block_model(101, "0x" + "b" * 64, "0x" + "a" * 64))
+
+    # Block 101 passed the check and is final: its children are compared without a DB read
+    lookups = []
+    monkeypatch.setattr(repo, "get_block_by_number", lambda number: lookups.append(number))
+    assert guard.validate_block_continuity(create_mock_block_model(102, "0x" + "c" * 64, "0x" + "b" * 64))
+    with pytest.raises(ReorgException):
+        guard.validate_block_continuity(create_mock_block_model(103, "0x" + "d" * 64, "0x" + "f" * 64))
+    assert lookups == []
+
+
+def test_verify_header_chain_keeps_prefix_before_break(db_session):
+    repo = BlockchainRepository(db_session)
+    guard = IntegrityGuard(repo)
+    a, b, c, d = ("0x" + ch * 64 for ch in "abcd")
+    headers = [
+        create_mock_block_model(10, a, "0x" + "0" * 64),
+        create_mock_block_model(11, b, a),
+        # The node switched branches between the batched requests
+        create_mock_block_model(12, d, c),
+    ]
+    assert [h.number for h in guard.verify_header_chain(headers)] == [10, 11]
+    assert guard.verify_header_chain([]) == []